@@ -0,0 +1,23 @@
+import secrets
+
+from fastapi import Header, HTTPException
+
+from rag.app.core.settings import get_settings
+
+
+def require_admin(authorization: str | None = Header(default=None)) -> None:
+    """Guards operator endpoints with ``Authorization: Bearer <ADMIN_TOKEN>``.
+
+    nginx proxies every ``/rag/`` path to the API, so these routes are public
+    unless a token is checked here. Without ``ADMIN_TOKEN`` they stay disabled.
+    """
+    token = get_settings().admin_token
+    if not token:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled. Set ADMIN_TOKEN to enable them.")
+    scheme, _, credentials = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not secrets.compare_digest(credentials.encode(), token.encode()):
+        raise HTTPException(
+            status_code=401,
+            detail="Missing or invalid admin token.",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
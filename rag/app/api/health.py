@@ -0,0 +1,17 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from rag.app.services.warmup import get_warmup_state
+
+router = APIRouter(tags=["health"])
+
+
+@router.get("/healthz")
+def healthz() -> dict[str, str]:
+    return {"status": "ok"}
+
+
+@router.get("/readyz")
+def readyz() -> JSONResponse:
+    state = get_warmup_state().snapshot()
+    return JSONResponse(state, status_code=200 if state["ready"] else 503)
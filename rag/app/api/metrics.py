@@ -0,0 +1,13 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import PlainTextResponse
+
+from rag.app.core.metrics import metrics_enabled, render_prometheus
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def metrics() -> PlainTextResponse:
+    if not metrics_enabled():
+        raise HTTPException(status_code=404, detail="Metrics are disabled. Set METRICS_ENABLED=true.")
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
@@ -1,13 +1,91 @@
-from fastapi import APIRouter
+import json
+from collections.abc import Iterator
+from itertools import chain
+from typing import Any
 
-from rag.app.models.rag import ChatRequest, ChatResponse
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+from fastapi.responses import StreamingResponse
+
+from rag.app.api.auth import require_admin
+from rag.app.models.rag import (
+    ChatBatchItem,
+    ChatBatchRequest,
+    ChatBatchResponse,
+    ChatRequest,
+    ChatResponse,
+    IngestionJobResponse,
+    UploadResponse,
+)
+from rag.app.services.answer_cache import get_answer_cache
+from rag.app.services.ingestion_jobs import get_ingestion_jobs
+from rag.app.services.ingestion_service import ensure_upload_absent, save_upload, upload_file_name
 from rag.app.services.query_service import QueryService
+from rag.app.services.vector_store import get_embedding_cache
 
 router = APIRouter(prefix="/rag", tags=["rag"])
 query_service = QueryService()
 
 
+def _format_sse(events: Iterator[tuple[str, dict[str, Any]]]) -> Iterator[str]:
+    for event, payload in events:
+        yield f"event: {event}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+
 @router.post("/chat", response_model=ChatResponse)
-def chat(payload: ChatRequest) -> ChatResponse:
-    result = query_service.query(message=payload.message, top_k=payload.top_k)
+async def chat(payload: ChatRequest) -> ChatResponse:
+    result = await query_service.aquery(message=payload.message, top_k=payload.top_k)
     return ChatResponse(**result)
+
+
+@router.post("/chat/batch", response_model=ChatBatchResponse, dependencies=[Depends(require_admin)])
+async def chat_batch(payload: ChatBatchRequest) -> ChatBatchResponse:
+    results = await query_service.aquery_many(messages=payload.messages, top_k=payload.top_k)
+    return ChatBatchResponse(results=[ChatBatchItem(**result) for result in results])
+
+
+@router.post("/chat/stream")
+def chat_stream(payload: ChatRequest) -> StreamingResponse:
+    events = query_service.stream_query(message=payload.message, top_k=payload.top_k)
+    # Pull the first event here so validation/retrieval errors still map to HTTP errors.
+    first_event = next(events)
+    return StreamingResponse(
+        _format_sse(chain([first_event], events)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/uploads", response_model=UploadResponse, status_code=202, dependencies=[Depends(require_admin)])
+def upload_files(files: list[UploadFile] = File(...), overwrite: bool = False) -> UploadResponse:
+    names = [upload_file_name(upload.filename or "") for upload in files]
+    if len(set(names)) != len(names):
+        raise HTTPException(status_code=400, detail="Each uploaded file needs a distinct name.")
+    if not overwrite:
+        # Checked up front so a rejected request stores nothing; save_upload re-checks atomically.
+        for name in names:
+            ensure_upload_absent(name)
+    saved = [save_upload(name, upload.file, overwrite=overwrite) for name, upload in zip(names, files)]
+    # Ingestion runs on the job worker; poll GET /rag/jobs/{id} for progress.
+    job = get_ingestion_jobs().submit(reason="upload")
+    return UploadResponse(files=saved, job=IngestionJobResponse(**job.snapshot()))
+
+
+@router.get("/jobs/{job_id}", response_model=IngestionJobResponse, dependencies=[Depends(require_admin)])
+def ingestion_job(job_id: str) -> IngestionJobResponse:
+    snapshot = get_ingestion_jobs().get(job_id)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail="Ingestion job not found.")
+    return IngestionJobResponse(**snapshot)
+
+
+@router.get("/generation/stats", dependencies=[Depends(require_admin)])
+def generation_stats() -> dict[str, int]:
+    return query_service.generation_stats.snapshot()
+
+
+@router.get("/cache/stats", dependencies=[Depends(require_admin)])
+def cache_stats() -> dict[str, dict[str, int | float]]:
+    return {
+        "query_embeddings": get_embedding_cache().stats(),
+        "answers": get_answer_cache().stats(),
+    }
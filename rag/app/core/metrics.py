@@ -0,0 +1,201 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import nullcontext
+from contextvars import ContextVar
+from typing import Any
+
+from rag.app.core.settings import get_settings
+
+STAGE_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+TOKEN_BUCKETS = (128, 256, 512, 1024, 2048, 4096, 8192, 16384)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, label: str) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.label = label
+        self._values: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, label_value: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[label_value] = self._values.get(label_value, 0.0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for label_value, value in sorted(self._values.items()):
+                lines.append(f'{self.name}{{{self.label}="{_escape(label_value)}"}} {_format_number(value)}')
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, label: str, buckets: tuple[float, ...]) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.label = label
+        self.buckets = buckets
+        # Per label value: non-cumulative bucket counts (last slot is +Inf), sum, count.
+        self._series: dict[str, tuple[list[int], list[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, label_value: str, value: float) -> None:
+        slot = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_value)
+            if series is None:
+                series = ([0] * (len(self.buckets) + 1), [0.0, 0.0])
+                self._series[label_value] = series
+            series[0][slot] += 1
+            series[1][0] += value
+            series[1][1] += 1
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for label_value, (counts, (total, count)) in sorted(self._series.items()):
+                label = f'{self.label}="{_escape(label_value)}"'
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    lines.append(f'{self.name}_bucket{{{label},le="{_format_number(bound)}"}} {cumulative}')
+                lines.append(f'{self.name}_bucket{{{label},le="+Inf"}} {int(count)}')
+                lines.append(f"{self.name}_sum{{{label}}} {total!r}")
+                lines.append(f"{self.name}_count{{{label}}} {int(count)}")
+        return lines
+
+
+STAGE_SECONDS = Histogram(
+    "rag_stage_duration_seconds",
+    "Time spent per query/ingestion stage.",
+    label="stage",
+    buckets=STAGE_BUCKETS,
+)
+PROMPT_TOKENS = Histogram(
+    "rag_prompt_tokens",
+    "Prompt size sent to the chat model, in tokens.",
+    label="prompt",
+    buckets=TOKEN_BUCKETS,
+)
+EVENTS = Counter("rag_events_total", "Notable pipeline events (cache hits, reindexes, retries).", label="event")
+GENERATION_PATHS = Counter(
+    "rag_generation_paths_total",
+    "Generation and repair paths taken per answer.",
+    label="path",
+)
+EMBEDDING_BATCH_SIZE = Histogram(
+    "rag_embedding_batch_size",
+    "Query embeddings encoded together by the micro-batcher.",
+    label="embedder",
+    buckets=BATCH_SIZE_BUCKETS,
+)
+EMBEDDING_QUEUE_SECONDS = Histogram(
+    "rag_embedding_queue_delay_seconds",
+    "Time a query embedding waited in the micro-batcher before encoding started.",
+    label="embedder",
+    buckets=STAGE_BUCKETS,
+)
+_METRICS: tuple[Counter | Histogram, ...] = (
+    STAGE_SECONDS,
+    PROMPT_TOKENS,
+    EVENTS,
+    GENERATION_PATHS,
+    EMBEDDING_BATCH_SIZE,
+    EMBEDDING_QUEUE_SECONDS,
+)
+
+# Set by the Server-Timing middleware for the duration of one request.
+_request_timings: ContextVar[list[tuple[str, float]] | None] = ContextVar("rag_request_timings", default=None)
+_NOOP = nullcontext()
+
+
+def metrics_enabled() -> bool:
+    return get_settings().metrics_enabled
+
+
+class _Stage:
+    __slots__ = ("name", "started")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.started = 0.0
+
+    def __enter__(self) -> "_Stage":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        elapsed = time.perf_counter() - self.started
+        if metrics_enabled():
+            STAGE_SECONDS.observe(self.name, elapsed)
+        timings = _request_timings.get()
+        if timings is not None:
+            timings.append((self.name, elapsed))
+
+
+def timed(stage: str) -> Any:
+    """Context manager recording the block's duration under ``stage``.
+
+    Returns a shared no-op unless metrics are enabled or the current request
+    collects Server-Timing data, so disabled instrumentation costs one lookup.
+    """
+    if not metrics_enabled() and _request_timings.get() is None:
+        return _NOOP
+    return _Stage(stage)
+
+
+def record_event(event: str, amount: float = 1.0) -> None:
+    if metrics_enabled():
+        EVENTS.inc(event, amount)
+
+
+def record_generation_path(path: str) -> None:
+    if metrics_enabled():
+        GENERATION_PATHS.inc(path)
+
+
+def observe_prompt_tokens(prompt_name: str, tokens: int) -> None:
+    if metrics_enabled():
+        PROMPT_TOKENS.observe(prompt_name, tokens)
+
+
+def observe_embedding_batch(embedder: str, size: int, queue_delays: list[float]) -> None:
+    if metrics_enabled():
+        EMBEDDING_BATCH_SIZE.observe(embedder, size)
+        for delay in queue_delays:
+            EMBEDDING_QUEUE_SECONDS.observe(embedder, delay)
+
+
+def start_request_timings() -> tuple[list[tuple[str, float]], Any]:
+    timings: list[tuple[str, float]] = []
+    return timings, _request_timings.set(timings)
+
+
+def finish_request_timings(token: Any) -> None:
+    _request_timings.reset(token)
+
+
+def format_server_timing(timings: list[tuple[str, float]]) -> str:
+    # Repeated stages (e.g. several rewrites) are summed into one entry.
+    totals: dict[str, float] = {}
+    for name, elapsed in timings:
+        totals[name] = totals.get(name, 0.0) + elapsed
+    return ", ".join(f"{name};dur={elapsed * 1000:.1f}" for name, elapsed in totals.items())
+
+
+def render_prometheus() -> str:
+    lines: list[str] = []
+    for metric in _METRICS:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
@@ -1,11 +1,15 @@
+import os
 from pathlib import Path
 
 PROJECT_ROOT = Path(__file__).resolve().parents[3]
 RAG_DIR = PROJECT_ROOT / "rag"
-DATA_DIR = RAG_DIR / "data"
+# RAG_DATA_DIR lets benchmarks and scratch runs use their own uploads/vector DB.
+DATA_DIR = Path(os.environ["RAG_DATA_DIR"]) if os.environ.get("RAG_DATA_DIR") else RAG_DIR / "data"
 UPLOADS_DIR = DATA_DIR / "uploads"
 VECTOR_DB_DIR = DATA_DIR / "vector_db"
 VECTOR_INDEX_PATH = VECTOR_DB_DIR / "index.json"
+EMBEDDING_CACHE_PATH = VECTOR_DB_DIR / "embedding_cache.sqlite3"
+INGEST_JOBS_DIR = VECTOR_DB_DIR / "jobs"
 
 
 def ensure_rag_dirs() -> None:
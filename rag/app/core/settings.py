@@ -14,14 +14,67 @@ class RAGSettings(BaseSettings):
 
     embeddings_provider: Literal["openai", "sentence_transformers"] = "openai"
     show_sources: bool = False
+    vector_backend: Literal["chroma", "numpy"] = "chroma"
+    vector_index_dtype: Literal["float32", "float16"] = "float32"
     retrieval_min_score: float = 0.22
+    hybrid_search_enabled: bool = True
+    hybrid_candidate_multiplier: int = 2
+    rrf_k: int = 60
+    lexical_min_score: float = 1.0
     min_document_chars: int = 120
     fixed_resume_filename: str = "Curriculo.txt"
     fixed_resume_max_chars: int = 1600
+    answer_context_max_tokens: int = 2000
+    rewrite_context_max_tokens: int = 800
+    language_filter_enabled: bool = True
+    translation_pairs: dict[str, str] = {"Curriculo.txt": "Resume.txt"}
+    query_extra_pt_markers: list[str] = []
+    query_extra_en_markers: list[str] = []
+    query_extra_list_markers: list[str] = []
+    query_extra_project_markers: list[str] = []
+    query_extra_number_words: dict[str, int] = {}
+    paraphrase_max_verbatim_words: int = 6
+    paraphrase_max_overlap: float = 0.5
+    generation_mode: Literal["single_pass", "multi_pass"] = "single_pass"
+    batch_max_concurrency: int = 4
     sentence_transformers_model: str = "sentence-transformers/all-MiniLM-L6-v2"
+    embedding_batching_enabled: bool = True
+    embedding_batch_max_size: int = 32
+    embedding_batch_max_wait_ms: float = 2.0
     openai_embedding_model: str = "text-embedding-3-small"
     openai_chat_model: str = "gpt-4o-mini"
     openai_api_key: str | None = None
+    openai_base_url: str | None = None
+    openai_connect_timeout_seconds: float = 5.0
+    openai_read_timeout_seconds: float = 60.0
+    openai_max_retries: int = 2
+    openai_max_connections: int = 32
+    openai_max_keepalive_connections: int = 16
+    openai_keepalive_expiry_seconds: float = 60.0
+    embedding_cache_max_entries: int = 1024
+    embedding_cache_ttl_seconds: float = 86400.0
+    embedding_cache_disk_enabled: bool = False
+    answer_cache_enabled: bool = True
+    answer_cache_max_entries: int = 512
+    answer_cache_ttl_seconds: float = 3600.0
+    answer_cache_semantic_threshold: float | None = None
+    ingest_batch_size: int = 64
+    ingest_max_workers: int = 4
+    ingest_max_retries: int = 5
+    ingest_backoff_seconds: float = 1.0
+    ingest_process_workers: int = 0
+    ingest_process_min_bytes: int = 4 * 1024 * 1024
+    ingest_job_history: int = 100
+    ingest_job_retention_seconds: float = 7 * 24 * 3600.0
+    admin_token: str | None = None
+    upload_max_bytes: int = 10 * 1024 * 1024
+    upload_watch_enabled: bool = True
+    upload_watch_interval_seconds: float = 2.0
+    upload_watch_reindex: bool = True
+    metrics_enabled: bool = False
+    server_timing_enabled: bool = False
+    warmup_embed_probe: bool = True
+    warmup_test_query: str | None = None
 
 
 @lru_cache
@@ -1,10 +1,41 @@
-from fastapi import FastAPI
+import asyncio
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager, suppress
+
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 
+from rag.app.api.health import router as health_router
+from rag.app.api.metrics import router as metrics_router
 from rag.app.api.rag import router as rag_router
+from rag.app.core.metrics import finish_request_timings, format_server_timing, start_request_timings
+from rag.app.core.settings import get_settings
 from rag.app.services.ingestion_service import IngestionService
+from rag.app.services.upload_watcher import UploadWatcher
+from rag.app.services.warmup import get_warmup_state, run_warmup
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    settings = get_settings()
+    watcher: UploadWatcher | None = None
+    if settings.upload_watch_enabled:
+        watcher = UploadWatcher(
+            interval_seconds=settings.upload_watch_interval_seconds,
+            reindex=settings.upload_watch_reindex,
+        )
+    # Warmup runs in the background so /healthz answers immediately; /readyz flips once it is done.
+    warmup = asyncio.create_task(run_warmup(get_warmup_state(), watcher))
+    yield
+    warmup.cancel()
+    with suppress(asyncio.CancelledError):
+        await warmup
+    if watcher is not None:
+        watcher.stop()
+
 
-app = FastAPI(title="Portfolio RAG API", version="0.1.0")
+app = FastAPI(title="Portfolio RAG API", version="0.1.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -20,6 +51,24 @@ app.add_middleware(
 )
 
 app.include_router(rag_router)
+app.include_router(metrics_router)
+app.include_router(health_router)
+
+
+if get_settings().server_timing_enabled:
+
+    @app.middleware("http")
+    async def server_timing(request: Request, call_next: Callable[[Request], Awaitable[Response]]) -> Response:
+        # Stages are timed inside services; this only collects them for the current request.
+        started = time.perf_counter()
+        timings, token = start_request_timings()
+        try:
+            response = await call_next(request)
+        finally:
+            finish_request_timings(token)
+        timings.append(("total", time.perf_counter() - started))
+        response.headers["Server-Timing"] = format_server_timing(timings)
+        return response
 
 ingestion_service = IngestionService()
 
@@ -27,4 +76,4 @@ def build_vector_db_from_uploads(run_now: bool = False) -> dict[str, int] | None
     """Optional bootstrap for indexing files in rag/data/uploads into vector DB."""
     if not run_now:
         return None
-    return ingestion_service.ingest_uploads_to_vector_db(reset_collection=True)
+    return ingestion_service.ingest_uploads_to_vector_db()
@@ -1,3 +1,5 @@
+from typing import Annotated, Literal
+
 from pydantic import BaseModel, Field
 
 
@@ -15,3 +17,37 @@ class ChatSource(BaseModel):
 class ChatResponse(BaseModel):
     answer: str
     sources: list[ChatSource]
+
+
+class ChatBatchRequest(BaseModel):
+    messages: list[Annotated[str, Field(min_length=1, max_length=4000)]] = Field(min_length=1, max_length=10)
+    top_k: int = Field(default=4, ge=1, le=10)
+
+
+class ChatBatchItem(BaseModel):
+    answer: str | None = None
+    sources: list[ChatSource] = Field(default_factory=list)
+    error: str | None = None
+
+
+class ChatBatchResponse(BaseModel):
+    results: list[ChatBatchItem]
+
+
+class IngestionJobResponse(BaseModel):
+    id: str
+    reason: str
+    reset_collection: bool
+    status: Literal["queued", "running", "succeeded", "failed"]
+    created_at: float
+    started_at: float | None = None
+    finished_at: float | None = None
+    embedded_chunks: int = 0
+    coalesced_requests: int = 0
+    result: dict[str, int] | None = None
+    error: str | None = None
+
+
+class UploadResponse(BaseModel):
+    files: list[str]
+    job: IngestionJobResponse
@@ -0,0 +1,149 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Hashable
+
+from rag.app.core.settings import get_settings
+
+
+def _unit_vector(vector: list[float]) -> list[float]:
+    norm = math.sqrt(sum(value * value for value in vector))
+    if not norm:
+        return list(vector)
+    return [value / norm for value in vector]
+
+
+class _CachedAnswer:
+    __slots__ = ("created_at", "generation", "scope", "query_vector", "result")
+
+    def __init__(
+        self,
+        created_at: float,
+        generation: int,
+        scope: Hashable,
+        query_vector: list[float] | None,
+        result: dict[str, Any],
+    ) -> None:
+        self.created_at = created_at
+        self.generation = generation
+        self.scope = scope
+        self.query_vector = query_vector
+        self.result = result
+
+
+class AnswerCache:
+    """LRU of final answers, scoped to one collection generation.
+
+    Exact lookups use the full retrieval key. When a semantic threshold is set,
+    a query whose embedding is close enough to a cached query with the same
+    scope (language, intent flags, requested count) is answered before retrieval.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 512,
+        ttl_seconds: float = 3600.0,
+        semantic_threshold: float | None = None,
+    ) -> None:
+        self._max_entries = max(1, max_entries)
+        self._ttl_seconds = ttl_seconds
+        self._semantic_threshold = semantic_threshold
+        self._entries: OrderedDict[Hashable, _CachedAnswer] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+
+    @property
+    def semantic_enabled(self) -> bool:
+        return self._semantic_threshold is not None
+
+    def _is_fresh(self, entry: _CachedAnswer, generation: int, now: float) -> bool:
+        if entry.generation != generation:
+            return False
+        return self._ttl_seconds <= 0 or now - entry.created_at <= self._ttl_seconds
+
+    def get(self, key: Hashable, generation: int) -> dict[str, Any] | None:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._is_fresh(entry, generation, now):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.result
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def find_similar(
+        self,
+        scope: Hashable,
+        query_vector: list[float],
+        generation: int,
+    ) -> dict[str, Any] | None:
+        if self._semantic_threshold is None:
+            return None
+
+        target = _unit_vector(query_vector)
+        now = time.time()
+        best_key: Hashable | None = None
+        best_score = self._semantic_threshold
+        with self._lock:
+            for key, entry in self._entries.items():
+                if entry.scope != scope or entry.query_vector is None:
+                    continue
+                if not self._is_fresh(entry, generation, now):
+                    continue
+                score = sum(a * b for a, b in zip(target, entry.query_vector))
+                if score >= best_score:
+                    best_key, best_score = key, score
+
+            if best_key is None:
+                return None
+            self._entries.move_to_end(best_key)
+            self.semantic_hits += 1
+            return self._entries[best_key].result
+
+    def set(
+        self,
+        key: Hashable,
+        scope: Hashable,
+        generation: int,
+        result: dict[str, Any],
+        query_vector: list[float] | None = None,
+    ) -> None:
+        stored_vector = _unit_vector(query_vector) if query_vector and self.semantic_enabled else None
+        with self._lock:
+            self._entries[key] = _CachedAnswer(time.time(), generation, scope, stored_vector, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, int | float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self._max_entries,
+                "hits": self.hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+@lru_cache
+def get_answer_cache() -> AnswerCache:
+    settings = get_settings()
+    return AnswerCache(
+        max_entries=settings.answer_cache_max_entries,
+        ttl_seconds=settings.answer_cache_ttl_seconds,
+        semantic_threshold=settings.answer_cache_semantic_threshold,
+    )
@@ -0,0 +1,105 @@
+from dataclasses import dataclass
+
+from rag.app.services.tokens import count_tokens, truncate_to_tokens
+
+# Shorter suffix/prefix matches are treated as coincidence, not splitter overlap.
+MIN_OVERLAP_CHARS = 24
+# A piece cut below this many tokens carries too little to be worth its header.
+MIN_TRUNCATED_TOKENS = 48
+
+
+@dataclass
+class ContextPiece:
+    source_name: str
+    text: str
+    pinned: bool = False
+    tokens: int | None = None
+
+    def token_count(self) -> int:
+        if self.tokens is None:
+            self.tokens = count_tokens(self.text)
+        return self.tokens
+
+
+def _overlap_length(left: str, right: str, min_chars: int = MIN_OVERLAP_CHARS) -> int:
+    """Length of the longest suffix of ``left`` that is also a prefix of ``right``."""
+    probe = right[:min_chars]
+    if len(probe) < min_chars:
+        return 0
+    start = left.find(probe, max(0, len(left) - len(right)))
+    while start != -1:
+        if right.startswith(left[start:]):
+            return len(left) - start
+        start = left.find(probe, start + 1)
+    return 0
+
+
+def _merged_text(first: ContextPiece, second: ContextPiece) -> str | None:
+    if second.text in first.text:
+        return first.text
+    if first.text in second.text:
+        return second.text
+    if first.source_name != second.source_name:
+        return None
+    # Consecutive chunks share their splitter overlap; either one may have ranked first.
+    overlap = _overlap_length(first.text, second.text)
+    if overlap:
+        return first.text + second.text[overlap:]
+    overlap = _overlap_length(second.text, first.text)
+    if overlap:
+        return second.text + first.text[overlap:]
+    return None
+
+
+def merge_pieces(pieces: list[ContextPiece]) -> list[ContextPiece]:
+    """Merges overlapping chunks of the same source and drops text repeated in another piece.
+
+    A merged piece takes the slot of its best-ranked part, so relevance order is kept.
+    Chunks that merge with the pinned fixed resume take its slot instead.
+    """
+    merged: list[ContextPiece] = []
+    for piece in pieces:
+        merged.append(ContextPiece(piece.source_name, piece.text, piece.pinned, piece.tokens))
+        index = len(merged) - 1
+        changed = True
+        while changed:
+            changed = False
+            for other_index, other in enumerate(merged):
+                if other_index == index:
+                    continue
+                first, second = sorted((index, other_index))
+                text = _merged_text(merged[first], merged[second])
+                if text is None:
+                    continue
+                # The fixed resume keeps its own slot after the retrieved chunks.
+                keep, drop = (second, first) if merged[second].pinned else (first, second)
+                target = merged[keep]
+                if text != target.text:
+                    target.text = text
+                    target.tokens = None
+                target.pinned = target.pinned or merged[drop].pinned
+                del merged[drop]
+                index = keep - 1 if drop < keep else keep
+                changed = True
+                break
+    return merged
+
+
+def pack_pieces(pieces: list[ContextPiece], max_tokens: int) -> list[ContextPiece]:
+    """Keeps pieces in order while they fit ``max_tokens``; the first one that does not is cut to fit.
+
+    Pinned pieces (the fixed resume) claim their share of the budget first.
+    """
+    kept: dict[int, ContextPiece] = {}
+    remaining = max_tokens
+    order = sorted(range(len(pieces)), key=lambda index: not pieces[index].pinned)
+    for index in order:
+        piece = pieces[index]
+        tokens = piece.token_count()
+        if tokens <= remaining:
+            kept[index] = piece
+            remaining -= tokens
+        elif remaining >= MIN_TRUNCATED_TOKENS:
+            kept[index] = ContextPiece(piece.source_name, truncate_to_tokens(piece.text, remaining), piece.pinned)
+            remaining = 0
+    return [kept[index] for index in sorted(kept)]
@@ -0,0 +1,89 @@
+import base64
+import re
+import zlib
+from array import array
+from collections.abc import Iterable
+from dataclasses import dataclass
+from functools import lru_cache
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def tokenize_words(text: str) -> list[str]:
+    return _WORD_RE.findall(text.lower())
+
+
+def shingle_hashes(tokens: list[str], size: int) -> list[int]:
+    """32-bit hashes of every run of ``size`` consecutive words."""
+    if len(tokens) < size:
+        return []
+    return [zlib.crc32(" ".join(tokens[i : i + size]).encode("utf-8")) for i in range(len(tokens) - size + 1)]
+
+
+def encode_shingles(hashes: Iterable[int]) -> str:
+    # Chroma metadata only accepts scalars, so the set is packed into a base64 string.
+    return base64.b64encode(array("I", sorted(set(hashes))).tobytes()).decode("ascii")
+
+
+def decode_shingles(value: str) -> frozenset[int]:
+    packed = array("I")
+    packed.frombytes(base64.b64decode(value))
+    return frozenset(packed)
+
+
+@lru_cache(maxsize=256)
+def text_shingles(text: str, size: int) -> frozenset[int]:
+    return frozenset(shingle_hashes(tokenize_words(text), size))
+
+
+@dataclass(frozen=True)
+class CopyReport:
+    # Longest verbatim word run shared with the context; runs shorter than the shingle size report 0.
+    longest_run: int
+    # Fraction of the answer's shingles that also appear in the context.
+    overlap: float
+
+
+class ShingleIndex:
+    """Set of word n-gram hashes over a context, answering copy checks in linear time.
+
+    A verbatim run of ``size + n`` words shows up as ``n + 1`` consecutive answer
+    shingles that are all present in the index, so the longest run and the
+    overlap ratio come from a single pass over the answer.
+    """
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self._shingles: set[int] = set()
+
+    def add_text(self, text: str) -> None:
+        self._shingles.update(text_shingles(text, self.size))
+
+    def add_encoded(self, value: str) -> None:
+        self._shingles.update(decode_shingles(value))
+
+    def add_document(self, text: str, metadata: dict) -> None:
+        encoded = metadata.get("shingles")
+        if encoded and metadata.get("shingle_size") == self.size:
+            self.add_encoded(str(encoded))
+        else:
+            self.add_text(text)
+
+    def analyze(self, answer: str) -> CopyReport:
+        hashes = shingle_hashes(tokenize_words(answer), self.size)
+        if not hashes or not self._shingles:
+            return CopyReport(longest_run=0, overlap=0.0)
+
+        matched = 0
+        current = 0
+        longest = 0
+        for value in hashes:
+            if value in self._shingles:
+                matched += 1
+                current += 1
+                longest = max(longest, current)
+            else:
+                current = 0
+
+        longest_run = longest + self.size - 1 if longest else 0
+        return CopyReport(longest_run=longest_run, overlap=matched / len(hashes))
@@ -0,0 +1,190 @@
+import codecs
+import re
+import stat
+import threading
+import unicodedata
+from collections.abc import Iterable, Iterator
+from functools import lru_cache
+from pathlib import Path
+
+from rag.app.core.settings import get_settings
+from rag.app.services.language_detector import translation_group
+
+READ_BLOCK_BYTES = 1024 * 1024
+ENCODING_PROBE_BYTES = 64 * 1024
+
+_SPLIT_ACCENT_RE = re.compile(r"([A-Za-zÀ-ÿ])\s+([\u0300-\u036f])")
+_CARRIAGE_RETURN_RE = re.compile(r"\r\n?")
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
+# Last printable ASCII character: no normalization step joins it with the text before it.
+_SAFE_CUT_RE = re.compile(r"[!-~][^!-~]*\Z")
+_HANGUL_JAMO = re.compile(r"[\u1100-\u11ff\u3130-\u318f\ua960-\ua97f\ud7b0-\ud7ff]")
+
+
+def read_text_file(file_path: Path) -> str:
+    raw = file_path.read_bytes()
+    for encoding in ("utf-8", "latin-1"):
+        try:
+            return raw.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+    return raw.decode("utf-8", errors="ignore")
+
+
+def detect_encoding(prefix: bytes) -> str:
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(prefix, final=False)
+    except UnicodeDecodeError:
+        return "latin-1"
+    return "utf-8"
+
+
+def iter_text_blocks(file_path: Path, block_size: int = READ_BLOCK_BYTES) -> Iterator[str]:
+    """Decodes a file block by block; the encoding is detected on its first ``ENCODING_PROBE_BYTES``."""
+    with file_path.open("rb") as handle:
+        block = handle.read(block_size)
+        decoder = codecs.getincrementaldecoder(detect_encoding(block[:ENCODING_PROBE_BYTES]))(errors="ignore")
+        while block:
+            text = decoder.decode(block)
+            if text:
+                yield text
+            block = handle.read(block_size)
+        tail = decoder.decode(b"", final=True)
+        if tail:
+            yield tail
+
+
+def _normalize_piece(text: str) -> str:
+    text = text.replace("\ufeff", "")
+    # Fixes patterns like "Estagi ́ario" where combining accents are split by spaces.
+    text = _SPLIT_ACCENT_RE.sub(r"\1\2", text)
+    text = unicodedata.normalize("NFKC", text)
+    text = _CARRIAGE_RETURN_RE.sub("\n", text)
+    return _BLANK_LINES_RE.sub("\n\n", text)
+
+
+def normalize_text(raw_text: str) -> str:
+    return _normalize_piece(raw_text).strip()
+
+
+def _safe_cut(text: str, max_carry_chars: int) -> int:
+    match = _SAFE_CUT_RE.search(text)
+    if match is not None:
+        return match.start()
+    if len(text) <= max_carry_chars:
+        return 0
+    # No ASCII at all (e.g. CJK text): cut before the last character that cannot compose backwards.
+    for index in range(len(text) - 1, 0, -1):
+        char = text[index]
+        if char.isspace() or char == "\ufeff" or unicodedata.category(char).startswith("M"):
+            continue
+        if _HANGUL_JAMO.match(char):
+            continue
+        return index
+    return 0
+
+
+def iter_normalized_text(blocks: Iterable[str], max_carry_chars: int = READ_BLOCK_BYTES) -> Iterator[str]:
+    """Streaming ``normalize_text``: the yielded pieces concatenate to the same text.
+
+    Every block is cut right before its last safe character and the remainder is
+    carried into the next block, so no normalization rule sees a partial match.
+    """
+    carry = ""
+    started = False
+    for block in blocks:
+        text = carry + block
+        cut = _safe_cut(text, max_carry_chars)
+        carry = text[cut:]
+        piece = _normalize_piece(text[:cut])
+        if not started:
+            piece = piece.lstrip()
+            started = bool(piece)
+        if piece:
+            yield piece
+    piece = _normalize_piece(carry).rstrip()
+    if not started:
+        piece = piece.lstrip()
+    if piece:
+        yield piece
+
+
+def cacheable_upload_paths(file_paths: list[Path]) -> list[Path]:
+    # Only the fixed resume and its translations are read on the request path; ingestion streams the rest.
+    settings = get_settings()
+    resume_group = translation_group(settings.fixed_resume_filename, settings.translation_pairs)
+    return [
+        path
+        for path in file_paths
+        if path.name == settings.fixed_resume_filename
+        or translation_group(path.name, settings.translation_pairs) == resume_group
+    ]
+
+
+def file_signature(file_path: Path) -> tuple[int, int] | None:
+    try:
+        file_stat = file_path.stat()
+    except OSError:
+        return None
+    if not stat.S_ISREG(file_stat.st_mode):
+        return None
+    return file_stat.st_mtime_ns, file_stat.st_size
+
+
+class DocumentTextCache:
+    """Normalized upload texts keyed by path and invalidated by (mtime, size).
+
+    ``get`` never touches the disk for a cached path; freshness is maintained by
+    ``refresh``, which the upload watcher calls off the request path.
+    """
+
+    def __init__(self) -> None:
+        self._entries: dict[Path, tuple[tuple[int, int], str]] = {}
+        self._lock = threading.Lock()
+
+    def _load(self, file_path: Path) -> str:
+        signature = file_signature(file_path)
+        if signature is None:
+            with self._lock:
+                self._entries.pop(file_path, None)
+            return ""
+        text = normalize_text(read_text_file(file_path))
+        with self._lock:
+            self._entries[file_path] = (signature, text)
+        return text
+
+    def get(self, file_path: Path) -> str:
+        entry = self._entries.get(file_path)
+        if entry is not None:
+            return entry[1]
+        return self._load(file_path)
+
+    def refresh(self, file_paths: list[Path]) -> bool:
+        """Reloads changed files, drops vanished ones and reports whether anything changed."""
+        changed = False
+        wanted = set(file_paths)
+        with self._lock:
+            stale = [path for path in self._entries if path not in wanted]
+            for path in stale:
+                del self._entries[path]
+                changed = True
+
+        for file_path in file_paths:
+            entry = self._entries.get(file_path)
+            if entry is not None and entry[0] == file_signature(file_path):
+                continue
+            self._load(file_path)
+            changed = True
+        return changed
+
+    def paths(self) -> list[Path]:
+        return list(self._entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+@lru_cache
+def get_document_cache() -> DocumentTextCache:
+    return DocumentTextCache()
@@ -0,0 +1,106 @@
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any
+
+from langchain_core.embeddings import Embeddings
+
+from rag.app.core.metrics import observe_embedding_batch
+
+_Request = tuple[str, Future, float]
+
+
+def embeds_queries_as_documents(embeddings: Any) -> bool:
+    """False for models that encode queries differently from documents.
+
+    ``HuggingFaceEmbeddings`` applies ``query_encode_kwargs`` in ``embed_query`` only, and
+    sentence-transformers models may ship a "query" prompt (e5, bge, nomic). Their query
+    vectors cannot come from ``embed_documents``.
+    """
+    if getattr(embeddings, "query_encode_kwargs", None):
+        return False
+    prompts = getattr(getattr(embeddings, "_client", None), "prompts", None) or {}
+    return not prompts.get("query")
+
+
+class EmbeddingBatcher(Embeddings):
+    """Coalesces concurrent ``embed_query`` calls into one ``embed_documents`` call.
+
+    A single worker thread takes the first waiting query, keeps collecting for up
+    to ``max_wait_seconds`` or until ``max_batch_size`` queries are queued, then
+    encodes them together and resolves every caller's future. Document batches
+    (ingestion) go straight to the wrapped model.
+
+    Only valid for models where ``embeds_queries_as_documents`` holds, since the
+    batch goes through ``embed_documents``.
+    """
+
+    def __init__(
+        self,
+        embeddings: Any,
+        max_batch_size: int = 32,
+        max_wait_seconds: float = 0.002,
+        label: str = "sentence_transformers",
+    ) -> None:
+        self.embeddings = embeddings
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_seconds = max(0.0, max_wait_seconds)
+        self.label = label
+        self._queue: queue.SimpleQueue[_Request] = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    def _ensure_worker(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+                self._thread.start()
+
+    def _collect(self) -> list[_Request]:
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait_seconds
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+            started = time.perf_counter()
+            # Identical concurrent questions are encoded once.
+            texts = list(dict.fromkeys(text for text, _, _ in batch))
+            try:
+                vectors = dict(zip(texts, self.embeddings.embed_documents(texts)))
+            except Exception as exc:
+                for _, future, _ in batch:
+                    future.set_exception(exc)
+                continue
+            observe_embedding_batch(self.label, len(batch), [started - queued for _, _, queued in batch])
+            for text, future, _ in batch:
+                future.set_result(list(vectors[text]))
+
+    def submit(self, text: str) -> Future:
+        self._ensure_worker()
+        future: Future = Future()
+        self._queue.put((text, future, time.perf_counter()))
+        return future
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.submit(text).result()
+
+    async def aembed_query(self, text: str) -> list[float]:
+        return await asyncio.wrap_future(self.submit(text))
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self.embeddings.embed_documents(texts)
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        return await self.embeddings.aembed_documents(texts)
@@ -0,0 +1,126 @@
+import hashlib
+import sqlite3
+import threading
+import time
+import unicodedata
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+
+
+def normalize_query_text(text: str) -> str:
+    normalized = unicodedata.normalize("NFKC", text).casefold()
+    return " ".join(normalized.split())
+
+
+def build_cache_key(profile: str, normalized_text: str) -> str:
+    return hashlib.sha1(f"{profile}\0{normalized_text}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """Bounded LRU of query embeddings with TTL and an optional SQLite tier."""
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: float = 86400.0,
+        disk_path: Path | None = None,
+    ) -> None:
+        self._max_entries = max(1, max_entries)
+        self._ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, list[float]]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk: sqlite3.Connection | None = None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if disk_path is not None:
+            disk_path.parent.mkdir(parents=True, exist_ok=True)
+            self._disk = sqlite3.connect(str(disk_path), check_same_thread=False)
+            self._disk.execute(
+                "CREATE TABLE IF NOT EXISTS query_embeddings "
+                "(key TEXT PRIMARY KEY, created_at REAL NOT NULL, vector BLOB NOT NULL)"
+            )
+            self._disk.commit()
+
+    def _is_expired(self, created_at: float, now: float) -> bool:
+        return self._ttl_seconds > 0 and now - created_at > self._ttl_seconds
+
+    def _store_in_memory(self, key: str, created_at: float, vector: list[float]) -> None:
+        self._entries[key] = (created_at, vector)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _read_disk(self, key: str, now: float) -> tuple[float, list[float]] | None:
+        if self._disk is None:
+            return None
+        row = self._disk.execute(
+            "SELECT created_at, vector FROM query_embeddings WHERE key = ?",
+            (key,),
+        ).fetchone()
+        if row is None:
+            return None
+        created_at, blob = row
+        if self._is_expired(created_at, now):
+            self._disk.execute("DELETE FROM query_embeddings WHERE key = ?", (key,))
+            self._disk.commit()
+            return None
+        vector = array("d")
+        vector.frombytes(blob)
+        return created_at, vector.tolist()
+
+    def get(self, key: str) -> list[float] | None:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                created_at, vector = entry
+                if not self._is_expired(created_at, now):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return vector
+                del self._entries[key]
+
+            disk_entry = self._read_disk(key, now)
+            if disk_entry is not None:
+                self._store_in_memory(key, *disk_entry)
+                self.hits += 1
+                self.disk_hits += 1
+                return disk_entry[1]
+
+            self.misses += 1
+            return None
+
+    def set(self, key: str, vector: list[float]) -> None:
+        now = time.time()
+        with self._lock:
+            self._store_in_memory(key, now, vector)
+            if self._disk is not None:
+                self._disk.execute(
+                    "INSERT OR REPLACE INTO query_embeddings (key, created_at, vector) VALUES (?, ?, ?)",
+                    (key, now, array("d", vector).tobytes()),
+                )
+                self._disk.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            if self._disk is not None:
+                self._disk.execute("DELETE FROM query_embeddings")
+                self._disk.commit()
+
+    def stats(self) -> dict[str, int | float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self._max_entries,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
@@ -0,0 +1,196 @@
+import json
+import logging
+import os
+import random
+import time
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any
+
+from langchain_core.documents import Document
+
+from rag.app.core.metrics import record_event, timed
+from rag.app.services.vector_store import upsert_embeddings
+
+logger = logging.getLogger(__name__)
+
+# Called with the number of chunks written so far; chunks are streamed, so there is no total up front.
+ProgressCallback = Callable[[int], None]
+
+
+def _is_rate_limit_error(error: Exception) -> bool:
+    if "ratelimit" in type(error).__name__.lower():
+        return True
+    message = str(error).lower()
+    return "429" in message or "rate limit" in message or "rate_limit" in message
+
+
+def _batched(chunks: Iterable[Document], batch_size: int) -> Iterator[list[Document]]:
+    batch: list[Document] = []
+    for chunk in chunks:
+        batch.append(chunk)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class IngestionCheckpoint:
+    """Chunk ids already written by an interrupted run, appended after every batch.
+
+    The file is JSON Lines: a header with the run settings, then one array of
+    ids per written batch, so recording a batch costs the batch, not the corpus.
+    ``collection`` names the new version a full rebuild was writing, so a resumed
+    run continues there instead of starting another one.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.full_rebuild = False
+        self.collection: str | None = None
+        self.done_ids: set[str] = set()
+        self._header_written = False
+
+    def load(self) -> bool:
+        self._header_written = False
+        try:
+            lines = self.path.read_text(encoding="utf-8").splitlines()
+            header = json.loads(lines[0])
+        except (OSError, ValueError, IndexError):
+            return False
+        self.full_rebuild = bool(header.get("full_rebuild", False))
+        self.collection = header.get("collection")
+        self.done_ids = set()
+        for line in lines[1:]:
+            try:
+                self.done_ids.update(json.loads(line))
+            except ValueError:
+                # A batch cut off mid-write was not recorded; it is embedded again.
+                continue
+        return True
+
+    def save(self) -> None:
+        """Rewrites the whole file; only needed once per run, when the header changes."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        lines = [json.dumps({"full_rebuild": self.full_rebuild, "collection": self.collection})]
+        if self.done_ids:
+            lines.append(json.dumps(sorted(self.done_ids)))
+        tmp_path.write_text("".join(f"{line}\n" for line in lines), encoding="utf-8")
+        os.replace(tmp_path, self.path)
+        self._header_written = True
+
+    def record(self, ids: list[str]) -> None:
+        self.done_ids.update(ids)
+        if not self._header_written:
+            self.save()
+            return
+        with self.path.open("a", encoding="utf-8") as handle:
+            handle.write(json.dumps(ids) + "\n")
+
+    def clear(self) -> None:
+        self.done_ids.clear()
+        self._header_written = False
+        self.path.unlink(missing_ok=True)
+
+
+class EmbeddingPipeline:
+    """Embeds chunks in fixed-size batches on a bounded worker pool.
+
+    Workers only call the embedding model; writes to the vector store happen on
+    the calling thread, so the store never sees concurrent writers. Rate-limit
+    errors are retried with exponential backoff and jitter, and every written
+    batch is recorded in the checkpoint so a failed run can resume.
+    """
+
+    def __init__(
+        self,
+        embeddings: Any,
+        vector_store: Any,
+        batch_size: int = 64,
+        max_workers: int = 4,
+        max_retries: int = 5,
+        backoff_seconds: float = 1.0,
+        checkpoint: IngestionCheckpoint | None = None,
+        progress_callback: ProgressCallback | None = None,
+    ) -> None:
+        self._embeddings = embeddings
+        self._vector_store = vector_store
+        self._batch_size = max(1, batch_size)
+        self._max_workers = max(1, max_workers)
+        self._max_retries = max(0, max_retries)
+        self._backoff_seconds = backoff_seconds
+        self._checkpoint = checkpoint
+        self._progress_callback = progress_callback
+
+    def _embed_with_retry(self, texts: list[str]) -> list[list[float]]:
+        attempt = 0
+        while True:
+            try:
+                with timed("ingest_embed_batch"):
+                    return self._embeddings.embed_documents(texts)
+            except Exception as exc:
+                if attempt >= self._max_retries or not _is_rate_limit_error(exc):
+                    raise
+                record_event("ingest_rate_limit_retry")
+                delay = self._backoff_seconds * (2**attempt)
+                delay += random.uniform(0, delay)
+                logger.warning("Embedding rate limited; retrying in %.1fs (attempt %d).", delay, attempt + 1)
+                time.sleep(delay)
+                attempt += 1
+
+    def _write_batch(self, batch: list[Document], vectors: list[list[float]]) -> None:
+        ids = [str(chunk.metadata["chunk_id"]) for chunk in batch]
+        with timed("ingest_write_batch"):
+            upsert_embeddings(
+                self._vector_store,
+                ids=ids,
+                embeddings=vectors,
+                documents=[chunk.page_content for chunk in batch],
+                metadatas=[dict(chunk.metadata) for chunk in batch],
+            )
+        if self._checkpoint is not None:
+            self._checkpoint.record(ids)
+
+    def run(self, chunks: Iterable[Document]) -> int:
+        done_ids = self._checkpoint.done_ids if self._checkpoint is not None else set()
+        pending = (chunk for chunk in chunks if chunk.metadata["chunk_id"] not in done_ids)
+        written = 0
+
+        with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+            in_flight: dict[Future[list[list[float]]], list[Document]] = {}
+            batches = _batched(pending, self._batch_size)
+            exhausted = False
+            while in_flight or not exhausted:
+                # Keep a bounded number of batches in memory regardless of corpus size.
+                while not exhausted and len(in_flight) < self._max_workers * 2:
+                    batch = next(batches, None)
+                    if batch is None:
+                        exhausted = True
+                        break
+                    texts = [chunk.page_content for chunk in batch]
+                    in_flight[executor.submit(self._embed_with_retry, texts)] = batch
+
+                if not in_flight:
+                    break
+                completed, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                failure: BaseException | None = None
+                for future in completed:
+                    batch = in_flight.pop(future)
+                    error = future.exception()
+                    if error is not None:
+                        failure = failure or error
+                        continue
+                    self._write_batch(batch, future.result())
+                    written += len(batch)
+                    if self._progress_callback is not None:
+                        self._progress_callback(written)
+                if failure is not None:
+                    # Successful batches above are checkpointed; the next run resumes after them.
+                    for future in in_flight:
+                        future.cancel()
+                    raise failure
+
+        return written
@@ -0,0 +1,220 @@
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Literal
+
+from rag.app.core.paths import INGEST_JOBS_DIR
+from rag.app.core.settings import get_settings
+from rag.app.services.ingestion_service import IngestionService, ingestion_lock
+from rag.app.services.vector_store import get_active_collection_name
+
+logger = logging.getLogger(__name__)
+
+JobStatus = Literal["queued", "running", "succeeded", "failed"]
+
+
+@dataclass
+class IngestionJob:
+    id: str
+    reason: str
+    reset_collection: bool = False
+    status: JobStatus = "queued"
+    created_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    embedded_chunks: int = 0
+    coalesced_requests: int = 0
+    result: dict[str, int] | None = None
+    error: str | None = None
+    # Collection a rebuild was requested against; used to skip rebuilds another worker already swapped in.
+    _replaces: str | None = field(default=None, repr=False)
+    _done: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "id": self.id,
+            "reason": self.reason,
+            "reset_collection": self.reset_collection,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "embedded_chunks": self.embedded_chunks,
+            "coalesced_requests": self.coalesced_requests,
+            "result": self.result,
+            "error": self.error,
+        }
+
+    def wait(self, timeout: float | None = None) -> bool:
+        return self._done.wait(timeout)
+
+
+_persist_lock = threading.Lock()
+
+
+def _persist(job: IngestionJob) -> None:
+    # Job state lives on disk too, so any uvicorn worker can answer GET /rag/jobs/{id}.
+    # The request thread and the job thread both write it; snapshotting under the lock
+    # keeps them off the same temp file and never lets an older state land last.
+    with _persist_lock:
+        snapshot = job.snapshot()
+        INGEST_JOBS_DIR.mkdir(parents=True, exist_ok=True)
+        path = INGEST_JOBS_DIR / f"{snapshot['id']}.json"
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(snapshot), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+
+def _prune_job_files(jobs_dir: Path, keep: int, max_age_seconds: float) -> None:
+    # Only finished jobs are removed: the newest `keep` survive unless they are older than `max_age_seconds`.
+    finished: list[tuple[float, Path]] = []
+    for path in jobs_dir.glob("*.json"):
+        try:
+            snapshot = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            continue
+        if snapshot.get("status") in ("succeeded", "failed") and snapshot.get("finished_at"):
+            finished.append((snapshot["finished_at"], path))
+    finished.sort(reverse=True)
+    cutoff = time.time() - max_age_seconds
+    for position, (finished_at, path) in enumerate(finished):
+        if position >= keep or finished_at < cutoff:
+            path.unlink(missing_ok=True)
+
+
+class IngestionJobQueue:
+    """Runs ingestion jobs one at a time on a background thread.
+
+    There is at most one queued job: requests that arrive while it waits join
+    it instead of adding another full scan, since every run ingests the whole
+    uploads directory. Runs are serialized across processes by ``ingestion_lock``.
+    """
+
+    def __init__(
+        self,
+        max_history: int = 100,
+        retention_seconds: float = 7 * 24 * 3600.0,
+        progress_interval_seconds: float = 0.5,
+    ) -> None:
+        self._max_history = max_history
+        self._retention_seconds = retention_seconds
+        self._progress_interval_seconds = progress_interval_seconds
+        self._jobs: OrderedDict[str, IngestionJob] = OrderedDict()
+        self._queued: IngestionJob | None = None
+        self._running: IngestionJob | None = None
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._thread: threading.Thread | None = None
+
+    def submit(self, reason: str, reset_collection: bool = False) -> IngestionJob:
+        with self._lock:
+            job = self._queued
+            if job is not None:
+                job.coalesced_requests += 1
+            else:
+                job = IngestionJob(id=uuid.uuid4().hex, reason=reason)
+                self._queued = job
+                self._jobs[job.id] = job
+                while len(self._jobs) > self._max_history:
+                    self._jobs.popitem(last=False)
+                self._ensure_worker()
+                self._wake.notify()
+            if reset_collection and not job.reset_collection:
+                job.reset_collection = True
+                job._replaces = get_active_collection_name()
+        _persist(job)
+        return job
+
+    def active(self) -> IngestionJob | None:
+        with self._lock:
+            return self._queued or self._running
+
+    def get(self, job_id: str) -> dict[str, Any] | None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                return job.snapshot()
+        path = INGEST_JOBS_DIR / f"{job_id}.json"
+        if not job_id.isalnum() or not path.exists():
+            return None
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def _ensure_worker(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="ingestion-jobs", daemon=True)
+            self._thread.start()
+
+    def _next_job(self) -> IngestionJob:
+        with self._lock:
+            while self._queued is None:
+                self._wake.wait()
+            job = self._queued
+            self._queued = None
+            self._running = job
+            job.status = "running"
+            job.started_at = time.time()
+            return job
+
+    def _run(self) -> None:
+        while True:
+            job = self._next_job()
+            _persist(job)
+            try:
+                job.result = self._ingest(job)
+                job.status = "succeeded"
+            except Exception as exc:
+                logger.exception("Ingestion job %s failed.", job.id)
+                job.error = str(exc) or type(exc).__name__
+                job.status = "failed"
+            job.finished_at = time.time()
+            with self._lock:
+                self._running = None
+            _persist(job)
+            job._done.set()
+            try:
+                _prune_job_files(INGEST_JOBS_DIR, self._max_history, self._retention_seconds)
+            except OSError:
+                logger.warning("Could not prune finished ingestion job files.", exc_info=True)
+
+    def _ingest(self, job: IngestionJob) -> dict[str, int]:
+        last_persist = 0.0
+
+        def on_progress(done: int) -> None:
+            nonlocal last_persist
+            job.embedded_chunks = done
+            now = time.monotonic()
+            if now - last_persist >= self._progress_interval_seconds:
+                last_persist = now
+                _persist(job)
+
+        # Held across the alias check and the run, so no other rebuild can swap in between.
+        with ingestion_lock():
+            if job.reset_collection and job._replaces != get_active_collection_name():
+                # Single flight across workers: another process rebuilt and swapped while this job waited.
+                logger.info("Ingestion job %s skips its rebuild; the collection was already replaced.", job.id)
+                job.reset_collection = False
+            result = IngestionService().ingest_uploads_to_vector_db(
+                reset_collection=job.reset_collection,
+                progress_callback=on_progress,
+            )
+        logger.info("Ingestion job %s (%s) finished: %s", job.id, job.reason, result)
+        return result
+
+
+@lru_cache
+def get_ingestion_jobs() -> IngestionJobQueue:
+    settings = get_settings()
+    return IngestionJobQueue(
+        max_history=settings.ingest_job_history,
+        retention_seconds=settings.ingest_job_retention_seconds,
+    )
@@ -1,97 +1,617 @@
-import re
-import unicodedata
+import fcntl
+import hashlib
+import itertools
+import json
+import logging
+import multiprocessing
+import os
+import threading
+import uuid
+from collections import deque
+from collections.abc import Iterable, Iterator, Set
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
-from uuid import uuid4
+from typing import Any, BinaryIO
 
 from fastapi import HTTPException
 from langchain_core.documents import Document
-from langchain_text_splitters import RecursiveCharacterTextSplitter
 
-from rag.app.core.paths import UPLOADS_DIR
+from rag.app.core.metrics import record_event, timed
+from rag.app.core.paths import UPLOADS_DIR, VECTOR_DB_DIR, ensure_rag_dirs
 from rag.app.core.settings import get_settings
-from rag.app.services.vector_store import get_vector_store
+from rag.app.services.copy_detector import encode_shingles, text_shingles
+from rag.app.services.document_cache import (
+    cacheable_upload_paths,
+    file_signature,
+    get_document_cache,
+    iter_normalized_text,
+    iter_text_blocks,
+)
+from rag.app.services.embedding_pipeline import EmbeddingPipeline, IngestionCheckpoint, ProgressCallback
+from rag.app.services.language_detector import Language, detect_language, translation_group
+from rag.app.services.lexical_index import rebuild_lexical_index
+from rag.app.services.vector_store import (
+    activate_collection,
+    collection_artifact_path,
+    count_vectors,
+    create_collection_version,
+    get_embeddings,
+    get_vector_store,
+    mark_collection_changed,
+    open_vector_store,
+)
 
+logger = logging.getLogger(__name__)
 
-def _read_text_file(file_path: Path) -> str:
-    raw = file_path.read_bytes()
-    for encoding in ("utf-8", "latin-1"):
+INGEST_LOCK_PATH = VECTOR_DB_DIR / ".ingest.lock"
+_ingest_lock_depth = threading.local()
+
+# Bump when chunk text or metadata layout changes so existing manifests force a full rebuild.
+PIPELINE_VERSION = 4
+# Same separators and order as the LangChain RecursiveCharacterTextSplitter the chunks were first built with.
+SPLIT_SEPARATORS = ["\n\n", "\n", ". ", " ", ""]
+
+# Chunk id, text, encoded shingles (None for chunks the store already has) and detected language.
+ChunkRecord = tuple[str, str, str | None, Language]
+
+
+def _file_sha256(file_path: Path) -> str:
+    digest = hashlib.sha256()
+    with file_path.open("rb") as handle:
+        for block in iter(lambda: handle.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _chunk_id(source_name: str, occurrence: int, text: str) -> str:
+    # Same file + same text always yields the same id, so unchanged chunks are never re-embedded.
+    raw = f"{source_name}\0{occurrence}\0{text}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class _StreamingSplitter:
+    """Streaming ``RecursiveCharacterTextSplitter.split_text`` for ``SPLIT_SEPARATORS``.
+
+    Text is split at ``separators[0]`` as it arrives (separator kept at the start
+    of each split) and short splits are merged with the splitter's greedy rule and
+    overlap. A split that reaches ``chunk_size`` flushes the merge and is streamed
+    into a splitter for the next separator, as the recursive splitter would split
+    it on its own. Only the merge in progress and the current split are held, and
+    the chunks are the same as splitting the whole text at once.
+    """
+
+    def __init__(self, chunk_size: int, chunk_overlap: int, separators: list[str]) -> None:
+        self._chunk_size = chunk_size
+        self._chunk_overlap = chunk_overlap
+        self._separator = separators[0]
+        self._next_separators = separators[1:]
+        # Unprocessed text of the current split; a separator starting before `_search_from` was already handled.
+        self._pending = ""
+        self._search_from = 0
+        # Set once the current split reached chunk_size; it receives the split's text as it arrives.
+        self._child: _StreamingSplitter | None = None
+        self._merge: deque[str] = deque()
+        self._merge_chars = 0
+        self._chunks: list[str] = []
+
+    def feed(self, text: str) -> list[str]:
+        if not self._separator:
+            for char in text:
+                self._add_short_split(char)
+            return self._take_chunks()
+        pending = self._pending + text
+        start = 0
+        search_from = self._search_from
+        while (index := pending.find(self._separator, search_from)) != -1:
+            self._end_split(pending[start:index])
+            start = index
+            search_from = index + len(self._separator)
+        self._pending = pending[start:]
+        self._search_from = search_from - start
+        # The last characters may start a separator that ends in the next piece.
+        handoff = max(0, len(self._pending) - len(self._separator) + 1)
+        if self._child is None and handoff >= self._chunk_size:
+            self._flush_merge()
+            self._child = _StreamingSplitter(self._chunk_size, self._chunk_overlap, self._next_separators)
+        if self._child is not None:
+            self._chunks.extend(self._child.feed(self._pending[:handoff]))
+            self._pending = self._pending[handoff:]
+            self._search_from = max(0, self._search_from - handoff)
+        return self._take_chunks()
+
+    def close(self) -> list[str]:
+        self._end_split(self._pending)
+        self._pending = ""
+        self._flush_merge()
+        return self._take_chunks()
+
+    def _end_split(self, text: str) -> None:
+        if self._child is not None:
+            self._chunks.extend(self._child.feed(text))
+            self._chunks.extend(self._child.close())
+            self._child = None
+        elif len(text) >= self._chunk_size:
+            self._flush_merge()
+            child = _StreamingSplitter(self._chunk_size, self._chunk_overlap, self._next_separators)
+            self._chunks.extend(child.feed(text))
+            self._chunks.extend(child.close())
+        elif text:
+            self._add_short_split(text)
+
+    def _add_short_split(self, split: str) -> None:
+        if self._merge_chars + len(split) > self._chunk_size and self._merge:
+            self._emit_merge()
+            while self._merge_chars > self._chunk_overlap or (
+                self._merge_chars + len(split) > self._chunk_size and self._merge_chars > 0
+            ):
+                self._merge_chars -= len(self._merge.popleft())
+        self._merge.append(split)
+        self._merge_chars += len(split)
+
+    def _emit_merge(self) -> None:
+        chunk = "".join(self._merge).strip()
+        if chunk:
+            self._chunks.append(chunk)
+
+    def _flush_merge(self) -> None:
+        if self._merge:
+            self._emit_merge()
+        self._merge.clear()
+        self._merge_chars = 0
+
+    def _take_chunks(self) -> list[str]:
+        chunks, self._chunks = self._chunks, []
+        return chunks
+
+
+def _iter_chunk_texts(
+    pieces: Iterable[str],
+    chunk_size: int,
+    chunk_overlap: int,
+    min_chars: int,
+) -> Iterator[str]:
+    """Splits streamed text into the chunks a whole-text split would give; nothing for texts under ``min_chars``."""
+    splitter = _StreamingSplitter(chunk_size, chunk_overlap, SPLIT_SEPARATORS)
+    seen_chars = 0
+    held: list[str] = []
+    for piece in pieces:
+        seen_chars += len(piece)
+        with timed("ingest_split"):
+            held.extend(splitter.feed(piece))
+        if seen_chars >= min_chars:
+            yield from held
+            held.clear()
+    with timed("ingest_split"):
+        held.extend(splitter.close())
+    if seen_chars >= min_chars:
+        yield from held
+
+
+def _iter_chunk_records(
+    file_path: Path,
+    chunk_size: int,
+    chunk_overlap: int,
+    min_chars: int,
+    shingle_size: int,
+    known_ids: Set[str],
+) -> Iterator[ChunkRecord]:
+    occurrences: dict[bytes, int] = {}
+    language: Language = "en"
+    pieces = iter_normalized_text(iter_text_blocks(file_path))
+    for text in _iter_chunk_texts(pieces, chunk_size, chunk_overlap, min_chars):
+        # Keyed by digest so repeated-chunk bookkeeping does not keep every chunk text alive.
+        key = hashlib.sha1(text.encode("utf-8")).digest()
+        occurrence = occurrences.get(key, 0)
+        occurrences[key] = occurrence + 1
+        chunk_id = _chunk_id(file_path.name, occurrence, text)
+        # Precomputed so the query-time copy check never re-tokenizes retrieved chunks.
+        shingles = None if chunk_id in known_ids else encode_shingles(text_shingles(text, shingle_size))
+        # Chunks without a clear signal (tables, link lists) inherit the language of the text before them.
+        language = detect_language(text, default=language)
+        yield chunk_id, text, shingles, language
+
+
+def _chunk_file(
+    file_path: Path,
+    chunk_size: int,
+    chunk_overlap: int,
+    min_chars: int,
+    shingle_size: int,
+    known_ids: Set[str],
+) -> list[ChunkRecord]:
+    # Process-pool entry point; returns plain tuples so results pickle cheaply.
+    return list(_iter_chunk_records(file_path, chunk_size, chunk_overlap, min_chars, shingle_size, known_ids))
+
+
+class _ChunkPlan:
+    """Streams the chunks that need embedding and records the manifest entries and stale ids on the way.
+
+    Changed files are normalized and split in the calling thread, or on a
+    process pool when ``INGEST_PROCESS_WORKERS`` allows it and the changed bytes
+    exceed ``INGEST_PROCESS_MIN_BYTES``. Results are consumed in upload order
+    either way, so chunk ids and batch order do not depend on the mode.
+    """
+
+    def __init__(self, previous_files: dict[str, dict[str, Any]], chunk_size: int, chunk_overlap: int) -> None:
+        settings = get_settings()
+        self._previous_files = previous_files
+        self._translation_pairs = settings.translation_pairs
+        self._chunk_args = (
+            chunk_size,
+            chunk_overlap,
+            settings.min_document_chars,
+            settings.paraphrase_max_verbatim_words + 1,
+        )
+        self.current_files: dict[str, dict[str, Any]] = {}
+        self.ids_to_delete: list[str] = []
+        self.documents = 0
+        self.unchanged_documents = 0
+        self.skipped_too_small = 0
+
+    def _iter_serial(self, changed: list[tuple[Path, frozenset[str]]]) -> Iterator[Iterable[ChunkRecord]]:
+        for file_path, known_ids in changed:
+            yield _iter_chunk_records(file_path, *self._chunk_args, known_ids)
+
+    def _iter_parallel(
+        self,
+        changed: list[tuple[Path, frozenset[str]]],
+        workers: int,
+    ) -> Iterator[Iterable[ChunkRecord]]:
+        # Spawned workers never inherit the API's threads or open store handles.
+        executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        pending: deque[Future[list[ChunkRecord]]] = deque()
+        try:
+            for file_path, known_ids in changed:
+                pending.append(executor.submit(_chunk_file, file_path, *self._chunk_args, known_ids))
+                # A bounded look-ahead keeps memory flat while workers stay busy.
+                if len(pending) >= workers * 2:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _iter_file_records(self, changed: list[tuple[Path, frozenset[str]]]) -> Iterator[Iterable[ChunkRecord]]:
+        settings = get_settings()
+        workers = min(settings.ingest_process_workers, len(changed))
+        changed_bytes = sum((file_signature(file_path) or (0, 0))[1] for file_path, _ in changed)
+        if workers < 2 or changed_bytes < settings.ingest_process_min_bytes:
+            # Spawning workers costs more than it saves on small changes.
+            return self._iter_serial(changed)
+        record_event("ingest_parallel_preprocess")
+        return self._iter_parallel(changed, workers)
+
+    def iter_new_chunks(self, upload_files: list[Path]) -> Iterator[Document]:
+        changed: list[tuple[Path, str, frozenset[str]]] = []
+        for file_path in upload_files:
+            file_hash = _file_sha256(file_path)
+            previous = self._previous_files.get(file_path.name)
+            if previous is not None and previous.get("sha256") == file_hash:
+                self.current_files[file_path.name] = previous
+                if previous.get("chunk_ids"):
+                    self.documents += 1
+                    self.unchanged_documents += 1
+                else:
+                    self.skipped_too_small += 1
+                continue
+            known_ids = frozenset(previous.get("chunk_ids", [])) if previous else frozenset()
+            changed.append((file_path, file_hash, known_ids))
+
+        file_records = self._iter_file_records([(file_path, known_ids) for file_path, _, known_ids in changed])
+        for (file_path, file_hash, previous_ids), records in zip(changed, file_records):
+            metadata = {
+                "document_id": hashlib.sha1(file_path.name.encode("utf-8")).hexdigest(),
+                "source_name": file_path.name,
+                "source_path": str(file_path),
+                # Translations of one upload share this key, so retrieval can keep one language per fact.
+                "translation_group": translation_group(file_path.name, self._translation_pairs),
+            }
+            chunk_ids: list[str] = []
+            for chunk_id, text, shingles, language in records:
+                chunk_ids.append(chunk_id)
+                if shingles is not None:
+                    yield Document(
+                        page_content=text,
+                        metadata={
+                            **metadata,
+                            "language": language,
+                            "chunk_id": chunk_id,
+                            "shingle_size": self._chunk_args[3],
+                            "shingles": shingles,
+                        },
+                    )
+
+            if chunk_ids:
+                self.documents += 1
+            else:
+                self.skipped_too_small += 1
+            self.ids_to_delete.extend(previous_ids.difference(chunk_ids))
+            self.current_files[file_path.name] = {"sha256": file_hash, "chunk_ids": chunk_ids}
+
+        for name, previous in self._previous_files.items():
+            if name not in self.current_files:
+                self.ids_to_delete.extend(previous.get("chunk_ids", []))
+
+
+def _manifest_path(collection_name: str | None = None) -> Path:
+    return collection_artifact_path(".manifest.json", collection_name)
+
+
+def _load_manifest() -> dict[str, Any] | None:
+    path = _manifest_path()
+    if not path.exists():
+        return None
+    try:
+        manifest = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if manifest.get("pipeline_version") != PIPELINE_VERSION:
+        return None
+    settings = get_settings()
+    if manifest.get("vector_backend", "chroma") != settings.vector_backend:
+        return None
+    if manifest.get("translation_pairs", {}) != settings.translation_pairs:
+        # Translation groups are stored on every chunk.
+        return None
+    return manifest
+
+
+def _save_manifest(manifest: dict[str, Any], collection_name: str | None = None) -> None:
+    ensure_rag_dirs()
+    path = _manifest_path(collection_name)
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+def list_upload_files() -> list[Path]:
+    return [
+        path
+        for path in sorted(UPLOADS_DIR.glob("*"))
+        # Dotfiles cover .gitkeep and uploads still being written by POST /rag/uploads.
+        if path.is_file() and not path.name.startswith(".")
+    ]
+
+
+def upload_file_name(filename: str) -> str:
+    name = Path(filename.replace("\\", "/")).name
+    if not name or name.startswith("."):
+        raise HTTPException(status_code=400, detail=f"Invalid upload file name: {filename!r}")
+    return name
+
+
+def _upload_exists_error(name: str) -> HTTPException:
+    return HTTPException(status_code=409, detail=f"{name} already exists; upload with overwrite=true to replace it.")
+
+
+def ensure_upload_absent(name: str) -> None:
+    if (UPLOADS_DIR / name).exists():
+        raise _upload_exists_error(name)
+
+
+def save_upload(filename: str, source: BinaryIO, overwrite: bool = False) -> str:
+    """Copies an uploaded file into ``UPLOADS_DIR`` atomically and returns its stored name.
+
+    An existing file with the same name is only replaced when ``overwrite`` is set (409 otherwise).
+    """
+    name = upload_file_name(filename)
+    if not overwrite:
+        ensure_upload_absent(name)
+    max_bytes = get_settings().upload_max_bytes
+    ensure_rag_dirs()
+    # Hidden until complete, so neither the watcher nor a running job reads a partial file.
+    tmp_path = UPLOADS_DIR / f".{name}.{uuid.uuid4().hex}.part"
+    written = 0
+    try:
+        with tmp_path.open("wb") as handle:
+            for block in iter(lambda: source.read(1024 * 1024), b""):
+                written += len(block)
+                if written > max_bytes:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"{name} exceeds the {max_bytes} byte upload limit (UPLOAD_MAX_BYTES).",
+                    )
+                handle.write(block)
+        if overwrite:
+            os.replace(tmp_path, UPLOADS_DIR / name)
+        else:
+            try:
+                # Unlike os.replace, linking fails if another request stored the name in the meantime.
+                os.link(tmp_path, UPLOADS_DIR / name)
+            except FileExistsError:
+                raise _upload_exists_error(name) from None
+    finally:
+        tmp_path.unlink(missing_ok=True)
+    return name
+
+
+@contextmanager
+def ingestion_lock() -> Iterator[None]:
+    """Serializes ingestion runs across threads and processes; re-entrant within a thread.
+
+    Every run goes through it, including one-off calls from scripts and CI, so two
+    rebuilds never pick the same collection version or write the same manifest.
+    """
+    depth = getattr(_ingest_lock_depth, "value", 0)
+    if depth:
+        _ingest_lock_depth.value = depth + 1
         try:
-            return raw.decode(encoding)
-        except UnicodeDecodeError:
-            continue
-    return raw.decode("utf-8", errors="ignore")
+            yield
+        finally:
+            _ingest_lock_depth.value = depth
+        return
+    ensure_rag_dirs()
+    with INGEST_LOCK_PATH.open("w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        _ingest_lock_depth.value = 1
+        try:
+            yield
+        finally:
+            _ingest_lock_depth.value = 0
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
 
 
-def _normalize_text(raw_text: str) -> str:
-    text = raw_text.replace("\ufeff", "")
-    # Fixes patterns like "Estagi ́ario" where combining accents are split by spaces.
-    text = re.sub(r"([A-Za-zÀ-ÿ])\s+([\u0300-\u036f])", r"\1\2", text)
-    text = unicodedata.normalize("NFKC", text)
-    text = re.sub(r"\r\n?", "\n", text)
-    text = re.sub(r"\n{3,}", "\n\n", text)
-    return text.strip()
+def _log_progress(done: int) -> None:
+    logger.info("Embedded %d chunks.", done)
 
 
 class IngestionService:
+    @staticmethod
+    def _build_pipeline(
+        vector_store: Any,
+        checkpoint: IngestionCheckpoint,
+        progress_callback: ProgressCallback | None,
+    ) -> EmbeddingPipeline:
+        settings = get_settings()
+        # Local models already batch inside encode() and are CPU bound; one worker avoids contention.
+        max_workers = 1 if settings.embeddings_provider == "sentence_transformers" else settings.ingest_max_workers
+        return EmbeddingPipeline(
+            embeddings=get_embeddings(),
+            vector_store=vector_store,
+            batch_size=settings.ingest_batch_size,
+            max_workers=max_workers,
+            max_retries=settings.ingest_max_retries,
+            backoff_seconds=settings.ingest_backoff_seconds,
+            checkpoint=checkpoint,
+            progress_callback=progress_callback or _log_progress,
+        )
+
     def ingest_uploads_to_vector_db(
         self,
         chunk_size: int = 900,
         chunk_overlap: int = 180,
-        reset_collection: bool = True,
+        reset_collection: bool = False,
+        progress_callback: ProgressCallback | None = None,
+    ) -> dict[str, int]:
+        """Indexes ``UPLOADS_DIR`` into the vector store.
+
+        By default only files whose content hash changed since the last run are
+        re-chunked; chunks keep content-derived ids, so only new chunks are
+        embedded and stale ones are deleted. ``reset_collection=True`` (or a
+        missing/outdated manifest) rebuilds the collection from scratch. A run
+        interrupted mid-embedding resumes from its checkpoint on the next call.
+        Runs hold ``ingestion_lock`` and wait for any run already in progress.
+        """
+        with ingestion_lock(), timed("ingest_total"):
+            result = self._ingest(chunk_size, chunk_overlap, reset_collection, progress_callback)
+        record_event("ingest_run")
+        record_event("ingest_chunks_added", result.get("added_chunks", 0))
+        record_event("ingest_chunks_deleted", result.get("deleted_chunks", 0))
+        return result
+
+    def _ingest(
+        self,
+        chunk_size: int,
+        chunk_overlap: int,
+        reset_collection: bool,
+        progress_callback: ProgressCallback | None,
     ) -> dict[str, int]:
-        settings = get_settings()
         if chunk_overlap >= chunk_size:
             raise HTTPException(status_code=400, detail="chunk_overlap must be smaller than chunk_size")
 
-        upload_files = [
-            path
-            for path in sorted(UPLOADS_DIR.glob("*"))
-            if path.is_file() and path.name != ".gitkeep"
-        ]
-        if not upload_files:
-            return {"documents": 0, "chunks": 0}
-
-        splitter = RecursiveCharacterTextSplitter(
-            chunk_size=chunk_size,
-            chunk_overlap=chunk_overlap,
-            separators=["\n\n", "\n", ". ", " ", ""],
-        )
+        upload_files = list_upload_files()
+        get_document_cache().refresh(cacheable_upload_paths(upload_files))
+        checkpoint = IngestionCheckpoint(collection_artifact_path(".checkpoint.jsonl"))
+        resuming = not reset_collection and checkpoint.load()
+        if reset_collection:
+            checkpoint.clear()
 
-        documents: list[Document] = []
-        skipped_too_small = 0
-        for file_path in upload_files:
-            text = _normalize_text(_read_text_file(file_path))
-            if not text:
-                continue
-            if len(text) < settings.min_document_chars:
-                skipped_too_small += 1
-                continue
-            documents.append(
-                Document(
-                    page_content=text,
-                    metadata={
-                        "document_id": uuid4().hex,
-                        "source_name": file_path.name,
-                        "source_path": str(file_path),
-                    },
-                )
+        manifest = None if reset_collection else _load_manifest()
+        previous_files: dict[str, dict[str, Any]] = {}
+        vector_store = get_vector_store()
+        if resuming and checkpoint.full_rebuild:
+            # The interrupted run already reset the collection; only its checkpointed chunks are stored.
+            manifest = None
+        elif manifest is not None:
+            previous_files = manifest.get("files", {})
+            expected_chunks = sum(len(entry.get("chunk_ids", [])) for entry in previous_files.values())
+            same_chunking = (
+                manifest.get("chunk_size") == chunk_size and manifest.get("chunk_overlap") == chunk_overlap
             )
+            # A manifest that disagrees with the store (deleted DB, partial write) cannot be diffed against.
+            in_sync = resuming or count_vectors(vector_store) == expected_chunks
+            if not same_chunking or not in_sync:
+                manifest = None
+                previous_files = {}
+                resuming = False
+                checkpoint.clear()
 
-        if not documents:
-            return {"documents": 0, "chunks": 0, "skipped_too_small": skipped_too_small}
+        full_rebuild = manifest is None
+        if full_rebuild and not upload_files:
+            return {"documents": 0, "chunks": 0}
 
-        chunks = splitter.split_documents(documents)
-        if not chunks:
-            return {"documents": len(documents), "chunks": 0, "skipped_too_small": skipped_too_small}
+        plan = _ChunkPlan(previous_files, chunk_size, chunk_overlap)
+        # Chunks are produced lazily; the pipeline keeps only a few batches in memory at a time.
+        chunks = plan.iter_new_chunks(upload_files)
+        # Full rebuilds write a new collection version; queries keep using the active one until the swap.
+        build_collection: str | None = None
+        if resuming and checkpoint.full_rebuild and checkpoint.collection:
+            build_collection = checkpoint.collection
+            vector_store = open_vector_store(build_collection)
+        elif full_rebuild and not resuming:
+            first_chunk = next(chunks, None)
+            if first_chunk is None:
+                return {"documents": plan.documents, "chunks": 0, "skipped_too_small": plan.skipped_too_small}
+            chunks = itertools.chain([first_chunk], chunks)
+            build_collection, vector_store = create_collection_version()
 
-        vector_store = get_vector_store()
-        if reset_collection:
-            vector_store.delete_collection()
-            vector_store = get_vector_store()
+        checkpoint.full_rebuild = full_rebuild
+        checkpoint.collection = build_collection
+        pipeline = self._build_pipeline(vector_store, checkpoint, progress_callback)
+        try:
+            added_chunks = pipeline.run(chunks)
+        except Exception:
+            if build_collection is None:
+                # Batches written before the failure are already visible to queries.
+                mark_collection_changed()
+            raise
 
-        ids = [uuid4().hex for _ in chunks]
-        for idx, chunk in enumerate(chunks):
-            chunk.metadata["chunk_id"] = ids[idx]
+        current_files = plan.current_files
+        ids_to_delete = plan.ids_to_delete
+        if resuming:
+            # Chunks written by the interrupted run that no longer belong to any upload.
+            current_ids = {chunk_id for entry in current_files.values() for chunk_id in entry["chunk_ids"]}
+            ids_to_delete.extend(checkpoint.done_ids.difference(current_ids))
+        if ids_to_delete:
+            with timed("ingest_delete"):
+                vector_store.delete(ids=ids_to_delete)
 
-        vector_store.add_documents(chunks, ids=ids)
-        return {"documents": len(documents), "chunks": len(chunks), "skipped_too_small": skipped_too_small}
+        manifest = {
+            "pipeline_version": PIPELINE_VERSION,
+            "vector_backend": get_settings().vector_backend,
+            "translation_pairs": get_settings().translation_pairs,
+            "chunk_size": chunk_size,
+            "chunk_overlap": chunk_overlap,
+            "files": current_files,
+        }
+        if build_collection is not None:
+            expected_chunks = sum(len(entry["chunk_ids"]) for entry in current_files.values())
+            stored_chunks = count_vectors(vector_store)
+            if stored_chunks != expected_chunks:
+                checkpoint.clear()
+                raise RuntimeError(
+                    f"Rebuilt collection {build_collection} holds {stored_chunks} chunks instead of "
+                    f"{expected_chunks}; the active collection was kept."
+                )
+            with timed("lexical_rebuild"):
+                rebuild_lexical_index(vector_store, build_collection)
+            _save_manifest(manifest, build_collection)
+            # The checkpoint belongs to the collection being replaced, so clear it before the swap.
+            checkpoint.clear()
+            activate_collection(build_collection)
+        else:
+            if ids_to_delete or added_chunks:
+                mark_collection_changed()
+                with timed("lexical_rebuild"):
+                    rebuild_lexical_index(vector_store)
+            _save_manifest(manifest)
+            checkpoint.clear()
+        return {
+            "documents": plan.documents,
+            "chunks": sum(len(entry["chunk_ids"]) for entry in current_files.values()),
+            "added_chunks": added_chunks,
+            "deleted_chunks": len(ids_to_delete),
+            "unchanged_documents": plan.unchanged_documents,
+            "skipped_too_small": plan.skipped_too_small,
+        }
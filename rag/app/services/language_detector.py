@@ -0,0 +1,61 @@
+import re
+from collections.abc import Mapping
+from pathlib import PurePath
+from typing import Literal
+
+Language = Literal["pt", "en"]
+
+# Function words only; words both languages use ("a", "as", "no", "me") would not discriminate.
+PT_STOPWORDS = frozenset(
+    (
+        "o", "e", "de", "do", "da", "dos", "das", "em", "um", "uma", "para", "com", "não", "nao", "os",
+        "na", "nas", "nos", "por", "pelo", "pela", "mais", "como", "mas", "foi", "ao", "aos", "seu", "sua",
+        "seus", "suas", "ou", "ser", "quando", "muito", "já", "eu", "também", "tambem", "até", "isso",
+        "entre", "sem", "meu", "minha", "meus", "minhas", "são", "é", "está", "sobre", "onde", "cada",
+        "pelos", "pelas", "num", "numa", "esse", "essa", "este", "esta", "você", "voce", "uso", "usando",
+    )
+)
+EN_STOPWORDS = frozenset(
+    (
+        "the", "of", "and", "to", "in", "is", "that", "for", "it", "with", "was", "on", "be", "by",
+        "this", "are", "from", "at", "or", "an", "my", "have", "has", "which", "we", "they", "their",
+        "not", "but", "can", "will", "also", "into", "using", "each", "all", "were", "been", "its",
+        "these", "other", "more", "than", "about", "when", "where", "while", "i", "you", "your", "our",
+    )
+)
+# Stems like "Homelab_EN" and "Notes-pt" belong to the same translation group as "Homelab" and "Notes".
+LANGUAGE_SUFFIX_RE = re.compile(r"[_\-. ](?:en|eng|english|pt|br|ptbr|pt_br|pt-br)$", re.IGNORECASE)
+
+_WORD_RE = re.compile(r"\w+")
+_PT_ACCENT_RE = re.compile(r"[ãõçáéíóúâêôà]")
+
+
+def detect_language(text: str, default: Language = "en") -> Language:
+    """Portuguese or English by function-word counts; ``default`` when the text gives no signal."""
+    lowered = text.lower()
+    pt_score = 0
+    en_score = 0
+    for word in _WORD_RE.findall(lowered):
+        if word in PT_STOPWORDS:
+            pt_score += 1
+        elif word in EN_STOPWORDS:
+            en_score += 1
+    # Accents break ties in short, list-like chunks with few function words.
+    pt_score += min(len(_PT_ACCENT_RE.findall(lowered)), 3)
+    if pt_score == en_score:
+        return default
+    return "pt" if pt_score > en_score else "en"
+
+
+def translation_group(file_name: str, pairs: Mapping[str, str] | None = None) -> str:
+    """Key shared by an upload and its translations.
+
+    ``pairs`` links files whose names differ (``{"Curriculo.txt": "Resume.txt"}``);
+    otherwise a trailing language suffix on the stem is ignored.
+    """
+    for original, translation in (pairs or {}).items():
+        if file_name == translation:
+            file_name = original
+            break
+    stem = PurePath(file_name).stem
+    return LANGUAGE_SUFFIX_RE.sub("", stem).lower()
@@ -0,0 +1,206 @@
+import json
+import math
+import os
+import re
+import threading
+import unicodedata
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import Any
+
+from rag.app.services.language_detector import EN_STOPWORDS, PT_STOPWORDS
+from rag.app.services.vector_store import collection_artifact_path, get_collection_generation, get_vector_store
+
+_TOKEN_RE = re.compile(r"\w+")
+# Rebuilds read the store in pages so only the postings, not every chunk text, stay in memory.
+REBUILD_PAGE_SIZE = 1000
+
+
+def _fold(text: str) -> str:
+    # Accent-folded so "automação" and "automacao" hit the same postings.
+    folded = unicodedata.normalize("NFKD", text.lower())
+    return "".join(char for char in folded if not unicodedata.combining(char))
+
+
+def tokenize_terms(text: str) -> list[str]:
+    return [token for token in _TOKEN_RE.findall(_fold(text)) if len(token) > 1]
+
+
+# Query terms that match almost every chunk; left in, they turn any question into BM25 hits.
+_QUERY_STOPWORDS = frozenset(
+    _fold(word)
+    for word in (
+        *PT_STOPWORDS,
+        *EN_STOPWORDS,
+        "what", "who", "how", "why", "do", "does", "did", "any", "me", "tell", "list", "give",
+        "qual", "quais", "que", "quem", "fale", "conte", "liste",
+    )
+)
+
+
+def reciprocal_rank_fusion(rankings: list[list[str]], k: int = 60) -> dict[str, float]:
+    fused: dict[str, float] = {}
+    for ranking in rankings:
+        for rank, item_id in enumerate(ranking, start=1):
+            fused[item_id] = fused.get(item_id, 0.0) + 1.0 / (k + rank)
+    return fused
+
+
+class BM25Index:
+    """Okapi BM25 over chunk texts, persisted as JSON next to the vector collection."""
+
+    def __init__(
+        self,
+        ids: list[str],
+        doc_lengths: list[int],
+        postings: dict[str, list[tuple[int, int]]],
+        k1: float = 1.5,
+        b: float = 0.75,
+        languages: list[str | None] | None = None,
+    ) -> None:
+        self.ids = ids
+        self.doc_lengths = doc_lengths
+        self.postings = postings
+        # Chunk language per document, for language-filtered searches; None for indexes built without it.
+        self.languages = languages
+        self.k1 = k1
+        self.b = b
+        self._avg_length = (sum(doc_lengths) / len(doc_lengths)) if doc_lengths else 0.0
+
+    @classmethod
+    def from_records(cls, records: Iterable[tuple[str, str, str | None]]) -> "BM25Index":
+        """Builds from ``(id, text, language)`` tuples, tokenizing one text at a time."""
+        ids: list[str] = []
+        languages: list[str | None] = []
+        postings: dict[str, list[tuple[int, int]]] = {}
+        doc_lengths: list[int] = []
+        for doc_idx, (doc_id, text, language) in enumerate(records):
+            ids.append(doc_id)
+            languages.append(language)
+            terms = tokenize_terms(text)
+            doc_lengths.append(len(terms))
+            for term, frequency in Counter(terms).items():
+                postings.setdefault(term, []).append((doc_idx, frequency))
+        return cls(ids=ids, doc_lengths=doc_lengths, postings=postings, languages=languages)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def search(
+        self,
+        query: str,
+        k: int,
+        language: str | None = None,
+        min_score: float = 0.0,
+    ) -> list[tuple[str, float]]:
+        """Top ``k`` chunks for the query's non-stopword terms, dropping scores below ``min_score``."""
+        if not self.ids or k <= 0:
+            return []
+        languages = self.languages if language is not None else None
+        total_docs = len(self.ids)
+        scores: dict[int, float] = {}
+        for term in set(tokenize_terms(query)).difference(_QUERY_STOPWORDS):
+            term_postings = self.postings.get(term)
+            if not term_postings:
+                continue
+            idf = math.log(1 + (total_docs - len(term_postings) + 0.5) / (len(term_postings) + 0.5))
+            for doc_idx, frequency in term_postings:
+                if languages is not None and languages[doc_idx] != language:
+                    continue
+                length_norm = 1 - self.b + self.b * self.doc_lengths[doc_idx] / (self._avg_length or 1.0)
+                score = idf * frequency * (self.k1 + 1) / (frequency + self.k1 * length_norm)
+                scores[doc_idx] = scores.get(doc_idx, 0.0) + score
+
+        ranked = sorted(
+            ((doc_idx, score) for doc_idx, score in scores.items() if score >= min_score),
+            key=lambda item: item[1],
+            reverse=True,
+        )[:k]
+        return [(self.ids[doc_idx], score) for doc_idx, score in ranked]
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "ids": self.ids,
+            "doc_lengths": self.doc_lengths,
+            "postings": self.postings,
+            "k1": self.k1,
+            "b": self.b,
+            "languages": self.languages,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "BM25Index":
+        postings = {
+            term: [(int(doc), int(freq)) for doc, freq in entries] for term, entries in data["postings"].items()
+        }
+        return cls(
+            ids=list(data["ids"]),
+            doc_lengths=[int(length) for length in data["doc_lengths"]],
+            postings=postings,
+            k1=float(data.get("k1", 1.5)),
+            b=float(data.get("b", 0.75)),
+            languages=data.get("languages"),
+        )
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(self.to_dict(), ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path) -> "BM25Index | None":
+        if not path.exists():
+            return None
+        try:
+            return cls.from_dict(json.loads(path.read_text(encoding="utf-8")))
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+
+_index_lock = threading.Lock()
+_loaded_index: tuple[Path, int, BM25Index] | None = None
+
+
+def _index_path(collection_name: str | None = None) -> Path:
+    return collection_artifact_path(".bm25.json", collection_name)
+
+
+def _iter_stored_chunks(store: Any, page_size: int = REBUILD_PAGE_SIZE) -> Iterator[tuple[str, str, str | None]]:
+    offset = 0
+    while True:
+        page = store.get(include=["documents", "metadatas"], limit=page_size, offset=offset)
+        for doc_id, text, metadata in zip(page["ids"], page["documents"], page["metadatas"]):
+            yield doc_id, text or "", (metadata or {}).get("language")
+        if len(page["ids"]) < page_size:
+            return
+        offset += page_size
+
+
+def rebuild_lexical_index(vector_store: Any | None = None, collection_name: str | None = None) -> BM25Index:
+    global _loaded_index
+    store = vector_store if vector_store is not None else get_vector_store()
+    index = BM25Index.from_records(_iter_stored_chunks(store))
+    path = _index_path(collection_name)
+    index.save(path)
+    with _index_lock:
+        _loaded_index = (path, get_collection_generation(), index)
+    return index
+
+
+def get_lexical_index() -> BM25Index:
+    global _loaded_index
+    path = _index_path()
+    generation = get_collection_generation()
+    loaded = _loaded_index
+    if loaded is not None and loaded[0] == path and loaded[1] == generation:
+        return loaded[2]
+
+    index = BM25Index.load(path)
+    if index is None:
+        # Collections built before the lexical index existed get one on first use.
+        return rebuild_lexical_index()
+    with _index_lock:
+        _loaded_index = (path, generation, index)
+    return index
@@ -0,0 +1,291 @@
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from langchain_core.documents import Document
+
+
+def _file_signature(path: Path) -> tuple[int, int, int] | None:
+    try:
+        file_stat = path.stat()
+    except OSError:
+        return None
+    return file_stat.st_ino, file_stat.st_mtime_ns, file_stat.st_size
+
+
+class _Snapshot:
+    """Immutable view of the index; searches read one while writers build the next."""
+
+    __slots__ = ("ids", "documents", "metadatas", "matrix", "search_matrix", "norms", "positions", "masks")
+
+    def __init__(
+        self,
+        ids: list[str],
+        documents: list[str],
+        metadatas: list[dict[str, Any]],
+        matrix: np.ndarray,
+    ) -> None:
+        self.ids = ids
+        self.documents = documents
+        self.metadatas = metadatas
+        self.matrix = matrix
+        # float16 only shrinks the file; NumPy has no BLAS path for half precision, so search in float32.
+        self.search_matrix = matrix if matrix.dtype == np.float32 else matrix.astype(np.float32)
+        self.norms = np.einsum("ij,ij->i", self.search_matrix, self.search_matrix)
+        self.positions = {doc_id: position for position, doc_id in enumerate(ids)}
+        # Metadata filter -> row mask, built on first use; snapshots never change, so neither do masks.
+        self.masks: dict[tuple[tuple[str, Any], ...], np.ndarray] = {}
+
+    def mask(self, where: dict[str, Any]) -> np.ndarray:
+        key = tuple(sorted(where.items()))
+        mask = self.masks.get(key)
+        if mask is None:
+            mask = np.fromiter(
+                (all(metadata.get(field) == value for field, value in key) for metadata in self.metadatas),
+                dtype=bool,
+                count=len(self.metadatas),
+            )
+            self.masks[key] = mask
+        return mask
+
+
+class NumpyVectorStore:
+    """Brute-force vector index: one contiguous matrix searched with a single matmul.
+
+    The matrix is saved as ``<collection>.index.npy`` and memory-mapped on load;
+    ids, texts and metadata live in ``<collection>.index.json``. Distances are
+    squared L2 like Chroma's default space, so scores and ``retrieval_min_score``
+    mean the same thing on both backends. Every write rewrites both files
+    atomically, which is cheap at the corpus sizes this backend targets.
+
+    Other processes (uvicorn workers, the CLI) may rewrite the files, so reads
+    and writes first compare the index file's inode, mtime and size with the
+    loaded snapshot and reload when they differ.
+    """
+
+    def __init__(
+        self,
+        collection_name: str,
+        index_path: Path,
+        embedding_function: Any,
+        dtype: str = "float32",
+    ) -> None:
+        self.collection_name = collection_name
+        self.index_path = index_path
+        self.matrix_path = index_path.with_suffix(".npy")
+        self.embeddings = embedding_function
+        self._dtype = np.dtype(dtype)
+        self._lock = threading.Lock()
+        self._snapshot = self._empty()
+        self._signature: tuple[int, int, int] | None = None
+        with self._lock:
+            self._refresh()
+
+    def _empty(self) -> _Snapshot:
+        return _Snapshot([], [], [], np.zeros((0, 0), dtype=self._dtype))
+
+    def _load(self) -> _Snapshot | None:
+        """Reads both files; ``None`` when they are mid-replace by another process and disagree."""
+        if not self.index_path.exists() or not self.matrix_path.exists():
+            return self._empty()
+        try:
+            data = json.loads(self.index_path.read_text(encoding="utf-8"))
+            matrix = np.load(self.matrix_path, mmap_mode="r")
+        except (OSError, ValueError):
+            return None
+        ids = list(data.get("ids", []))
+        if data.get("collection") != self.collection_name:
+            return self._empty()
+        if matrix.shape[0] != len(ids):
+            return None
+        if matrix.dtype != self._dtype:
+            matrix = matrix.astype(self._dtype)
+        return _Snapshot(ids, list(data["documents"]), list(data["metadatas"]), matrix)
+
+    def _save(self, snapshot: _Snapshot) -> None:
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_matrix = self.matrix_path.with_suffix(".tmp.npy")
+        np.save(tmp_matrix, np.ascontiguousarray(snapshot.matrix))
+        tmp_index = self.index_path.with_suffix(".tmp")
+        payload = {
+            "collection": self.collection_name,
+            "dtype": self._dtype.name,
+            "ids": snapshot.ids,
+            "documents": snapshot.documents,
+            "metadatas": snapshot.metadatas,
+        }
+        tmp_index.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_matrix, self.matrix_path)
+        os.replace(tmp_index, self.index_path)
+
+    def _commit(self, snapshot: _Snapshot) -> None:
+        self._save(snapshot)
+        self._snapshot = snapshot
+        self._signature = _file_signature(self.index_path)
+
+    def _refresh(self) -> None:
+        """Reloads the files if another process replaced them; call with the lock held."""
+        signature = _file_signature(self.index_path)
+        if signature == self._signature:
+            return
+        snapshot = self._load()
+        # A half-replaced pair keeps the current snapshot; the next read retries.
+        if snapshot is not None:
+            self._snapshot = snapshot
+            self._signature = signature
+
+    def _current(self) -> _Snapshot:
+        if _file_signature(self.index_path) != self._signature:
+            with self._lock:
+                self._refresh()
+        return self._snapshot
+
+    def count(self) -> int:
+        return len(self._current().ids)
+
+    def upsert(
+        self,
+        ids: list[str],
+        embeddings: list[list[float]],
+        documents: list[str],
+        metadatas: list[dict[str, Any]],
+    ) -> None:
+        if not ids:
+            return
+        new_rows = np.asarray(embeddings, dtype=self._dtype)
+        with self._lock:
+            self._refresh()
+            current = self._snapshot
+            if current.ids and new_rows.shape[1] != current.matrix.shape[1]:
+                raise ValueError(
+                    f"Collection expecting embedding with dimension of {current.matrix.shape[1]}, "
+                    f"got {new_rows.shape[1]}"
+                )
+            replaced = {doc_id: row for row, doc_id in enumerate(ids) if doc_id in current.positions}
+            keep = [position for position, doc_id in enumerate(current.ids) if doc_id not in replaced]
+            appended = [row for row, doc_id in enumerate(ids) if doc_id not in replaced] + list(replaced.values())
+
+            merged_ids = [current.ids[position] for position in keep] + [ids[row] for row in appended]
+            merged_documents = [current.documents[position] for position in keep] + [documents[row] for row in appended]
+            merged_metadatas = [current.metadatas[position] for position in keep] + [metadatas[row] for row in appended]
+            if current.ids:
+                matrix = np.concatenate([np.asarray(current.matrix)[keep], new_rows[appended]])
+            else:
+                matrix = new_rows[appended]
+            self._commit(_Snapshot(merged_ids, merged_documents, merged_metadatas, matrix))
+
+    def delete(self, ids: list[str] | None = None) -> None:
+        if not ids:
+            return
+        drop = set(ids)
+        with self._lock:
+            self._refresh()
+            current = self._snapshot
+            keep = [position for position, doc_id in enumerate(current.ids) if doc_id not in drop]
+            if len(keep) == len(current.ids):
+                return
+            self._commit(
+                _Snapshot(
+                    [current.ids[position] for position in keep],
+                    [current.documents[position] for position in keep],
+                    [current.metadatas[position] for position in keep],
+                    np.asarray(current.matrix)[keep],
+                )
+            )
+
+    def reset_collection(self) -> None:
+        with self._lock:
+            self._commit(self._empty())
+
+    def delete_collection(self) -> None:
+        with self._lock:
+            self._snapshot = self._empty()
+            self.index_path.unlink(missing_ok=True)
+            self.matrix_path.unlink(missing_ok=True)
+            self._signature = None
+
+    def get(
+        self,
+        ids: list[str] | None = None,
+        include: list[str] | None = None,
+        limit: int | None = None,
+        offset: int | None = None,
+    ) -> dict[str, Any]:
+        """Same shape as ``Chroma.get``; ``limit``/``offset`` page through rows in insertion order."""
+        include = include if include is not None else ["documents", "metadatas"]
+        snapshot = self._current()
+        if ids is None:
+            start = offset or 0
+            stop = len(snapshot.ids) if limit is None else min(len(snapshot.ids), start + limit)
+            positions = list(range(start, stop))
+        else:
+            positions = [snapshot.positions[doc_id] for doc_id in ids if doc_id in snapshot.positions]
+
+        result: dict[str, Any] = {"ids": [snapshot.ids[position] for position in positions]}
+        if "documents" in include:
+            result["documents"] = [snapshot.documents[position] for position in positions]
+        if "metadatas" in include:
+            result["metadatas"] = [snapshot.metadatas[position] for position in positions]
+        if "embeddings" in include:
+            result["embeddings"] = snapshot.search_matrix[positions]
+        return result
+
+    def similarity_search_by_vectors_with_relevance_scores(
+        self,
+        embeddings: list[list[float]],
+        k: int = 4,
+        filter: dict[str, Any] | None = None,
+    ) -> list[list[tuple[Document, float]]]:
+        """Nearest rows per query; ``filter`` keeps rows whose metadata equals every given value, like Chroma."""
+        snapshot = self._current()
+        if not snapshot.ids or k <= 0:
+            return [[] for _ in embeddings]
+        queries = np.asarray(embeddings, dtype=np.float32).reshape(len(embeddings), -1)
+        dimension = snapshot.search_matrix.shape[1]
+        if queries.shape[1] != dimension:
+            raise ValueError(f"Collection expecting embedding with dimension of {dimension}, got {queries.shape[1]}")
+
+        # ||q - x||^2 for every (query, row) pair from one matrix product.
+        distances = snapshot.norms[None, :] - 2.0 * (queries @ snapshot.search_matrix.T)
+        distances += np.einsum("ij,ij->i", queries, queries)[:, None]
+        candidates = len(snapshot.ids)
+        if filter:
+            mask = snapshot.mask(filter)
+            distances[:, ~mask] = np.inf
+            candidates = int(mask.sum())
+        k = min(k, candidates)
+        if k <= 0:
+            return [[] for _ in embeddings]
+        if k < len(snapshot.ids):
+            top = np.argpartition(distances, k - 1, axis=1)[:, :k]
+        else:
+            top = np.broadcast_to(np.arange(len(snapshot.ids)), distances.shape)
+        ordered = np.take_along_axis(top, np.argsort(np.take_along_axis(distances, top, axis=1), axis=1), axis=1)
+        return [
+            [
+                (
+                    Document(
+                        page_content=snapshot.documents[position],
+                        metadata=snapshot.metadatas[position],
+                        id=snapshot.ids[position],
+                    ),
+                    max(float(row_distances[position]), 0.0),
+                )
+                for position in row
+            ]
+            for row, row_distances in zip(ordered, distances)
+        ]
+
+    def similarity_search_by_vector_with_relevance_scores(
+        self,
+        embedding: list[float],
+        k: int = 4,
+        filter: dict[str, Any] | None = None,
+    ) -> list[tuple[Document, float]]:
+        return self.similarity_search_by_vectors_with_relevance_scores([embedding], k=k, filter=filter)[0]
+
+    def similarity_search_with_score(self, query: str, k: int = 4) -> list[tuple[Document, float]]:
+        return self.similarity_search_by_vector_with_relevance_scores(self.embeddings.embed_query(query), k=k)
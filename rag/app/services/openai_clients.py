@@ -0,0 +1,75 @@
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any
+
+from rag.app.core.settings import get_settings
+
+if TYPE_CHECKING:
+    import httpx
+    from langchain_openai import ChatOpenAI
+
+# openai and httpx are imported on first use, like langchain_openai, to keep `import rag.app.main` fast.
+
+
+def _timeout() -> "httpx.Timeout":
+    import httpx
+
+    settings = get_settings()
+    # The read timeout also bounds the gap between streamed chunks, so a stalled upstream cannot pin a worker.
+    return httpx.Timeout(settings.openai_read_timeout_seconds, connect=settings.openai_connect_timeout_seconds)
+
+
+def _limits() -> "httpx.Limits":
+    import httpx
+
+    settings = get_settings()
+    return httpx.Limits(
+        max_connections=settings.openai_max_connections,
+        max_keepalive_connections=settings.openai_max_keepalive_connections,
+        keepalive_expiry=settings.openai_keepalive_expiry_seconds,
+    )
+
+
+@lru_cache
+def get_openai_http_client() -> "httpx.Client":
+    import openai
+
+    return openai.DefaultHttpxClient(timeout=_timeout(), limits=_limits())
+
+
+@lru_cache
+def get_openai_async_http_client() -> "httpx.AsyncClient":
+    import openai
+
+    return openai.DefaultAsyncHttpxClient(timeout=_timeout(), limits=_limits())
+
+
+def openai_client_kwargs() -> dict[str, Any]:
+    """Arguments shared by every ``ChatOpenAI`` and ``OpenAIEmbeddings`` built in this process.
+
+    Both reuse one keep-alive pool per sync/async client. Retries are left to the
+    OpenAI SDK, which backs off exponentially with jitter on connection errors,
+    408, 409, 429 and 5xx responses.
+    """
+    settings = get_settings()
+    kwargs: dict[str, Any] = {
+        "timeout": _timeout(),
+        "max_retries": settings.openai_max_retries,
+        "http_client": get_openai_http_client(),
+        "http_async_client": get_openai_async_http_client(),
+    }
+    if settings.openai_base_url:
+        kwargs["base_url"] = settings.openai_base_url
+    return kwargs
+
+
+@lru_cache(maxsize=1)
+def get_chat_model(api_key: str) -> "ChatOpenAI":
+    from langchain_openai import ChatOpenAI
+
+    settings = get_settings()
+    return ChatOpenAI(
+        model=settings.openai_chat_model,
+        api_key=api_key,
+        temperature=0.2,
+        **openai_client_kwargs(),
+    )
@@ -0,0 +1,114 @@
+import re
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Literal
+
+from rag.app.core.settings import get_settings
+
+PT_MARKERS = (
+    "qual", "quais", "como", "quem", "onde", "quando", "porque", "por", "que", "voce", "você",
+    "sobre", "projeto", "projetos", "experiencia", "experiência", "habilidades", "curriculo",
+    "currículo", "trabalho", "construiu", "seu", "sua",
+)
+EN_MARKERS = (
+    "what", "which", "how", "who", "where", "when", "why", "about", "project", "projects",
+    "experience", "skills", "resume", "work", "built", "your", "you", "can", "tell", "list",
+)
+NUMBER_WORDS = {
+    "um": 1, "uma": 1, "one": 1, "dois": 2, "duas": 2, "two": 2, "tres": 3, "três": 3, "three": 3,
+    "quatro": 4, "four": 4, "cinco": 5, "five": 5, "seis": 6, "six": 6, "sete": 7, "seven": 7,
+    "oito": 8, "eight": 8, "nove": 9, "nine": 9, "dez": 10, "ten": 10,
+}
+# Phrase markers match anywhere in the lowercased text, as substrings.
+LIST_MARKERS = ("liste", "list", "quais sao", "quais são", "cite", "enumere", "mostre", "me diga", "top ")
+PROJECT_MARKERS = (
+    "projeto", "projetos", "project", "projects", "portfolio", "github", "repositorio", "app",
+    "aplicacao", "sistema", "o que voce construiu", "o que você construiu", "built", "build",
+)
+
+_TOKEN_RE = re.compile(r"\w+")
+_PT_ACCENT_RE = re.compile(r"[ãõçáéíóúâêôà]")
+_PT, _EN = 1, 2
+
+
+@dataclass(frozen=True, slots=True)
+class QueryFeatures:
+    language: Literal["pt", "en"]
+    is_list_query: bool
+    is_project_query: bool
+    requested_count: int | None
+
+
+def _phrase_pattern(markers: Iterable[str]) -> re.Pattern[str]:
+    # Longest first so overlapping markers never hide each other.
+    ordered = sorted({marker.lower() for marker in markers if marker}, key=len, reverse=True)
+    return re.compile("|".join(re.escape(marker) for marker in ordered) or r"(?!)")
+
+
+class QueryAnalyzer:
+    """Classifies a question in one pass over its tokens.
+
+    Language markers and number words share one token lookup table; list and
+    project markers are each a single compiled alternation. Results are
+    memoized per exact query text.
+    """
+
+    def __init__(
+        self,
+        pt_markers: Iterable[str] = PT_MARKERS,
+        en_markers: Iterable[str] = EN_MARKERS,
+        number_words: Mapping[str, int] = NUMBER_WORDS,
+        list_markers: Iterable[str] = LIST_MARKERS,
+        project_markers: Iterable[str] = PROJECT_MARKERS,
+        cache_size: int = 4096,
+    ) -> None:
+        self._language_table: dict[str, int] = {}
+        for marker in pt_markers:
+            self._language_table[marker.lower()] = self._language_table.get(marker.lower(), 0) | _PT
+        for marker in en_markers:
+            self._language_table[marker.lower()] = self._language_table.get(marker.lower(), 0) | _EN
+        self._number_table = {word.lower(): value for word, value in number_words.items()}
+        self._list_re = _phrase_pattern(list_markers)
+        self._project_re = _phrase_pattern(project_markers)
+        self.analyze = lru_cache(maxsize=cache_size)(self._analyze)
+
+    def _analyze(self, query: str) -> QueryFeatures:
+        text = query.lower()
+        pt_score = 0
+        en_score = 0
+        word_count: int | None = None
+        digit_count: int | None = None
+        for token in _TOKEN_RE.findall(text):
+            flags = self._language_table.get(token)
+            if flags:
+                pt_score += flags & _PT
+                en_score += (flags & _EN) >> 1
+            value = self._number_table.get(token)
+            if value is not None:
+                # The smallest number word wins, then the first number from 1 to 20.
+                word_count = value if word_count is None else min(word_count, value)
+            elif digit_count is None and len(token) <= 2 and token.isdecimal() and 1 <= int(token) <= 20:
+                digit_count = int(token)
+
+        if _PT_ACCENT_RE.search(text):
+            pt_score += 2
+
+        return QueryFeatures(
+            language="pt" if pt_score > en_score else "en",
+            is_list_query=self._list_re.search(text) is not None,
+            is_project_query=self._project_re.search(text) is not None,
+            requested_count=word_count if word_count is not None else digit_count,
+        )
+
+
+@lru_cache
+def get_query_analyzer() -> QueryAnalyzer:
+    settings = get_settings()
+    return QueryAnalyzer(
+        pt_markers=(*PT_MARKERS, *settings.query_extra_pt_markers),
+        en_markers=(*EN_MARKERS, *settings.query_extra_en_markers),
+        number_words={**NUMBER_WORDS, **settings.query_extra_number_words},
+        list_markers=(*LIST_MARKERS, *settings.query_extra_list_markers),
+        project_markers=(*PROJECT_MARKERS, *settings.query_extra_project_markers),
+    )
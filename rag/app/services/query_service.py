@@ -1,17 +1,54 @@
+import asyncio
 import os
 import re
-import unicodedata
-from difflib import SequenceMatcher
-from pathlib import Path
-from typing import Any, Literal
+import threading
+from collections import Counter
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Literal
 
 from fastapi import HTTPException
-from langchain_openai import ChatOpenAI
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, Field
 
+from rag.app.core.metrics import (
+    metrics_enabled,
+    observe_prompt_tokens,
+    record_event,
+    record_generation_path,
+    timed,
+)
 from rag.app.core.paths import UPLOADS_DIR
 from rag.app.core.settings import get_settings
-from rag.app.services.ingestion_service import IngestionService
-from rag.app.services.vector_store import get_vector_store
+from rag.app.services.answer_cache import get_answer_cache
+from rag.app.services.context_assembler import ContextPiece, merge_pieces, pack_pieces
+from rag.app.services.copy_detector import ShingleIndex
+from rag.app.services.document_cache import get_document_cache
+from rag.app.services.embedding_cache import normalize_query_text
+from rag.app.services.ingestion_jobs import get_ingestion_jobs
+from rag.app.services.language_detector import detect_language
+from rag.app.services.lexical_index import get_lexical_index, reciprocal_rank_fusion
+from rag.app.services.openai_clients import get_chat_model
+from rag.app.services.query_analyzer import get_query_analyzer
+from rag.app.services.tokens import count_tokens
+from rag.app.services.vector_store import (
+    aembed_queries,
+    aembed_query,
+    embed_queries,
+    embed_query,
+    fetch_documents_with_distances,
+    get_collection_generation,
+    get_vector_store,
+    search_by_vectors,
+)
+
+if TYPE_CHECKING:
+    # langchain_openai takes about a second to import; it is loaded on the first LLM call.
+    from langchain_openai import ChatOpenAI
+
+# Bump whenever prompts or post-processing change so cached answers are not reused.
+PROMPT_VERSION = "3"
 
 
 def _openai_api_key() -> str:
@@ -25,71 +62,56 @@ def _openai_api_key() -> str:
     return key
 
 
-class QueryService:
-    @staticmethod
-    def _detect_query_language(query: str) -> Literal["pt", "en"]:
-        q = query.lower()
-        tokens = re.findall(r"[a-zA-ZÀ-ÿ']+", q)
-
-        pt_markers = {
-            "qual",
-            "quais",
-            "como",
-            "quem",
-            "onde",
-            "quando",
-            "porque",
-            "por",
-            "que",
-            "voce",
-            "você",
-            "sobre",
-            "projeto",
-            "projetos",
-            "experiencia",
-            "experiência",
-            "habilidades",
-            "curriculo",
-            "currículo",
-            "trabalho",
-            "construiu",
-            "seu",
-            "sua",
-        }
-        en_markers = {
-            "what",
-            "which",
-            "how",
-            "who",
-            "where",
-            "when",
-            "why",
-            "about",
-            "project",
-            "projects",
-            "experience",
-            "skills",
-            "resume",
-            "work",
-            "built",
-            "your",
-            "you",
-            "can",
-            "tell",
-            "list",
-        }
+class StructuredListAnswer(BaseModel):
+    intro: str = Field(default="", description="Optional one-sentence lead-in, or a note when context is insufficient.")
+    items: list[str] = Field(default_factory=list, description="List items, each paraphrased from the context.")
+    paraphrased: bool = Field(
+        description="True only if no item repeats more than 6 consecutive words from the context."
+    )
+
+
+class GenerationStats:
+    """Thread-safe counters for which generation and repair paths fire."""
 
-        pt_score = sum(1 for token in tokens if token in pt_markers)
-        en_score = sum(1 for token in tokens if token in en_markers)
+    def __init__(self) -> None:
+        self._counts: Counter[str] = Counter()
+        self._lock = threading.Lock()
 
-        if re.search(r"[ãõçáéíóúâêôà]", q):
-            pt_score += 2
+    def increment(self, name: str) -> None:
+        with self._lock:
+            self._counts[name] += 1
+        record_generation_path(name)
 
-        if en_score > pt_score:
-            return "en"
-        if pt_score > en_score:
-            return "pt"
-        return "en"
+    def snapshot(self) -> dict[str, int]:
+        with self._lock:
+            return dict(self._counts)
+
+
+@dataclass
+class PreparedQuery:
+    query: str
+    top_k: int
+    response_language: Literal["pt", "en"]
+    is_project_query: bool
+    is_list_query: bool
+    requested_count: int | None
+    cache_scope: tuple[Any, ...]
+    query_vector: list[float] = field(default_factory=list)
+    cache_key: tuple[Any, ...] | None = None
+    generation: int = 0
+    prompt: str = ""
+    context_pieces: list[ContextPiece] = field(default_factory=list)
+    # Merged context packed to the rewrite budget; rewrite prompts only need it as a reference.
+    rewrite_contexts: list[str] = field(default_factory=list)
+    sources: list[dict[str, Any]] = field(default_factory=list)
+    copy_index: ShingleIndex | None = None
+    # Set when the request is resolved without the LLM (cache hit or no context).
+    result: dict[str, Any] | None = None
+
+
+class QueryService:
+    def __init__(self) -> None:
+        self.generation_stats = GenerationStats()
 
     @staticmethod
     def _language_name(response_language: Literal["pt", "en"]) -> str:
@@ -109,81 +131,131 @@ class QueryService:
             and "got" in message
         )
 
-    def _search_with_auto_reindex(self, query: str, k: int) -> list[tuple[Any, float]]:
+    def _search_with_auto_reindex(
+        self,
+        query_vector: list[float],
+        k: int,
+        filter: dict[str, Any] | None = None,
+    ) -> list[tuple[Any, float]]:
         vector_store = get_vector_store()
         try:
-            return vector_store.similarity_search_with_score(query, k=k)
+            with timed("vector_search"):
+                return vector_store.similarity_search_by_vector_with_relevance_scores(query_vector, k=k, filter=filter)
         except Exception as exc:
             if not self._is_embedding_dimension_mismatch_error(exc):
                 raise
 
-            try:
-                IngestionService().ingest_uploads_to_vector_db(reset_collection=True)
-            except Exception as rebuild_exc:
-                raise HTTPException(
-                    status_code=500,
-                    detail=(
-                        "Embedding dimension mismatch detected and automatic reindex failed. "
-                        "Clear vector DB and ingest again."
-                    ),
-                ) from rebuild_exc
-
-            vector_store = get_vector_store()
-            return vector_store.similarity_search_with_score(query, k=k)
+            # The collection was built with another embedding model. One rebuild runs in the background
+            # while this and concurrent requests answer without context until the new version is swapped in.
+            jobs = get_ingestion_jobs()
+            active_job = jobs.active()
+            if active_job is None or not active_job.reset_collection:
+                record_event("auto_reindex")
+                jobs.submit(reason="dimension_mismatch", reset_collection=True)
+            return []
 
     @staticmethod
-    def _extract_requested_count(query: str) -> int | None:
-        q = query.lower()
-        number_words = {
-            "um": 1,
-            "uma": 1,
-            "one": 1,
-            "dois": 2,
-            "duas": 2,
-            "two": 2,
-            "tres": 3,
-            "três": 3,
-            "three": 3,
-            "quatro": 4,
-            "four": 4,
-            "cinco": 5,
-            "five": 5,
-            "seis": 6,
-            "six": 6,
-            "sete": 7,
-            "seven": 7,
-            "oito": 8,
-            "eight": 8,
-            "nove": 9,
-            "nine": 9,
-            "dez": 10,
-            "ten": 10,
+    def _language_filter(prepared: PreparedQuery) -> dict[str, Any] | None:
+        if not get_settings().language_filter_enabled:
+            return None
+        return {"language": prepared.response_language}
+
+    @staticmethod
+    def _is_translation_repeat(doc: Any, language: str, covered_groups: set[str]) -> bool:
+        # A chunk in another language whose upload already matched in the question's language.
+        metadata = doc.metadata
+        return metadata.get("language", language) != language and metadata.get("translation_group") in covered_groups
+
+    def _with_language_fallback(
+        self,
+        prepared: PreparedQuery,
+        results: list[tuple[Any, float]],
+        search_k: int,
+    ) -> tuple[list[tuple[Any, float]], set[str] | None]:
+        """Widens a language-filtered search to every language when too few chunks pass the score threshold.
+
+        Returns the candidates and, when it widened, the translation groups already
+        matched in the question's language; their other-language chunks are skipped.
+        """
+        settings = get_settings()
+        passing = sum(1 for _, distance in results if 1 / (1 + float(distance)) >= settings.retrieval_min_score)
+        if passing >= prepared.top_k:
+            return results, None
+
+        record_event("language_fallback")
+        language = prepared.response_language
+        covered_groups = {
+            str(doc.metadata["translation_group"]) for doc, _ in results if "translation_group" in doc.metadata
         }
-        for word, value in number_words.items():
-            if re.search(rf"\b{re.escape(word)}\b", q):
-                return value
+        seen = {str(doc.id or doc.metadata.get("chunk_id", "")) for doc, _ in results}
+        widened = list(results)
+        for doc, distance in self._search_with_auto_reindex(prepared.query_vector, k=search_k):
+            doc_id = str(doc.id or doc.metadata.get("chunk_id", ""))
+            if doc_id not in seen and not self._is_translation_repeat(doc, language, covered_groups):
+                widened.append((doc, distance))
+        widened.sort(key=lambda item: float(item[1]))
+        return widened, covered_groups
 
-        for match in re.findall(r"\b(\d{1,2})\b", q):
-            value = int(match)
-            if 1 <= value <= 20:
-                return value
-        return None
+    def _fuse_with_lexical(
+        self,
+        query: str,
+        query_vector: list[float],
+        vector_results: list[tuple[Any, float]],
+        search_k: int,
+        top_k: int,
+        is_project_query: bool,
+        language: str | None = None,
+        covered_groups: set[str] | None = None,
+    ) -> list[tuple[Any, float]]:
+        """Merges vector hits with BM25 hits using reciprocal rank fusion.
 
-    @staticmethod
-    def _is_list_query(query: str) -> bool:
-        q = query.lower()
-        list_markers = (
-            "liste",
-            "list",
-            "quais sao",
-            "quais são",
-            "cite",
-            "enumere",
-            "mostre",
-            "me diga",
-            "top ",
+        Vector-only candidates still have to pass ``retrieval_min_score``; BM25
+        hits skip it, since exact term matches (e.g. "Proxmox") are exactly what
+        embeddings tend to miss, but only count when a non-stopword term scores at
+        least ``lexical_min_score``. BM25 is restricted to ``language`` unless the
+        vector search had to widen (``covered_groups`` is set).
+        """
+        settings = get_settings()
+        candidates: dict[str, tuple[Any, float]] = {}
+        vector_ranking: list[str] = []
+        for doc, distance in vector_results:
+            doc_id = str(doc.id or doc.metadata.get("chunk_id", ""))
+            candidates[doc_id] = (doc, float(distance))
+            vector_ranking.append(doc_id)
+
+        lexical_language = language if covered_groups is None else None
+        with timed("lexical_search"):
+            lexical_hits = get_lexical_index().search(
+                query,
+                k=search_k,
+                language=lexical_language,
+                min_score=settings.lexical_min_score,
+            )
+        lexical_ranking = [doc_id for doc_id, _ in lexical_hits]
+        missing_ids = [doc_id for doc_id in lexical_ranking if doc_id not in candidates]
+        for doc, distance in fetch_documents_with_distances(get_vector_store(), missing_ids, query_vector):
+            if covered_groups is not None and language and self._is_translation_repeat(doc, language, covered_groups):
+                continue
+            candidates[str(doc.id)] = (doc, distance)
+
+        fused = reciprocal_rank_fusion([vector_ranking, lexical_ranking], k=settings.rrf_k)
+        lexical_ids = set(lexical_ranking)
+        kept = [
+            doc_id
+            for doc_id in fused
+            if doc_id in candidates
+            and (doc_id in lexical_ids or 1 / (1 + candidates[doc_id][1]) >= settings.retrieval_min_score)
+        ]
+        kept.sort(
+            key=lambda doc_id: (
+                0
+                if is_project_query
+                and self._is_project_source(str(candidates[doc_id][0].metadata.get("source_name", "")))
+                else 1,
+                -fused[doc_id],
+            )
         )
-        return any(marker in q for marker in list_markers)
+        return [candidates[doc_id] for doc_id in kept[:top_k]]
 
     @staticmethod
     def _count_markdown_list_items(text: str) -> int:
@@ -197,89 +269,34 @@ class QueryService:
         project_markers = ("readme", "project", "projects", "portfolio", "case", "repo", "github")
         return any(marker in name for marker in project_markers)
 
-    @staticmethod
-    def _is_project_query(query: str) -> bool:
-        q = query.lower()
-        keywords = (
-            "projeto",
-            "projetos",
-            "project",
-            "projects",
-            "portfolio",
-            "github",
-            "repositorio",
-            "app",
-            "aplicacao",
-            "sistema",
-            "o que voce construiu",
-            "o que você construiu",
-            "built",
-            "build",
-        )
-        return any(keyword in q for keyword in keywords)
-
-    @staticmethod
-    def _read_text_file(file_path: Path) -> str:
-        raw = file_path.read_bytes()
-        for encoding in ("utf-8", "latin-1"):
-            try:
-                return raw.decode(encoding)
-            except UnicodeDecodeError:
-                continue
-        return raw.decode("utf-8", errors="ignore")
-
-    @staticmethod
-    def _normalize_text(raw_text: str) -> str:
-        text = raw_text.replace("\ufeff", "")
-        text = re.sub(r"([A-Za-zÀ-ÿ])\s+([\u0300-\u036f])", r"\1\2", text)
-        text = unicodedata.normalize("NFKC", text)
-        text = re.sub(r"\r\n?", "\n", text)
-        text = re.sub(r"\n{3,}", "\n\n", text)
-        return text.strip()
-
-    def _load_fixed_resume_context(self) -> str:
+    def _load_fixed_resume_context(self, response_language: Literal["pt", "en"]) -> tuple[str, str]:
+        """Source name and text of the fixed resume, in the question's language when a translation is uploaded."""
         settings = get_settings()
+        cache = get_document_cache()
+        # Served from memory; the upload watcher keeps the cached texts current.
         resume_path = UPLOADS_DIR / settings.fixed_resume_filename
-        if not resume_path.exists() or not resume_path.is_file():
-            return ""
-
-        text = self._normalize_text(self._read_text_file(resume_path))
-        if not text:
-            return ""
-        return text[: settings.fixed_resume_max_chars].strip()
-
-    @staticmethod
-    def _normalize_for_similarity(text: str) -> str:
-        normalized = re.sub(r"\s+", " ", text.lower()).strip()
-        return re.sub(r"[^\w\s]", "", normalized)
-
-    def _max_similarity_with_context(self, answer: str, contexts: list[str]) -> float:
-        if not answer or not contexts:
-            return 0.0
-
-        answer_normalized = self._normalize_for_similarity(answer)
-        if not answer_normalized:
-            return 0.0
-
-        best = 0.0
-        for context in contexts:
-            context_normalized = self._normalize_for_similarity(context)
-            if not context_normalized:
+        candidates = [resume_path]
+        if settings.language_filter_enabled:
+            candidates += [path for path in cache.paths() if path != resume_path]
+        fallback = ("", "")
+        for path in candidates:
+            text = cache.get(path)[: settings.fixed_resume_max_chars].strip()
+            if not text:
                 continue
-            score = SequenceMatcher(None, answer_normalized, context_normalized).ratio()
-            best = max(best, score)
-        return best
+            if not settings.language_filter_enabled or detect_language(text) == response_language:
+                return path.name, text
+            fallback = fallback if fallback[1] else (path.name, text)
+        return fallback
 
-    def _rewrite_to_paraphrase(
+    def _paraphrase_prompt(
         self,
-        llm: ChatOpenAI,
         answer: str,
         contexts: list[str],
         response_language: Literal["pt", "en"],
     ) -> str:
         context_block = "\n\n".join(contexts)
         language_name = self._language_name(response_language)
-        rewrite_prompt = (
+        return (
             f"Rewrite the answer below in {language_name}, preserving the same facts. "
             "Mandatory rules: "
             "1) Do not copy literal sentences from context. "
@@ -290,12 +307,9 @@ class QueryService:
             "Reference context:\n"
             f"{context_block}"
         )
-        rewritten = llm.invoke(rewrite_prompt)
-        return rewritten.content if isinstance(rewritten.content, str) else str(rewritten.content)
 
-    def _rewrite_to_list(
+    def _list_prompt(
         self,
-        llm: ChatOpenAI,
         answer: str,
         query: str,
         contexts: list[str],
@@ -309,7 +323,7 @@ class QueryService:
             if requested_count
             else "Deliver an objective numbered list with the most relevant items. "
         )
-        rewrite_prompt = (
+        return (
             f"Restructure the answer below into a markdown list in {language_name}. "
             "Mandatory rules: "
             "1) Do not invent items. "
@@ -323,8 +337,116 @@ class QueryService:
             "Context:\n"
             f"{context_block}"
         )
-        rewritten = llm.invoke(rewrite_prompt)
-        return rewritten.content if isinstance(rewritten.content, str) else str(rewritten.content)
+
+    def _repair_prompt(
+        self,
+        answer: str,
+        prepared: PreparedQuery,
+        needs_paraphrase: bool,
+        needs_list: bool,
+    ) -> str:
+        if not needs_list:
+            return self._paraphrase_prompt(answer, prepared.rewrite_contexts, prepared.response_language)
+        if not needs_paraphrase:
+            return self._list_prompt(
+                answer,
+                prepared.query,
+                prepared.rewrite_contexts,
+                prepared.requested_count,
+                prepared.response_language,
+            )
+        # One combined pass instead of a paraphrase rewrite followed by a list rewrite.
+        return (
+            self._list_prompt(
+                answer,
+                prepared.query,
+                prepared.rewrite_contexts,
+                prepared.requested_count,
+                prepared.response_language,
+            )
+            + "\n\nAdditional mandatory rules: do not copy literal sentences from context and "
+            "do not use more than 6 consecutive words equal to context."
+        )
+
+    @staticmethod
+    def _render_structured_answer(structured: StructuredListAnswer) -> str:
+        items = [item.strip() for item in structured.items if item.strip()]
+        numbered = "\n".join(f"{idx}. {item}" for idx, item in enumerate(items, start=1))
+        intro = structured.intro.strip()
+        if intro and numbered:
+            return f"{intro}\n\n{numbered}"
+        return intro or numbered
+
+    @staticmethod
+    def _structured_prompt(prepared: PreparedQuery) -> str:
+        return (
+            f"{prepared.prompt}\n\n"
+            "Return the answer as structured output: put each list item in `items` without numbering "
+            "and set `paraphrased` to whether every item respects the 6 consecutive words rule."
+        )
+
+    @staticmethod
+    def _message_text(message: Any) -> str:
+        return message.content if isinstance(message.content, str) else str(message.content)
+
+    @staticmethod
+    def _observe_prompt(stage: str, prompt: str) -> None:
+        if metrics_enabled():
+            observe_prompt_tokens(stage, count_tokens(prompt))
+
+    def _invoke(self, llm: "ChatOpenAI", prompt: str, stage: str) -> str:
+        self._observe_prompt(stage, prompt)
+        with timed(stage):
+            return self._message_text(llm.invoke(prompt))
+
+    async def _ainvoke(self, llm: "ChatOpenAI", prompt: str, stage: str) -> str:
+        self._observe_prompt(stage, prompt)
+        with timed(stage):
+            return self._message_text(await llm.ainvoke(prompt))
+
+    def _rewrite_to_paraphrase(
+        self,
+        llm: "ChatOpenAI",
+        answer: str,
+        contexts: list[str],
+        response_language: Literal["pt", "en"],
+    ) -> str:
+        rewrite_prompt = self._paraphrase_prompt(answer, contexts, response_language)
+        return self._invoke(llm, rewrite_prompt, "llm_rewrite_paraphrase")
+
+    def _rewrite_to_list(
+        self,
+        llm: "ChatOpenAI",
+        answer: str,
+        query: str,
+        contexts: list[str],
+        requested_count: int | None,
+        response_language: Literal["pt", "en"],
+    ) -> str:
+        rewrite_prompt = self._list_prompt(answer, query, contexts, requested_count, response_language)
+        return self._invoke(llm, rewrite_prompt, "llm_rewrite_list")
+
+    async def _arewrite_to_paraphrase(
+        self,
+        llm: "ChatOpenAI",
+        answer: str,
+        contexts: list[str],
+        response_language: Literal["pt", "en"],
+    ) -> str:
+        rewrite_prompt = self._paraphrase_prompt(answer, contexts, response_language)
+        return await self._ainvoke(llm, rewrite_prompt, "llm_rewrite_paraphrase")
+
+    async def _arewrite_to_list(
+        self,
+        llm: "ChatOpenAI",
+        answer: str,
+        query: str,
+        contexts: list[str],
+        requested_count: int | None,
+        response_language: Literal["pt", "en"],
+    ) -> str:
+        rewrite_prompt = self._list_prompt(answer, query, contexts, requested_count, response_language)
+        return await self._ainvoke(llm, rewrite_prompt, "llm_rewrite_list")
 
     def _fallback_answer(self, has_context: bool, response_language: Literal["pt", "en"]) -> str:
         if not has_context:
@@ -341,88 +463,184 @@ class QueryService:
             "Check `OPENAI_API_KEY` in `.env` and try again."
         )
 
-    def _build_llm(self) -> ChatOpenAI:
-        settings = get_settings()
-        return ChatOpenAI(
-            model=settings.openai_chat_model,
-            api_key=_openai_api_key(),
-            temperature=0.2,
-        )
+    def _build_llm(self) -> "ChatOpenAI":
+        # One client per process, so requests share its connection pool instead of opening their own.
+        return get_chat_model(_openai_api_key())
 
-    def query(self, message: str, top_k: int = 4) -> dict[str, Any]:
-        settings = get_settings()
+    def _analyze(self, message: str, top_k: int) -> PreparedQuery:
         query = message.strip()
         if not query:
             raise HTTPException(status_code=400, detail="message cannot be empty")
-        response_language = self._detect_query_language(query)
-        language_name = self._language_name(response_language)
-        missing_info_message = self._missing_info_message(response_language)
-        is_project_query = self._is_project_query(query)
-        is_list_query = self._is_list_query(query)
-        requested_count = self._extract_requested_count(query)
+        features = get_query_analyzer().analyze(query)
+        response_language = features.language
+        is_project_query = features.is_project_query
+        is_list_query = features.is_list_query
+        requested_count = features.requested_count
+        return PreparedQuery(
+            query=query,
+            top_k=top_k,
+            response_language=response_language,
+            is_project_query=is_project_query,
+            is_list_query=is_list_query,
+            requested_count=requested_count,
+            cache_scope=(PROMPT_VERSION, response_language, is_list_query, is_project_query, requested_count, top_k),
+        )
+
+    def _prepare(self, message: str, top_k: int) -> PreparedQuery:
+        prepared = self._analyze(message, top_k)
+        with timed("embed_query"):
+            prepared.query_vector = embed_query(prepared.query)
+        return self._prepare_context(prepared)
+
+    async def _aprepare(self, message: str, top_k: int) -> PreparedQuery:
+        prepared = self._analyze(message, top_k)
+        with timed("embed_query"):
+            prepared.query_vector = await aembed_query(prepared.query)
+        # Local Chroma search and context assembly are short CPU/disk work.
+        return await run_in_threadpool(self._prepare_context, prepared)
+
+    @staticmethod
+    def _search_k(top_k: int) -> int:
+        settings = get_settings()
+        if settings.hybrid_search_enabled:
+            return max(top_k * settings.hybrid_candidate_multiplier, top_k)
+        return max(top_k * 3, top_k)
+
+    @staticmethod
+    def _context_parts(pieces: list[ContextPiece]) -> list[str]:
+        parts: list[str] = []
+        for piece in pieces:
+            if piece.pinned:
+                parts.append(f"[CV_FIXO] ({piece.source_name})\n{piece.text}")
+            else:
+                parts.append(f"[{len(parts) + 1}] ({piece.source_name})\n{piece.text}")
+        return parts
+
+    def _answer_prompt(self, prepared: PreparedQuery, context_parts: list[str]) -> str:
+        language_name = self._language_name(prepared.response_language)
+        missing_info_message = self._missing_info_message(prepared.response_language)
+        context_block = "\n\n".join(context_parts)
+        return (
+            "Answer as a job candidate in first person, with professional and direct tone. "
+            "Use ONLY facts present in retrieved context. "
+            f"Response language: {language_name}. Always respond in {language_name}, even if sources contain mixed languages. "
+            f"Question type: {'projects' if prepared.is_project_query else 'general/career'}. "
+            f"Response format: {'markdown list' if prepared.is_list_query else 'short markdown text'}. "
+            "Mandatory rules: "
+            "1) Do not invent information. "
+            "2) Do not guess dates, companies, or technologies. "
+            "3) If something is unclear in context, reply exactly: "
+            f"\"{missing_info_message}\" "
+            "4) Do not copy context sentences literally; always paraphrase. "
+            "5) Do not use more than 6 consecutive words equal to context. "
+            "6) For project questions, prioritize project files and use resume as support only. "
+            "7) For general career questions, use resume as primary base. "
+            "8) Structure as an answer to a job interviewer. "
+            "9) If question asks for a list, respond with numbered items. "
+            f"10) If question asks for a quantity, try to deliver exactly that count: {prepared.requested_count if prepared.requested_count else 'not specified'}. "
+            "11) Keep the answer short and objective in markdown.\n\n"
+            f"User question:\n{prepared.query}\n\n"
+            "Context:\n"
+            f"{context_block}"
+        )
 
-        search_k = max(top_k * 3, top_k)
-        raw_results = self._search_with_auto_reindex(query=query, k=search_k)
+    def _prepare_context(
+        self,
+        prepared: PreparedQuery,
+        raw_results: list[tuple[Any, float]] | None = None,
+    ) -> PreparedQuery:
+        settings = get_settings()
+        query = prepared.query
+        top_k = prepared.top_k
+        response_language = prepared.response_language
+        is_project_query = prepared.is_project_query
+        query_vector = prepared.query_vector
+        cache_scope = prepared.cache_scope
+
+        answer_cache = get_answer_cache() if settings.answer_cache_enabled else None
+        if answer_cache is not None:
+            cached = answer_cache.find_similar(cache_scope, query_vector, get_collection_generation())
+            if cached is not None:
+                record_event("answer_cache_semantic_hit")
+                prepared.result = dict(cached)
+                return prepared
+
+        search_k = self._search_k(top_k)
+        language_filter = self._language_filter(prepared)
+        if raw_results is None:
+            raw_results = self._search_with_auto_reindex(query_vector=query_vector, k=search_k, filter=language_filter)
+        covered_groups: set[str] | None = None
+        if language_filter is not None:
+            raw_results, covered_groups = self._with_language_fallback(prepared, raw_results, search_k)
         if not raw_results:
-            try:
-                ingested = IngestionService().ingest_uploads_to_vector_db(reset_collection=False)
-                if ingested.get("chunks", 0) > 0:
-                    raw_results = self._search_with_auto_reindex(query=query, k=search_k)
-            except Exception:
-                # If bootstrap ingestion fails, keep graceful no-context fallback below.
-                pass
-
-        filtered_results: list[tuple[Any, float]] = []
-        for doc, distance in raw_results:
-            score = 1 / (1 + float(distance))
-            if score >= settings.retrieval_min_score:
-                filtered_results.append((doc, float(distance)))
-
-        if is_project_query:
-            filtered_results.sort(
-                key=lambda item: (
-                    0
-                    if self._is_project_source(str(item[0].metadata.get("source_name", "")))
-                    else 1,
-                    item[1],
-                )
+            # An empty store gets filled by a background job; this request answers without context.
+            jobs = get_ingestion_jobs()
+            if jobs.active() is None:
+                record_event("bootstrap_ingest")
+                jobs.submit(reason="empty_index")
+
+        if settings.hybrid_search_enabled and raw_results:
+            results = self._fuse_with_lexical(
+                query,
+                query_vector,
+                raw_results,
+                search_k,
+                top_k,
+                is_project_query,
+                language=language_filter["language"] if language_filter else None,
+                covered_groups=covered_groups,
             )
-        results = filtered_results[:top_k]
-        context_parts: list[str] = []
-        raw_contexts: list[str] = []
-        sources: list[dict[str, Any]] = []
-        fixed_resume_context = self._load_fixed_resume_context()
+        else:
+            filtered_results: list[tuple[Any, float]] = []
+            for doc, distance in raw_results:
+                score = 1 / (1 + float(distance))
+                if score >= settings.retrieval_min_score:
+                    filtered_results.append((doc, float(distance)))
 
-        for idx, (doc, distance) in enumerate(results, start=1):
+            if is_project_query:
+                filtered_results.sort(
+                    key=lambda item: (
+                        0
+                        if self._is_project_source(str(item[0].metadata.get("source_name", "")))
+                        else 1,
+                        item[1],
+                    )
+                )
+            results = filtered_results[:top_k]
+        with timed("resume_load"):
+            resume_name, fixed_resume_context = self._load_fixed_resume_context(response_language)
+        prepared.copy_index = ShingleIndex(size=settings.paraphrase_max_verbatim_words + 1)
+
+        for doc, distance in results:
             score = round(1 / (1 + float(distance)), 4)
             source_name = str(doc.metadata.get("source_name", "unknown"))
             excerpt = doc.page_content[:320].strip()
             if len(doc.page_content) > 320:
                 excerpt += "..."
 
-            sources.append(
+            prepared.sources.append(
                 {
                     "source_name": source_name,
                     "score": score,
                     "excerpt": excerpt,
                 }
             )
-            raw_contexts.append(doc.page_content)
-            context_parts.append(f"[{idx}] ({source_name})\n{doc.page_content}")
+            prepared.copy_index.add_document(doc.page_content, doc.metadata)
+            prepared.context_pieces.append(ContextPiece(source_name, doc.page_content))
 
         if fixed_resume_context:
             # Keep resume always available as requested, but after retrieved chunks to avoid overshadowing.
-            context_parts.append(f"[CV_FIXO] ({settings.fixed_resume_filename})\n{fixed_resume_context}")
-            raw_contexts.append(fixed_resume_context)
-            sources.append(
+            prepared.context_pieces.append(ContextPiece(resume_name, fixed_resume_context, pinned=True))
+            prepared.copy_index.add_text(fixed_resume_context)
+            prepared.sources.append(
                 {
-                    "source_name": settings.fixed_resume_filename,
+                    "source_name": resume_name,
                     "score": 1.0,
                     "excerpt": f"{fixed_resume_context[:320]}{'...' if len(fixed_resume_context) > 320 else ''}",
                 }
             )
 
-        if not raw_contexts:
+        if not prepared.context_pieces:
             if response_language == "pt":
                 no_context_answer = (
                     "Nao encontrei informacao confiavel o suficiente para responder com precisao. "
@@ -433,72 +651,444 @@ class QueryService:
                     "I could not find enough reliable information to answer precisely. "
                     "Add content to `rag/data/uploads/Curriculo.txt` and run ingestion again."
                 )
-            return {
+            prepared.result = {
                 "answer": no_context_answer,
                 "sources": [],
             }
+            return prepared
 
-        context_block = "\n\n".join(context_parts)
-        prompt = (
-            "Answer as a job candidate in first person, with professional and direct tone. "
-            "Use ONLY facts present in retrieved context. "
-            f"Response language: {language_name}. Always respond in {language_name}, even if sources contain mixed languages. "
-            f"Question type: {'projects' if is_project_query else 'general/career'}. "
-            f"Response format: {'markdown list' if is_list_query else 'short markdown text'}. "
-            "Mandatory rules: "
-            "1) Do not invent information. "
-            "2) Do not guess dates, companies, or technologies. "
-            "3) If something is unclear in context, reply exactly: "
-            f"\"{missing_info_message}\" "
-            "4) Do not copy context sentences literally; always paraphrase. "
-            "5) Do not use more than 6 consecutive words equal to context. "
-            "6) For project questions, prioritize project files and use resume as support only. "
-            "7) For general career questions, use resume as primary base. "
-            "8) Structure as an answer to a job interviewer. "
-            "9) If question asks for a list, respond with numbered items. "
-            f"10) If question asks for a quantity, try to deliver exactly that count: {requested_count if requested_count else 'not specified'}. "
-            "11) Keep the answer short and objective in markdown.\n\n"
-            f"User question:\n{query}\n\n"
-            "Context:\n"
-            f"{context_block}"
+        prepared.cache_key = (
+            cache_scope,
+            normalize_query_text(query),
+            tuple(str(doc.id or doc.metadata.get("chunk_id", "")) for doc, _ in results),
         )
+        prepared.generation = get_collection_generation()
+        if answer_cache is not None:
+            cached = answer_cache.get(prepared.cache_key, prepared.generation)
+            if cached is not None:
+                record_event("answer_cache_hit")
+                prepared.result = dict(cached)
+                return prepared
 
-        try:
-            llm = self._build_llm()
-            llm_response = llm.invoke(prompt)
-            answer = (
-                llm_response.content
-                if isinstance(llm_response.content, str)
-                else str(llm_response.content)
+        with timed("prompt_build"):
+            # Neighbouring chunks overlap by the splitter overlap and often repeat the fixed resume.
+            pieces = merge_pieces(prepared.context_pieces)
+            if len(pieces) < len(prepared.context_pieces):
+                record_event("context_pieces_merged", len(prepared.context_pieces) - len(pieces))
+            answer_pieces = pack_pieces(pieces, settings.answer_context_max_tokens)
+            if sum(len(piece.text) for piece in answer_pieces) < sum(len(piece.text) for piece in pieces):
+                record_event("context_budget_trimmed")
+            rewrite_pieces = pack_pieces(pieces, settings.rewrite_context_max_tokens)
+            prepared.rewrite_contexts = [piece.text for piece in rewrite_pieces]
+            prepared.prompt = self._answer_prompt(prepared, self._context_parts(answer_pieces))
+        return prepared
+
+    def _needs_paraphrase(self, answer: str, prepared: PreparedQuery) -> bool:
+        if prepared.copy_index is None:
+            return False
+        settings = get_settings()
+        report = prepared.copy_index.analyze(answer)
+        return (
+            report.longest_run > settings.paraphrase_max_verbatim_words
+            or report.overlap > settings.paraphrase_max_overlap
+        )
+
+    def _needs_list_rewrite(self, answer: str, prepared: PreparedQuery) -> bool:
+        if not prepared.is_list_query:
+            return False
+        current_items = self._count_markdown_list_items(answer)
+        needs_rewrite = current_items == 0
+        if prepared.requested_count:
+            needs_rewrite = needs_rewrite or current_items != prepared.requested_count
+        return needs_rewrite
+
+    def _postprocess_answer(self, llm: "ChatOpenAI", answer: str, prepared: PreparedQuery) -> str:
+        if self._needs_paraphrase(answer, prepared):
+            self.generation_stats.increment("rewrite_paraphrase")
+            answer = self._rewrite_to_paraphrase(
+                llm=llm,
+                answer=answer,
+                contexts=prepared.rewrite_contexts,
+                response_language=prepared.response_language,
+            )
+
+        if self._needs_list_rewrite(answer, prepared):
+            self.generation_stats.increment("rewrite_list")
+            answer = self._rewrite_to_list(
+                llm=llm,
+                answer=answer,
+                query=prepared.query,
+                contexts=prepared.rewrite_contexts,
+                requested_count=prepared.requested_count,
+                response_language=prepared.response_language,
+            )
+        return answer
+
+    async def _apostprocess_answer(self, llm: "ChatOpenAI", answer: str, prepared: PreparedQuery) -> str:
+        if self._needs_paraphrase(answer, prepared):
+            self.generation_stats.increment("rewrite_paraphrase")
+            answer = await self._arewrite_to_paraphrase(
+                llm=llm,
+                answer=answer,
+                contexts=prepared.rewrite_contexts,
+                response_language=prepared.response_language,
+            )
+
+        if self._needs_list_rewrite(answer, prepared):
+            self.generation_stats.increment("rewrite_list")
+            answer = await self._arewrite_to_list(
+                llm=llm,
+                answer=answer,
+                query=prepared.query,
+                contexts=prepared.rewrite_contexts,
+                requested_count=prepared.requested_count,
+                response_language=prepared.response_language,
+            )
+        return answer
+
+    def _plan_repair(
+        self,
+        answer: str,
+        prepared: PreparedQuery,
+        model_flagged_copy: bool = False,
+    ) -> str | None:
+        """Validates a single-pass answer locally and returns the one repair prompt, if any."""
+        needs_paraphrase = model_flagged_copy or self._needs_paraphrase(answer, prepared)
+        needs_list = self._needs_list_rewrite(answer, prepared)
+        if needs_paraphrase and needs_list:
+            self.generation_stats.increment("repair_combined")
+        elif needs_paraphrase:
+            self.generation_stats.increment("repair_paraphrase")
+        elif needs_list:
+            self.generation_stats.increment("repair_list")
+        else:
+            self.generation_stats.increment("single_pass_ok")
+            return None
+        return self._repair_prompt(answer, prepared, needs_paraphrase, needs_list)
+
+    def _parse_structured(self, structured: Any) -> tuple[str, bool]:
+        # Only the copy flag comes from the model; the item count is checked on the rendered list by _plan_repair.
+        if not isinstance(structured, StructuredListAnswer):
+            structured = StructuredListAnswer.model_validate(structured)
+        return self._render_structured_answer(structured), not structured.paraphrased
+
+    def _generate_answer(self, llm: "ChatOpenAI", prepared: PreparedQuery) -> str:
+        if get_settings().generation_mode == "multi_pass":
+            answer = self._invoke(llm, prepared.prompt, "llm_generate")
+            return self._postprocess_answer(llm, answer, prepared)
+
+        model_flagged_copy = False
+        answer: str | None = None
+        if prepared.is_list_query:
+            try:
+                structured_prompt = self._structured_prompt(prepared)
+                self._observe_prompt("llm_structured", structured_prompt)
+                with timed("llm_structured"):
+                    structured = llm.with_structured_output(StructuredListAnswer).invoke(structured_prompt)
+                answer, model_flagged_copy = self._parse_structured(structured)
+            except Exception:
+                self.generation_stats.increment("structured_fallback")
+        if answer is None:
+            answer = self._invoke(llm, prepared.prompt, "llm_generate")
+
+        repair_prompt = self._plan_repair(answer, prepared, model_flagged_copy)
+        if repair_prompt is None:
+            return answer
+        return self._invoke(llm, repair_prompt, "llm_repair")
+
+    async def _agenerate_answer(self, llm: "ChatOpenAI", prepared: PreparedQuery) -> str:
+        if get_settings().generation_mode == "multi_pass":
+            answer = await self._ainvoke(llm, prepared.prompt, "llm_generate")
+            return await self._apostprocess_answer(llm, answer, prepared)
+
+        model_flagged_copy = False
+        answer: str | None = None
+        if prepared.is_list_query:
+            try:
+                structured_prompt = self._structured_prompt(prepared)
+                self._observe_prompt("llm_structured", structured_prompt)
+                with timed("llm_structured"):
+                    structured = await llm.with_structured_output(StructuredListAnswer).ainvoke(structured_prompt)
+                answer, model_flagged_copy = self._parse_structured(structured)
+            except Exception:
+                self.generation_stats.increment("structured_fallback")
+        if answer is None:
+            answer = await self._ainvoke(llm, prepared.prompt, "llm_generate")
+
+        repair_prompt = self._plan_repair(answer, prepared, model_flagged_copy)
+        if repair_prompt is None:
+            return answer
+        return await self._ainvoke(llm, repair_prompt, "llm_repair")
+
+    def _fallback_result(self, prepared: PreparedQuery) -> dict[str, Any]:
+        answer = self._fallback_answer(
+            has_context=bool(prepared.sources),
+            response_language=prepared.response_language,
+        )
+        return {"answer": answer, "sources": self._visible_sources(prepared)}
+
+    @staticmethod
+    def _visible_sources(prepared: PreparedQuery) -> list[dict[str, Any]]:
+        return prepared.sources if get_settings().show_sources else []
+
+    def _store_result(self, prepared: PreparedQuery, answer: str) -> dict[str, Any]:
+        settings = get_settings()
+        result = {"answer": answer, "sources": self._visible_sources(prepared)}
+        if settings.answer_cache_enabled and prepared.cache_key is not None:
+            get_answer_cache().set(
+                prepared.cache_key,
+                prepared.cache_scope,
+                prepared.generation,
+                result,
+                query_vector=prepared.query_vector,
             )
+        return dict(result)
+
+    def _answer_prepared(self, prepared: PreparedQuery, llm: "ChatOpenAI | None" = None) -> dict[str, Any]:
+        if prepared.result is not None:
+            return prepared.result
+
+        try:
+            answer = self._generate_answer(llm or self._build_llm(), prepared)
+        except Exception:
+            return self._fallback_result(prepared)
+
+        return self._store_result(prepared, answer)
+
+    async def _aanswer_prepared(self, prepared: PreparedQuery, llm: "ChatOpenAI | None" = None) -> dict[str, Any]:
+        if prepared.result is not None:
+            return prepared.result
 
-            similarity = self._max_similarity_with_context(answer=answer, contexts=raw_contexts)
-            if similarity > 0.82:
-                answer = self._rewrite_to_paraphrase(
-                    llm=llm,
-                    answer=answer,
-                    contexts=raw_contexts,
-                    response_language=response_language,
+        try:
+            answer = await self._agenerate_answer(llm or self._build_llm(), prepared)
+        except Exception:
+            return self._fallback_result(prepared)
+
+        return self._store_result(prepared, answer)
+
+    def query(self, message: str, top_k: int = 4) -> dict[str, Any]:
+        return self._answer_prepared(self._prepare(message, top_k))
+
+    async def aquery(self, message: str, top_k: int = 4) -> dict[str, Any]:
+        return await self._aanswer_prepared(await self._aprepare(message, top_k))
+
+    @staticmethod
+    def _error_item(error: Exception) -> dict[str, Any]:
+        detail = error.detail if isinstance(error, HTTPException) else str(error) or type(error).__name__
+        return {"answer": None, "sources": [], "error": str(detail)}
+
+    def _analyze_many(self, messages: list[str], top_k: int) -> list[PreparedQuery | Exception]:
+        items: list[PreparedQuery | Exception] = []
+        for message in messages:
+            try:
+                items.append(self._analyze(message, top_k))
+            except Exception as exc:
+                items.append(exc)
+        return items
+
+    def _prepare_many_contexts(self, items: list[PreparedQuery | Exception]) -> list[PreparedQuery | Exception]:
+        prepared_items = [item for item in items if isinstance(item, PreparedQuery)]
+        if not prepared_items:
+            return items
+        by_language: dict[str | None, list[PreparedQuery]] = {}
+        for item in prepared_items:
+            language_filter = self._language_filter(item)
+            by_language.setdefault(language_filter["language"] if language_filter else None, []).append(item)
+        results_by_item: dict[int, Any] = {}
+        try:
+            # One store call per question language; each item still applies its own filtering.
+            for group in by_language.values():
+                batch_results = search_by_vectors(
+                    get_vector_store(),
+                    [item.query_vector for item in group],
+                    k=self._search_k(group[0].top_k),
+                    filter=self._language_filter(group[0]),
                 )
+                results_by_item.update((id(item), raw) for item, raw in zip(group, batch_results))
+        except Exception:
+            # Per-item searches keep the dimension-mismatch reindex path.
+            results_by_item = {}
 
-            if is_list_query:
-                current_items = self._count_markdown_list_items(answer)
-                needs_rewrite = current_items == 0
-                if requested_count:
-                    needs_rewrite = needs_rewrite or current_items != requested_count
-                if needs_rewrite:
-                    answer = self._rewrite_to_list(
-                        llm=llm,
-                        answer=answer,
-                        query=query,
-                        contexts=raw_contexts,
-                        requested_count=requested_count,
-                        response_language=response_language,
-                    )
+        prepared: list[PreparedQuery | Exception] = []
+        for item in items:
+            if isinstance(item, Exception):
+                prepared.append(item)
+                continue
+            try:
+                prepared.append(self._prepare_context(item, results_by_item.get(id(item))))
+            except Exception as exc:
+                prepared.append(exc)
+        return prepared
+
+    @staticmethod
+    def _group_by_cache_key(items: list[PreparedQuery | Exception]) -> dict[Any, list[int]]:
+        # Only repeats of one question share a generation: the cache key holds the normalized question
+        # text as well as the retrieved chunk ids, since different questions need different answers.
+        groups: dict[Any, list[int]] = {}
+        for index, item in enumerate(items):
+            if isinstance(item, Exception):
+                continue
+            key = item.cache_key if item.cache_key is not None and item.result is None else ("item", index)
+            groups.setdefault(key, []).append(index)
+        return groups
+
+    def _collect_batch(
+        self,
+        items: list[PreparedQuery | Exception],
+        groups: dict[Any, list[int]],
+        answers: list[dict[str, Any] | Exception],
+    ) -> list[dict[str, Any]]:
+        results: list[dict[str, Any]] = [{} for _ in items]
+        for index, item in enumerate(items):
+            if isinstance(item, Exception):
+                results[index] = self._error_item(item)
+        for indexes, answer in zip(groups.values(), answers):
+            for index in indexes:
+                if isinstance(answer, Exception):
+                    results[index] = self._error_item(answer)
+                else:
+                    results[index] = {**answer, "error": None}
+        return results
+
+    def _batch_llm(self) -> "ChatOpenAI | None":
+        try:
+            return self._build_llm()
         except Exception:
-            answer = self._fallback_answer(
-                has_context=bool(sources),
-                response_language=response_language,
+            # Each item then reports the regular fallback answer.
+            return None
+
+    def query_many(self, messages: list[str], top_k: int = 4) -> list[dict[str, Any]]:
+        """Answers several questions with one embedding call and one store search.
+
+        Results keep the input order; an item that fails carries ``error`` instead
+        of aborting the batch. Questions that repeat after case and whitespace
+        normalization (same answer cache key) are generated once. LLM calls run on
+        at most ``batch_max_concurrency`` threads.
+        """
+        items = self._analyze_many(messages, top_k)
+        prepared_items = [item for item in items if isinstance(item, PreparedQuery)]
+        for item, vector in zip(prepared_items, embed_queries([item.query for item in prepared_items])):
+            item.query_vector = vector
+        items = self._prepare_many_contexts(items)
+        groups = self._group_by_cache_key(items)
+        llm = self._batch_llm()
+
+        def answer_group(indexes: list[int]) -> dict[str, Any] | Exception:
+            try:
+                return self._answer_prepared(items[indexes[0]], llm)
+            except Exception as exc:
+                return exc
+
+        with ThreadPoolExecutor(max_workers=max(1, get_settings().batch_max_concurrency)) as executor:
+            answers = list(executor.map(answer_group, groups.values()))
+        return self._collect_batch(items, groups, answers)
+
+    async def aquery_many(self, messages: list[str], top_k: int = 4) -> list[dict[str, Any]]:
+        items = self._analyze_many(messages, top_k)
+        prepared_items = [item for item in items if isinstance(item, PreparedQuery)]
+        vectors = await aembed_queries([item.query for item in prepared_items])
+        for item, vector in zip(prepared_items, vectors):
+            item.query_vector = vector
+        items = await run_in_threadpool(self._prepare_many_contexts, items)
+        groups = self._group_by_cache_key(items)
+        llm = self._batch_llm()
+        semaphore = asyncio.Semaphore(max(1, get_settings().batch_max_concurrency))
+
+        async def answer_group(indexes: list[int]) -> dict[str, Any] | Exception:
+            async with semaphore:
+                try:
+                    return await self._aanswer_prepared(items[indexes[0]], llm)
+                except Exception as exc:
+                    return exc
+
+        answers = await asyncio.gather(*(answer_group(indexes) for indexes in groups.values()))
+        return self._collect_batch(items, groups, list(answers))
+
+    def stream_query(self, message: str, top_k: int = 4) -> Iterator[tuple[str, dict[str, Any]]]:
+        """Yields ``(event, payload)`` pairs for server-sent events.
+
+        Sources are emitted as soon as retrieval finishes and the main pass is
+        streamed token by token. Paraphrase/list checks still run on the full
+        answer; when one fires, a ``reset`` event tells the client to discard
+        the streamed text and only the final rewrite pass is streamed. A
+        ``done`` event always carries the final answer.
+        """
+        prepared = self._prepare(message, top_k)
+        if prepared.result is not None:
+            yield "sources", {"sources": prepared.result["sources"]}
+            yield "token", {"text": prepared.result["answer"]}
+            yield "done", prepared.result
+            return
+
+        yield "sources", {"sources": self._visible_sources(prepared)}
+        try:
+            llm = self._build_llm()
+            parts: list[str] = []
+            for text in self._stream_text(llm, prepared.prompt):
+                parts.append(text)
+                yield "token", {"text": text}
+            streamed_answer = "".join(parts)
+
+            answer, final_prompt = self._plan_final_pass(llm, streamed_answer, prepared)
+            if final_prompt is not None:
+                yield "reset", {}
+                parts = []
+                for text in self._stream_text(llm, final_prompt):
+                    parts.append(text)
+                    yield "token", {"text": text}
+                answer = "".join(parts)
+            elif answer != streamed_answer:
+                yield "reset", {}
+                yield "token", {"text": answer}
+        except Exception:
+            result = self._fallback_result(prepared)
+            yield "reset", {}
+            yield "token", {"text": result["answer"]}
+            yield "done", result
+            return
+
+        yield "done", self._store_result(prepared, answer)
+
+    def _stream_text(self, llm: "ChatOpenAI", prompt: str) -> Iterator[str]:
+        self._observe_prompt("llm_stream", prompt)
+        with timed("llm_stream"):
+            for chunk in llm.stream(prompt):
+                text = self._message_text(chunk)
+                if text:
+                    yield text
+
+    def _plan_final_pass(
+        self,
+        llm: "ChatOpenAI",
+        answer: str,
+        prepared: PreparedQuery,
+    ) -> tuple[str, str | None]:
+        """Runs every rewrite except the last one and returns the last pass prompt.
+
+        Mirrors the blocking generation modes so streaming and blocking answers
+        follow the same rules; only the final pass is left for the caller to stream.
+        """
+        if get_settings().generation_mode != "multi_pass":
+            return answer, self._plan_repair(answer, prepared)
+
+        if self._needs_paraphrase(answer, prepared):
+            self.generation_stats.increment("rewrite_paraphrase")
+            if not prepared.is_list_query:
+                return answer, self._paraphrase_prompt(answer, prepared.rewrite_contexts, prepared.response_language)
+            answer = self._rewrite_to_paraphrase(
+                llm=llm,
+                answer=answer,
+                contexts=prepared.rewrite_contexts,
+                response_language=prepared.response_language,
             )
 
-        return {"answer": answer, "sources": sources if settings.show_sources else []}
+        if self._needs_list_rewrite(answer, prepared):
+            self.generation_stats.increment("rewrite_list")
+            return answer, self._list_prompt(
+                answer,
+                prepared.query,
+                prepared.rewrite_contexts,
+                prepared.requested_count,
+                prepared.response_language,
+            )
+        return answer, None
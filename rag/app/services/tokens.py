@@ -0,0 +1,45 @@
+import logging
+from functools import lru_cache
+from typing import Any
+
+from rag.app.core.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache
+def _encoding() -> Any | None:
+    try:
+        import tiktoken
+
+        try:
+            return tiktoken.encoding_for_model(get_settings().openai_chat_model)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception:
+        # tiktoken downloads its BPE files on first use; offline hosts fall back to an estimate.
+        logger.warning("tiktoken encoding unavailable; estimating token counts from text length.")
+        return None
+
+
+def count_tokens(text: str) -> int:
+    if not text:
+        return 0
+    encoding = _encoding()
+    if encoding is None:
+        return max(1, len(text) // 4)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Keeps the first ``max_tokens`` tokens of ``text``."""
+    if max_tokens <= 0:
+        return ""
+    encoding = _encoding()
+    if encoding is None:
+        return text[: max_tokens * 4]
+    tokens = encoding.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+    # Decoding a cut in the middle of a multi-byte character would leave a replacement char.
+    return encoding.decode(tokens[:max_tokens]).rstrip("�")
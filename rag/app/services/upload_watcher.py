@@ -0,0 +1,78 @@
+import logging
+import threading
+from pathlib import Path
+
+from rag.app.services.document_cache import cacheable_upload_paths, file_signature, get_document_cache
+from rag.app.services.ingestion_jobs import get_ingestion_jobs
+from rag.app.services.ingestion_service import list_upload_files
+from rag.app.services.vector_store import mark_collection_changed
+
+logger = logging.getLogger(__name__)
+
+
+class UploadWatcher:
+    """Polls ``UPLOADS_DIR`` and keeps the resume text and the vector index current off the request path.
+
+    A change is acted on once the directory has been stable for one extra poll,
+    so half-copied files are not ingested. Reindexing goes through the ingestion
+    job queue, so it never overlaps with uploads or other workers' runs.
+    """
+
+    def __init__(self, interval_seconds: float = 2.0, reindex: bool = True) -> None:
+        self._interval_seconds = interval_seconds
+        self._reindex = reindex
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._last_snapshot: dict[Path, tuple[int, int] | None] | None = None
+        self._pending_snapshot: dict[Path, tuple[int, int] | None] | None = None
+
+    @staticmethod
+    def _snapshot() -> dict[Path, tuple[int, int] | None]:
+        return {path: file_signature(path) for path in list_upload_files()}
+
+    def prime(self) -> None:
+        snapshot = self._snapshot()
+        get_document_cache().refresh(cacheable_upload_paths(list(snapshot)))
+        self._last_snapshot = snapshot
+
+    def poll_once(self) -> bool:
+        snapshot = self._snapshot()
+        if snapshot == self._last_snapshot:
+            self._pending_snapshot = None
+            return False
+        if snapshot != self._pending_snapshot:
+            # Wait for one more poll with the same snapshot before acting.
+            self._pending_snapshot = snapshot
+            return False
+
+        self._pending_snapshot = None
+        self._last_snapshot = snapshot
+        get_document_cache().refresh(cacheable_upload_paths(list(snapshot)))
+        if self._reindex:
+            job = get_ingestion_jobs().submit(reason="upload_watcher")
+            logger.info("Upload change detected; ingestion job %s queued.", job.id)
+        # Other workers may have ingested the change; cached answers are stale either way.
+        mark_collection_changed()
+        return True
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval_seconds):
+            try:
+                self.poll_once()
+            except Exception:
+                logger.exception("Upload watcher poll failed.")
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        if self._last_snapshot is None:
+            self.prime()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="upload-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self._interval_seconds + 1)
+            self._thread = None
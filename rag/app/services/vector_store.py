@@ -1,14 +1,32 @@
+import asyncio
 import hashlib
+import json
+import logging
 import os
 import re
-from typing import Any
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, TypeAlias
 
 from fastapi import HTTPException
-from langchain_chroma import Chroma
-from langchain_openai import OpenAIEmbeddings
+from langchain_core.documents import Document
 
-from rag.app.core.paths import VECTOR_DB_DIR, ensure_rag_dirs
+from rag.app.core.paths import EMBEDDING_CACHE_PATH, VECTOR_DB_DIR, VECTOR_INDEX_PATH, ensure_rag_dirs
 from rag.app.core.settings import get_settings
+from rag.app.services.embedding_batcher import EmbeddingBatcher, embeds_queries_as_documents
+from rag.app.services.embedding_cache import EmbeddingCache, build_cache_key, normalize_query_text
+from rag.app.services.numpy_store import NumpyVectorStore
+from rag.app.services.openai_clients import openai_client_kwargs
+
+if TYPE_CHECKING:
+    from langchain_chroma import Chroma
+
+logger = logging.getLogger(__name__)
+
+# chromadb and langchain_openai are imported on first use to keep `import rag.app.main` fast.
+VectorStore: TypeAlias = "Chroma | NumpyVectorStore"
 
 
 def _openai_api_key() -> str:
@@ -38,9 +56,12 @@ def build_embeddings() -> Any:
             ) from exc
         return HuggingFaceEmbeddings(model_name=settings.sentence_transformers_model)
 
+    from langchain_openai import OpenAIEmbeddings
+
     return OpenAIEmbeddings(
         model=settings.openai_embedding_model,
         api_key=_openai_api_key(),
+        **openai_client_kwargs(),
     )
 
 
@@ -63,10 +84,352 @@ def _build_collection_name() -> str:
     return f"portfolio_rag_{profile_slug}_{profile_hash}"
 
 
-def get_vector_store() -> Chroma:
-    ensure_rag_dirs()
+def collection_artifact_path(suffix: str, collection_name: str | None = None) -> Path:
+    """Path for files persisted next to a collection (manifests, indexes); the active one by default."""
+    return VECTOR_DB_DIR / f"{collection_name or get_active_collection_name()}{suffix}"
+
+
+# Process-wide registry keyed by embedding profile (collection name). Building a
+# Chroma client reopens the SQLite file and building embeddings may load model
+# weights, so both are created once and shared across threadpool workers.
+_registry_lock = threading.Lock()
+_embeddings_registry: dict[str, Any] = {}
+_store_registry: dict[str, VectorStore] = {}
+# Bumped whenever ingestion changes the collection so derived caches can drop stale entries.
+_collection_generation = 0
+# Embedding profile -> (alias file signature, active physical collection).
+_active_collections: dict[str, tuple[tuple[int, int] | None, str]] = {}
+
+
+def get_collection_generation() -> int:
+    return _collection_generation
+
+
+def mark_collection_changed() -> None:
+    global _collection_generation
+    with _registry_lock:
+        _collection_generation += 1
+
+
+def get_embeddings() -> Any:
+    collection_name = _build_collection_name()
+    embeddings = _embeddings_registry.get(collection_name)
+    if embeddings is not None:
+        return embeddings
+
+    with _registry_lock:
+        embeddings = _embeddings_registry.get(collection_name)
+        if embeddings is None:
+            embeddings = build_embeddings()
+            settings = get_settings()
+            if (
+                settings.embeddings_provider == "sentence_transformers"
+                and settings.embedding_batching_enabled
+                and embeds_queries_as_documents(embeddings)
+            ):
+                # Local encoding is CPU-bound; concurrent single-query calls are merged into one batch.
+                embeddings = EmbeddingBatcher(
+                    embeddings,
+                    max_batch_size=settings.embedding_batch_max_size,
+                    max_wait_seconds=settings.embedding_batch_max_wait_ms / 1000,
+                )
+            _embeddings_registry[collection_name] = embeddings
+        return embeddings
+
+
+def _build_vector_store(collection_name: str, embeddings: Any) -> VectorStore:
+    settings = get_settings()
+    if settings.vector_backend == "numpy":
+        return NumpyVectorStore(
+            collection_name=collection_name,
+            index_path=VECTOR_INDEX_PATH.with_name(f"{collection_name}.{VECTOR_INDEX_PATH.name}"),
+            embedding_function=embeddings,
+            dtype=settings.vector_index_dtype,
+        )
+    from langchain_chroma import Chroma
+
     return Chroma(
-        collection_name=_build_collection_name(),
+        collection_name=collection_name,
         persist_directory=str(VECTOR_DB_DIR),
-        embedding_function=build_embeddings(),
+        embedding_function=embeddings,
     )
+
+
+def _alias_path(profile_name: str) -> Path:
+    return VECTOR_DB_DIR / f"{profile_name}.alias.json"
+
+
+def _alias_signature(path: Path) -> tuple[int, int] | None:
+    try:
+        file_stat = path.stat()
+    except OSError:
+        return None
+    return file_stat.st_ino, file_stat.st_mtime_ns
+
+
+def _read_alias(path: Path) -> dict[str, Any]:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def get_active_collection_name() -> str:
+    """Physical collection the profile's alias points to.
+
+    Rebuilds write a new ``<profile>_v<N>`` collection and swap the alias file
+    atomically; other processes notice the swap here on their next lookup.
+    Profiles without an alias file keep using the unversioned collection name.
+    """
+    profile_name = _build_collection_name()
+    path = _alias_path(profile_name)
+    signature = _alias_signature(path)
+    cached = _active_collections.get(profile_name)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    fallback = cached[1] if cached is not None else profile_name
+    name = str(_read_alias(path).get("collection") or fallback) if signature is not None else profile_name
+    with _registry_lock:
+        _active_collections[profile_name] = (signature, name)
+    if cached is not None and cached[1] != name:
+        mark_collection_changed()
+    return name
+
+
+def open_vector_store(collection_name: str) -> VectorStore:
+    vector_store = _store_registry.get(collection_name)
+    if vector_store is not None:
+        return vector_store
+
+    embeddings = get_embeddings()
+    with _registry_lock:
+        vector_store = _store_registry.get(collection_name)
+        if vector_store is None:
+            ensure_rag_dirs()
+            vector_store = _build_vector_store(collection_name, embeddings)
+            _store_registry[collection_name] = vector_store
+        return vector_store
+
+
+def get_vector_store() -> VectorStore:
+    return open_vector_store(get_active_collection_name())
+
+
+def create_collection_version() -> tuple[str, VectorStore]:
+    """Opens an empty collection for a full rebuild; queries keep using the active one until the swap."""
+    profile_name = _build_collection_name()
+    active = get_active_collection_name()
+    match = re.fullmatch(re.escape(profile_name) + r"_v(\d+)", active)
+    collection_name = f"{profile_name}_v{int(match.group(1)) + 1 if match else 1}"
+    vector_store = open_vector_store(collection_name)
+    if count_vectors(vector_store):
+        # Leftovers of a build that failed before its swap.
+        vector_store.reset_collection()
+    return collection_name, vector_store
+
+
+def drop_collection(collection_name: str) -> None:
+    vector_store = open_vector_store(collection_name)
+    with _registry_lock:
+        _store_registry.pop(collection_name, None)
+    vector_store.delete_collection()
+    # A legacy unversioned collection shares its name with the profile, so spare the alias file.
+    alias_path = _alias_path(collection_name)
+    for path in VECTOR_DB_DIR.glob(f"{collection_name}.*"):
+        if path != alias_path:
+            path.unlink(missing_ok=True)
+
+
+def activate_collection(collection_name: str) -> None:
+    """Points the profile's alias at ``collection_name`` and drops the version before the previous one.
+
+    The previous version is kept so requests already holding it can finish.
+    """
+    profile_name = _build_collection_name()
+    path = _alias_path(profile_name)
+    alias = _read_alias(path)
+    previous = get_active_collection_name()
+    ensure_rag_dirs()
+    tmp_path = path.with_suffix(".tmp")
+    payload = {"collection": collection_name, "previous": previous, "activated_at": time.time()}
+    tmp_path.write_text(json.dumps(payload), encoding="utf-8")
+    os.replace(tmp_path, path)
+    with _registry_lock:
+        _active_collections[profile_name] = (_alias_signature(path), collection_name)
+    mark_collection_changed()
+
+    retired = alias.get("previous")
+    if retired and retired not in (collection_name, previous):
+        try:
+            drop_collection(str(retired))
+        except Exception:
+            logger.exception("Could not drop retired collection %s.", retired)
+
+
+def count_vectors(vector_store: VectorStore) -> int:
+    if isinstance(vector_store, NumpyVectorStore):
+        return vector_store.count()
+    return vector_store._collection.count()
+
+
+def upsert_embeddings(
+    vector_store: VectorStore,
+    ids: list[str],
+    embeddings: list[list[float]],
+    documents: list[str],
+    metadatas: list[dict[str, Any]],
+) -> None:
+    # Writes precomputed vectors, so the store does not embed the texts a second time.
+    if isinstance(vector_store, NumpyVectorStore):
+        vector_store.upsert(ids=ids, embeddings=embeddings, documents=documents, metadatas=metadatas)
+        return
+    vector_store._collection.upsert(
+        ids=ids,
+        embeddings=embeddings,
+        documents=documents,
+        metadatas=metadatas,
+    )
+
+
+def fetch_documents_with_distances(
+    vector_store: VectorStore,
+    ids: list[str],
+    query_vector: list[float],
+) -> list[tuple[Document, float]]:
+    """Loads documents by id with the same squared-L2 distance Chroma reports for searches."""
+    if not ids:
+        return []
+    stored = vector_store.get(ids=ids, include=["documents", "metadatas", "embeddings"])
+    results: list[tuple[Document, float]] = []
+    for doc_id, text, metadata, embedding in zip(
+        stored["ids"], stored["documents"], stored["metadatas"], stored["embeddings"]
+    ):
+        if text is None:
+            continue
+        distance = sum((float(a) - float(b)) ** 2 for a, b in zip(query_vector, embedding))
+        results.append((Document(page_content=text, metadata=metadata or {}, id=doc_id), distance))
+    return results
+
+
+def search_by_vectors(
+    vector_store: VectorStore,
+    query_vectors: list[list[float]],
+    k: int,
+    filter: dict[str, Any] | None = None,
+) -> list[list[tuple[Document, float]]]:
+    """Runs several vector searches in one store call; results are in query order."""
+    if not query_vectors:
+        return []
+    if isinstance(vector_store, NumpyVectorStore):
+        return vector_store.similarity_search_by_vectors_with_relevance_scores(query_vectors, k=k, filter=filter)
+
+    response = vector_store._collection.query(
+        query_embeddings=query_vectors,
+        n_results=k,
+        where=filter or None,
+        include=["documents", "metadatas", "distances"],
+    )
+    batches: list[list[tuple[Document, float]]] = []
+    for ids, texts, metadatas, distances in zip(
+        response["ids"], response["documents"], response["metadatas"], response["distances"]
+    ):
+        batches.append(
+            [
+                (Document(page_content=text, metadata=metadata or {}, id=doc_id), float(distance))
+                for doc_id, text, metadata, distance in zip(ids, texts, metadatas, distances)
+                if text is not None
+            ]
+        )
+    return batches
+
+
+def warm_vector_store() -> None:
+    get_vector_store()
+
+
+@lru_cache
+def get_embedding_cache() -> EmbeddingCache:
+    settings = get_settings()
+    return EmbeddingCache(
+        max_entries=settings.embedding_cache_max_entries,
+        ttl_seconds=settings.embedding_cache_ttl_seconds,
+        disk_path=EMBEDDING_CACHE_PATH if settings.embedding_cache_disk_enabled else None,
+    )
+
+
+def _query_cache_key(text: str) -> str:
+    # Only the key is normalized; the model still embeds the question as the user wrote it.
+    return build_cache_key(_build_collection_name(), normalize_query_text(text))
+
+
+def embed_query(text: str) -> list[float]:
+    cache = get_embedding_cache()
+    key = _query_cache_key(text)
+    vector = cache.get(key)
+    if vector is None:
+        vector = list(get_embeddings().embed_query(text))
+        cache.set(key, vector)
+    return vector
+
+
+async def aembed_query(text: str) -> list[float]:
+    cache = get_embedding_cache()
+    key = _query_cache_key(text)
+    vector = cache.get(key)
+    if vector is None:
+        vector = list(await get_embeddings().aembed_query(text))
+        cache.set(key, vector)
+    return vector
+
+
+def _split_cached(texts: list[str]) -> tuple[list[str], dict[str, list[float]], dict[str, str]]:
+    """Cache keys per text, cached vectors by key, and the first text seen for each uncached key."""
+    cache = get_embedding_cache()
+    keys = [_query_cache_key(text) for text in texts]
+    found: dict[str, list[float]] = {}
+    missing: dict[str, str] = {}
+    for key, text in zip(keys, texts):
+        if key in found or key in missing:
+            continue
+        vector = cache.get(key)
+        if vector is None:
+            missing[key] = text
+        else:
+            found[key] = vector
+    return keys, found, missing
+
+
+def _store_batch(found: dict[str, list[float]], missing: dict[str, str], vectors: list[list[float]]) -> None:
+    cache = get_embedding_cache()
+    for key, vector in zip(missing, vectors):
+        found[key] = list(vector)
+        cache.set(key, found[key])
+
+
+def embed_queries(texts: list[str]) -> list[list[float]]:
+    """Embeds many queries with one model call for the uncached, distinct ones.
+
+    Models with query instructions are called once per query instead, so the vectors match ``embed_query``.
+    """
+    keys, found, missing = _split_cached(texts)
+    if missing:
+        embeddings = get_embeddings()
+        if embeds_queries_as_documents(embeddings):
+            vectors = embeddings.embed_documents(list(missing.values()))
+        else:
+            vectors = [embeddings.embed_query(text) for text in missing.values()]
+        _store_batch(found, missing, vectors)
+    return [found[key] for key in keys]
+
+
+async def aembed_queries(texts: list[str]) -> list[list[float]]:
+    keys, found, missing = _split_cached(texts)
+    if missing:
+        embeddings = get_embeddings()
+        if embeds_queries_as_documents(embeddings):
+            vectors = await embeddings.aembed_documents(list(missing.values()))
+        else:
+            vectors = list(await asyncio.gather(*(embeddings.aembed_query(text) for text in missing.values())))
+        _store_batch(found, missing, vectors)
+    return [found[key] for key in keys]
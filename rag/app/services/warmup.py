@@ -0,0 +1,134 @@
+import logging
+import threading
+import time
+from collections.abc import Callable
+from functools import lru_cache
+from typing import Any
+
+from fastapi.concurrency import run_in_threadpool
+
+from rag.app.core.settings import get_settings
+from rag.app.services.document_cache import cacheable_upload_paths, get_document_cache
+from rag.app.services.ingestion_jobs import get_ingestion_jobs
+from rag.app.services.ingestion_service import list_upload_files
+from rag.app.services.upload_watcher import UploadWatcher
+from rag.app.services.vector_store import count_vectors, embed_query, get_vector_store, warm_vector_store
+
+logger = logging.getLogger(__name__)
+
+
+class WarmupState:
+    """Tracks the lifespan warmup so ``/readyz`` can report it."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.started_at: float | None = None
+        self.ready = False
+        self.error: str | None = None
+        self.steps: dict[str, float] = {}
+
+    def reset(self) -> None:
+        with self._lock:
+            self.started_at = time.time()
+            self.ready = False
+            self.error = None
+            self.steps = {}
+
+    def record_step(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self.steps[name] = round(seconds * 1000, 2)
+
+    def finish(self, error: str | None = None) -> None:
+        with self._lock:
+            self.error = error
+            self.ready = error is None
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "ready": self.ready,
+                "error": self.error,
+                "started_at": self.started_at,
+                "steps_ms": dict(self.steps),
+            }
+
+
+@lru_cache
+def get_warmup_state() -> WarmupState:
+    return WarmupState()
+
+
+def _load_uploads(watcher: UploadWatcher | None) -> None:
+    # Loads and normalizes the fixed resume before serving traffic.
+    if watcher is not None:
+        watcher.prime()
+        watcher.start()
+    else:
+        get_document_cache().refresh(cacheable_upload_paths(list_upload_files()))
+
+
+def _bootstrap_index() -> None:
+    # A fresh deployment indexes its uploads before it reports ready.
+    if count_vectors(get_vector_store()) > 0 or not list_upload_files():
+        return
+    job = get_ingestion_jobs().submit(reason="startup")
+    job.wait()
+    if job.status == "failed":
+        raise RuntimeError(f"ingestion job {job.id} failed: {job.error}")
+
+
+def _warm_lexical_index() -> None:
+    from rag.app.services.lexical_index import get_lexical_index
+
+    get_lexical_index()
+
+
+def _warm_chat_model() -> None:
+    # Imports langchain_openai and builds the shared client and its connection pools. A missing or
+    # placeholder API key fails this step, like the OpenAI embedder does in the vector_store step:
+    # a worker that can only send fallback answers is not ready.
+    from rag.app.services.query_service import QueryService
+
+    QueryService()._build_llm()
+
+
+def _run_test_query(message: str) -> None:
+    from rag.app.services.query_service import QueryService
+
+    QueryService().query(message)
+
+
+def _warmup_steps(watcher: UploadWatcher | None) -> list[tuple[str, Callable[[], None]]]:
+    settings = get_settings()
+    steps: list[tuple[str, Callable[[], None]]] = [
+        ("uploads", lambda: _load_uploads(watcher)),
+        # Opens the Chroma client (or maps the numpy index) and builds the embedder.
+        ("vector_store", warm_vector_store),
+        ("bootstrap_index", _bootstrap_index),
+    ]
+    if settings.warmup_embed_probe:
+        # Loads sentence_transformers weights or opens the HTTPS connection to OpenAI.
+        steps.append(("embed_probe", lambda: embed_query("warmup")))
+    steps.append(("chat_model", _warm_chat_model))
+    if settings.hybrid_search_enabled:
+        steps.append(("lexical_index", _warm_lexical_index))
+    if settings.warmup_test_query:
+        message = settings.warmup_test_query
+        steps.append(("test_query", lambda: _run_test_query(message)))
+    return steps
+
+
+async def run_warmup(state: WarmupState, watcher: UploadWatcher | None = None) -> None:
+    """Runs every warmup step off the event loop; the worker is ready only if all of them succeed."""
+    state.reset()
+    for name, step in _warmup_steps(watcher):
+        started = time.perf_counter()
+        try:
+            await run_in_threadpool(step)
+        except Exception as exc:
+            logger.exception("Warmup step %s failed; the worker stays not ready.", name)
+            state.finish(error=f"{name}: {exc}")
+            return
+        state.record_step(name, time.perf_counter() - started)
+    state.finish()
+    logger.info("Warmup finished: %s", state.snapshot()["steps_ms"])
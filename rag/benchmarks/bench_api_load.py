@@ -0,0 +1,126 @@
+"""Benchmark: the FastAPI app under concurrent load, in-process via httpx.
+
+Run with ``python -m rag.benchmarks.bench_api_load --concurrency 1,8,32``.
+Requests go through ASGI (no sockets), so results reflect the app and its
+threadpool usage rather than the network stack. With ``--openai-base-url`` the
+real chat client calls an OpenAI-compatible server instead of the fake model,
+e.g. ``rag.benchmarks.openai_stub``, so its connection pool and timeouts are exercised too.
+"""
+
+import argparse
+import asyncio
+import itertools
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+from rag.benchmarks.fakes import FakeChatModel, FakeEmbeddings
+from rag.benchmarks.harness import emit, install_fakes, percentiles, use_isolated_data_dir, write_synthetic_corpus
+
+MESSAGES = (
+    "What is your experience with monitoring and dashboards?",
+    "Liste 3 coisas que você automatizou",
+    "Tell me about the homelab project you built",
+    "Qual a sua experiência com integrações de pagamento?",
+)
+_variants = itertools.count()
+
+
+async def _load(
+    client: httpx.AsyncClient,
+    path: str,
+    concurrency: int,
+    requests: int,
+    unique: bool,
+) -> dict[str, float | int]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    errors = 0
+
+    async def one(index: int) -> None:
+        nonlocal errors
+        message = MESSAGES[index % len(MESSAGES)]
+        if unique:
+            # Defeats the answer cache so every request retrieves and generates.
+            message = f"{message} (variant {next(_variants)})"
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.post(path, json={"message": message})
+            if path.endswith("/stream"):
+                await response.aread()
+            latencies.append((time.perf_counter() - started) * 1000)
+            if response.status_code != 200:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(index) for index in range(requests)))
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": requests,
+        "errors": errors,
+        "throughput_rps": round(requests / elapsed, 2),
+        **percentiles(latencies),
+    }
+
+
+async def _run(args: argparse.Namespace) -> list[dict[str, object]]:
+    from rag.app.core.paths import UPLOADS_DIR
+    from rag.app.main import app
+    from rag.app.services.ingestion_service import IngestionService
+
+    write_synthetic_corpus(UPLOADS_DIR, args.files)
+    IngestionService().ingest_uploads_to_vector_db()
+
+    results: list[dict[str, object]] = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        await client.post("/rag/chat", json={"message": MESSAGES[0]})
+        for endpoint in ("/rag/chat", "/rag/chat/stream"):
+            for concurrency in [int(value) for value in args.concurrency.split(",") if value.strip()]:
+                for unique in (True, False):
+                    stats = await _load(client, endpoint, concurrency, args.requests, unique)
+                    results.append(
+                        {
+                            "endpoint": endpoint,
+                            "concurrency": concurrency,
+                            "answer_cache": "miss" if unique else "hit",
+                            **stats,
+                        }
+                    )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--concurrency", default="1,8,32")
+    parser.add_argument("--llm-latency-ms", type=float, default=50.0)
+    parser.add_argument("--openai-base-url", help="e.g. http://127.0.0.1:9000/v1 (see rag.benchmarks.openai_stub)")
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        use_isolated_data_dir(Path(tmp))
+        if args.openai_base_url:
+            os.environ["OPENAI_BASE_URL"] = args.openai_base_url
+            install_fakes(FakeEmbeddings(), None)
+        else:
+            install_fakes(FakeEmbeddings(), FakeChatModel(latency_seconds=args.llm_latency_ms / 1000))
+        results = asyncio.run(_run(args))
+
+    config = {
+        "files": args.files,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "llm_latency_ms": args.llm_latency_ms,
+        "openai_base_url": args.openai_base_url,
+    }
+    emit("api_load", config, results, args.output)
+
+
+if __name__ == "__main__":
+    main()
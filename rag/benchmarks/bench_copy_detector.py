@@ -0,0 +1,93 @@
+"""Microbenchmark: shingle-index copy check vs. the previous SequenceMatcher ratio.
+
+Run with ``python -m rag.benchmarks.bench_copy_detector``.
+"""
+
+import argparse
+import json
+import re
+import time
+from difflib import SequenceMatcher
+
+from rag.app.core.paths import UPLOADS_DIR
+from rag.app.services.copy_detector import ShingleIndex
+from rag.app.services.document_cache import normalize_text, read_text_file
+
+
+def _normalize_for_similarity(text: str) -> str:
+    normalized = re.sub(r"\s+", " ", text.lower()).strip()
+    return re.sub(r"[^\w\s]", "", normalized)
+
+
+def legacy_max_similarity(answer: str, contexts: list[str]) -> float:
+    # Copy of the removed QueryService._max_similarity_with_context, kept as the baseline.
+    answer_normalized = _normalize_for_similarity(answer)
+    best = 0.0
+    for context in contexts:
+        context_normalized = _normalize_for_similarity(context)
+        if context_normalized:
+            best = max(best, SequenceMatcher(None, answer_normalized, context_normalized).ratio())
+    return best
+
+
+def _load_contexts(chunk_chars: int) -> list[str]:
+    contexts: list[str] = []
+    for path in sorted(UPLOADS_DIR.glob("*.txt")):
+        text = normalize_text(read_text_file(path))
+        contexts.extend(text[i : i + chunk_chars] for i in range(0, len(text), chunk_chars))
+    return [context for context in contexts if context.strip()]
+
+
+def _answers(contexts: list[str]) -> dict[str, str]:
+    sample = contexts[len(contexts) // 2]
+    words = sample.split()
+    return {
+        "copied": " ".join(words[:60]),
+        "partial_copy": "In my experience I worked on " + " ".join(words[10:20]) + " and other topics.",
+        "paraphrased": "I have built several projects that combine backend APIs, automation and data tooling.",
+    }
+
+
+def _time(fn, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--contexts", type=int, default=5, help="context chunks per check (top_k + resume)")
+    parser.add_argument("--chunk-chars", type=int, default=900)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    contexts = _load_contexts(args.chunk_chars)[: args.contexts]
+    results = []
+    for name, answer in _answers(contexts).items():
+        def build_and_check() -> None:
+            index = ShingleIndex(size=7)
+            for context in contexts:
+                index.add_text(context)
+            index.analyze(answer)
+
+        index = ShingleIndex(size=7)
+        for context in contexts:
+            index.add_text(context)
+        report = index.analyze(answer)
+        results.append(
+            {
+                "answer": name,
+                "legacy_ratio": round(legacy_max_similarity(answer, contexts), 4),
+                "legacy_ms": round(_time(lambda: legacy_max_similarity(answer, contexts), args.repeat), 4),
+                "longest_run": report.longest_run,
+                "overlap": round(report.overlap, 4),
+                "shingle_ms": round(_time(lambda: index.analyze(answer), args.repeat), 4),
+                "shingle_with_index_build_ms": round(_time(build_and_check, args.repeat), 4),
+            }
+        )
+    print(json.dumps({"benchmark": "copy_detector", "contexts": len(contexts), "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
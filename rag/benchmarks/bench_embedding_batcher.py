@@ -0,0 +1,83 @@
+"""Benchmark: concurrent query embeddings, direct vs the micro-batcher.
+
+Run with ``python -m rag.benchmarks.bench_embedding_batcher``. The fake model
+holds a lock while "encoding", like a CPU-bound local model, and charges a
+fixed cost per call plus a smaller cost per text, so batching pays off the same
+way it does for sentence-transformers.
+"""
+
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from rag.app.services.embedding_batcher import EmbeddingBatcher
+from rag.benchmarks.fakes import FakeEmbeddings
+from rag.benchmarks.harness import emit, percentiles
+
+
+class _LocalModel(FakeEmbeddings):
+    def __init__(self, call_seconds: float, item_seconds: float) -> None:
+        super().__init__()
+        self.call_seconds = call_seconds
+        self.item_seconds = item_seconds
+        self._encode_lock = threading.Lock()
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        with self._encode_lock:
+            time.sleep(self.call_seconds + self.item_seconds * len(texts))
+            return super().embed_documents(texts)
+
+
+def _run(embedder: object, concurrency: int, requests: int) -> dict[str, float | int]:
+    latencies: list[float] = []
+
+    def one(index: int) -> None:
+        started = time.perf_counter()
+        embedder.embed_query(f"question number {index} about automation")
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(requests)))
+    elapsed = time.perf_counter() - started
+    return {"throughput_qps": round(requests / elapsed, 1), **percentiles(latencies)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=256)
+    parser.add_argument("--concurrency", default="1,8,32")
+    parser.add_argument("--call-ms", type=float, default=4.0, help="fixed cost per encode call")
+    parser.add_argument("--item-ms", type=float, default=0.3, help="extra cost per text in a call")
+    parser.add_argument("--max-wait-ms", type=float, default=2.0)
+    parser.add_argument("--max-batch-size", type=int, default=32)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    results = []
+    for concurrency in [int(value) for value in args.concurrency.split(",") if value.strip()]:
+        direct = _LocalModel(args.call_ms / 1000, args.item_ms / 1000)
+        model = _LocalModel(args.call_ms / 1000, args.item_ms / 1000)
+        batcher = EmbeddingBatcher(model, args.max_batch_size, args.max_wait_ms / 1000)
+        results.append(
+            {
+                "concurrency": concurrency,
+                "direct": {**_run(direct, concurrency, args.requests), "model_calls": direct.calls},
+                "batched": {**_run(batcher, concurrency, args.requests), "model_calls": model.calls},
+            }
+        )
+
+    config = {
+        "requests": args.requests,
+        "call_ms": args.call_ms,
+        "item_ms": args.item_ms,
+        "max_wait_ms": args.max_wait_ms,
+        "max_batch_size": args.max_batch_size,
+    }
+    emit("embedding_batcher", config, results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Benchmark: ``IngestionService.ingest_uploads_to_vector_db`` on synthetic corpora.
+
+Run with ``python -m rag.benchmarks.bench_ingestion --sizes 10,100,1000``
+(10,000 files works too but takes minutes). Each size gets a fresh data
+directory and reports a full build, a no-op rerun and a one-file change.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from rag.benchmarks.harness import emit, use_isolated_data_dir, write_synthetic_corpus
+
+
+def _run_size(files: int, embed_latency_ms: float) -> dict[str, float | int]:
+    from rag.app.core.paths import UPLOADS_DIR
+    from rag.app.services.ingestion_service import IngestionService
+    from rag.benchmarks.fakes import FakeChatModel, FakeEmbeddings
+    from rag.benchmarks.harness import install_fakes
+
+    embeddings = FakeEmbeddings(latency_seconds=embed_latency_ms / 1000)
+    install_fakes(embeddings, FakeChatModel())
+    corpus_bytes = write_synthetic_corpus(UPLOADS_DIR, files)
+    service = IngestionService()
+
+    started = time.perf_counter()
+    full = service.ingest_uploads_to_vector_db()
+    full_ms = (time.perf_counter() - started) * 1000
+    embed_calls = embeddings.calls
+
+    started = time.perf_counter()
+    service.ingest_uploads_to_vector_db()
+    noop_ms = (time.perf_counter() - started) * 1000
+
+    changed = sorted(UPLOADS_DIR.glob("Notes_*.txt"))[0]
+    changed.write_text(changed.read_text(encoding="utf-8") + "\n\nA new paragraph about load testing.", encoding="utf-8")
+    started = time.perf_counter()
+    incremental = service.ingest_uploads_to_vector_db()
+    incremental_ms = (time.perf_counter() - started) * 1000
+
+    return {
+        "files": files,
+        "corpus_bytes": corpus_bytes,
+        "chunks": full["chunks"],
+        "full_ms": round(full_ms, 2),
+        "full_chunks_per_second": round(full["chunks"] / (full_ms / 1000), 1) if full_ms else 0.0,
+        "embed_calls": embed_calls,
+        "noop_ms": round(noop_ms, 2),
+        "one_file_changed_ms": round(incremental_ms, 2),
+        "one_file_added_chunks": incremental.get("added_chunks", 0),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="10,100,1000")
+    parser.add_argument("--embed-latency-ms", type=float, default=0.0, help="simulated latency per embedding batch")
+    parser.add_argument("--process-workers", type=int, default=0, help="INGEST_PROCESS_WORKERS (0 = serial)")
+    parser.add_argument("--output", type=Path)
+    parser.add_argument("--single", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single is not None:
+        # Child mode: the parent already pointed RAG_DATA_DIR at a fresh directory.
+        print(json.dumps(_run_size(args.single, args.embed_latency_ms)))
+        return
+
+    results = []
+    for size in [int(value) for value in args.sizes.split(",") if value.strip()]:
+        with tempfile.TemporaryDirectory() as tmp:
+            # One interpreter per size: paths and the store registry are process-wide.
+            use_isolated_data_dir(Path(tmp))
+            command = [
+                sys.executable,
+                "-m",
+                "rag.benchmarks.bench_ingestion",
+                "--single",
+                str(size),
+                "--embed-latency-ms",
+                str(args.embed_latency_ms),
+            ]
+            env = os.environ.copy()
+            env["INGEST_PROCESS_WORKERS"] = str(args.process_workers)
+            # Measure the pool itself; the small-corpus fallback would hide it on synthetic data.
+            env["INGEST_PROCESS_MIN_BYTES"] = "0"
+            output = subprocess.run(command, check=True, capture_output=True, text=True, env=env)
+            results.append(json.loads(output.stdout.strip().splitlines()[-1]))
+
+    config = {"sizes": args.sizes, "embed_latency_ms": args.embed_latency_ms, "process_workers": args.process_workers}
+    emit("ingestion", config, results, args.output)
+
+
+if __name__ == "__main__":
+    main()
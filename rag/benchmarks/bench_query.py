@@ -0,0 +1,103 @@
+"""Benchmark: ``QueryService.query`` latency per query type, cold vs warm.
+
+Run with ``python -m rag.benchmarks.bench_query``. Uses a synthetic corpus in a
+temporary data directory and fake embedding/chat models, so no API key is needed.
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from rag.benchmarks.fakes import FakeChatModel, FakeEmbeddings
+from rag.benchmarks.harness import emit, install_fakes, percentiles, use_isolated_data_dir, write_synthetic_corpus
+
+QUERIES = {
+    "plain_en": "What is your experience with monitoring and dashboards?",
+    "plain_pt": "Qual a sua experiência com monitoramento e painéis?",
+    "list_en": "List 3 things you automated",
+    "list_pt": "Liste 3 coisas que você automatizou",
+    "project_en": "Tell me about the homelab project you built",
+    "project_pt": "Fale sobre o projeto de homelab que você construiu",
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0)
+    parser.add_argument("--top-k", type=int, default=4)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = Path(tmp)
+        use_isolated_data_dir(data_dir)
+        embeddings = FakeEmbeddings()
+        llm = FakeChatModel(latency_seconds=args.llm_latency_ms / 1000)
+        install_fakes(embeddings, llm)
+
+        from rag.app.core.paths import UPLOADS_DIR
+        from rag.app.services.answer_cache import get_answer_cache
+        from rag.app.services.ingestion_service import IngestionService
+        from rag.app.services.query_service import QueryService
+        from rag.app.services.vector_store import get_embedding_cache
+
+        write_synthetic_corpus(UPLOADS_DIR, args.files)
+        IngestionService().ingest_uploads_to_vector_db()
+        service = QueryService()
+
+        started = time.perf_counter()
+        service.query(QUERIES["plain_en"], top_k=args.top_k)
+        first_query_ms = (time.perf_counter() - started) * 1000
+
+        results = []
+        for name, message in QUERIES.items():
+            get_embedding_cache().clear()
+            get_answer_cache().clear()
+            llm_calls = llm.calls
+            prompt_chars = llm.prompt_chars
+            started = time.perf_counter()
+            service.query(message, top_k=args.top_k)
+            cold_ms = (time.perf_counter() - started) * 1000
+            cold_llm_calls = llm.calls - llm_calls
+            cold_prompt_chars = llm.prompt_chars - prompt_chars
+
+            # Warm: embedding cached, answer cache cleared so retrieval and generation run every time.
+            warm: list[float] = []
+            for _ in range(args.repeat):
+                get_answer_cache().clear()
+                started = time.perf_counter()
+                service.query(message, top_k=args.top_k)
+                warm.append((time.perf_counter() - started) * 1000)
+
+            cached: list[float] = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                service.query(message, top_k=args.top_k)
+                cached.append((time.perf_counter() - started) * 1000)
+
+            results.append(
+                {
+                    "query": name,
+                    "cold_ms": round(cold_ms, 3),
+                    "llm_calls": cold_llm_calls,
+                    "prompt_chars": cold_prompt_chars,
+                    "warm": percentiles(warm),
+                    "answer_cached": percentiles(cached),
+                }
+            )
+
+    config = {
+        "files": args.files,
+        "repeat": args.repeat,
+        "llm_latency_ms": args.llm_latency_ms,
+        "top_k": args.top_k,
+        "first_query_ms": round(first_query_ms, 3),
+    }
+    emit("query", config, results, args.output)
+
+
+if __name__ == "__main__":
+    main()
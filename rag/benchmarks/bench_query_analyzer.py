@@ -0,0 +1,223 @@
+"""Microbenchmark: ``QueryAnalyzer`` vs. the previous per-feature classifiers.
+
+Run with ``python -m rag.benchmarks.bench_query_analyzer``. Reports per-query
+cost for the legacy static methods, a cold analyzer (memoization bypassed) and
+a warm analyzer, plus how often the two implementations agree.
+"""
+
+import argparse
+import json
+import re
+import time
+from typing import Literal
+
+from rag.app.services.query_analyzer import QueryAnalyzer
+
+QUERIES = (
+    "What is your experience with FastAPI?",
+    "Qual a sua experiência com automação?",
+    "List 3 projects you built",
+    "Liste três projetos que você construiu",
+    "Tell me about your homelab",
+    "Quais são suas principais habilidades?",
+    "Me diga 5 tecnologias que você usa no trabalho",
+    "Can you describe the app you built for hiring?",
+    "Fale sobre um projeto com Docker e Proxmox",
+    "Top 10 skills on your resume",
+    "Where did you work before?",
+    "Cite duas empresas onde trabalhou",
+    "Which GitHub repositories show your backend work?",
+    "Enumere seis ferramentas de monitoramento",
+    "How do you approach code review?",
+    "Mostre o sistema que voce construiu",
+)
+
+# Copies of the removed QueryService static methods, kept as the baseline.
+
+
+def legacy_detect_query_language(query: str) -> Literal["pt", "en"]:
+    q = query.lower()
+    tokens = re.findall(r"[a-zA-ZÀ-ÿ']+", q)
+
+    pt_markers = {
+        "qual",
+        "quais",
+        "como",
+        "quem",
+        "onde",
+        "quando",
+        "porque",
+        "por",
+        "que",
+        "voce",
+        "você",
+        "sobre",
+        "projeto",
+        "projetos",
+        "experiencia",
+        "experiência",
+        "habilidades",
+        "curriculo",
+        "currículo",
+        "trabalho",
+        "construiu",
+        "seu",
+        "sua",
+    }
+    en_markers = {
+        "what",
+        "which",
+        "how",
+        "who",
+        "where",
+        "when",
+        "why",
+        "about",
+        "project",
+        "projects",
+        "experience",
+        "skills",
+        "resume",
+        "work",
+        "built",
+        "your",
+        "you",
+        "can",
+        "tell",
+        "list",
+    }
+
+    pt_score = sum(1 for token in tokens if token in pt_markers)
+    en_score = sum(1 for token in tokens if token in en_markers)
+
+    if re.search(r"[ãõçáéíóúâêôà]", q):
+        pt_score += 2
+
+    if en_score > pt_score:
+        return "en"
+    if pt_score > en_score:
+        return "pt"
+    return "en"
+
+
+def legacy_extract_requested_count(query: str) -> int | None:
+    q = query.lower()
+    number_words = {
+        "um": 1,
+        "uma": 1,
+        "one": 1,
+        "dois": 2,
+        "duas": 2,
+        "two": 2,
+        "tres": 3,
+        "três": 3,
+        "three": 3,
+        "quatro": 4,
+        "four": 4,
+        "cinco": 5,
+        "five": 5,
+        "seis": 6,
+        "six": 6,
+        "sete": 7,
+        "seven": 7,
+        "oito": 8,
+        "eight": 8,
+        "nove": 9,
+        "nine": 9,
+        "dez": 10,
+        "ten": 10,
+    }
+    for word, value in number_words.items():
+        if re.search(rf"\b{re.escape(word)}\b", q):
+            return value
+
+    for match in re.findall(r"\b(\d{1,2})\b", q):
+        value = int(match)
+        if 1 <= value <= 20:
+            return value
+    return None
+
+
+def legacy_is_list_query(query: str) -> bool:
+    q = query.lower()
+    list_markers = (
+        "liste",
+        "list",
+        "quais sao",
+        "quais são",
+        "cite",
+        "enumere",
+        "mostre",
+        "me diga",
+        "top ",
+    )
+    return any(marker in q for marker in list_markers)
+
+
+def legacy_is_project_query(query: str) -> bool:
+    q = query.lower()
+    keywords = (
+        "projeto",
+        "projetos",
+        "project",
+        "projects",
+        "portfolio",
+        "github",
+        "repositorio",
+        "app",
+        "aplicacao",
+        "sistema",
+        "o que voce construiu",
+        "o que você construiu",
+        "built",
+        "build",
+    )
+    return any(keyword in q for keyword in keywords)
+
+
+def _legacy(query: str) -> tuple[str, bool, bool, int | None]:
+    return (
+        legacy_detect_query_language(query),
+        legacy_is_list_query(query),
+        legacy_is_project_query(query),
+        legacy_extract_requested_count(query),
+    )
+
+
+def _analyzer_tuple(analyzer: QueryAnalyzer, query: str) -> tuple[str, bool, bool, int | None]:
+    features = analyzer.analyze(query)
+    return features.language, features.is_list_query, features.is_project_query, features.requested_count
+
+
+def _per_query_us(fn, queries: tuple[str, ...], repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for query in queries:
+            fn(query)
+    return (time.perf_counter() - started) / (repeat * len(queries)) * 1_000_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    analyzer = QueryAnalyzer()
+    disagreements = [
+        {"query": query, "legacy": _legacy(query), "analyzer": _analyzer_tuple(analyzer, query)}
+        for query in QUERIES
+        if _legacy(query) != _analyzer_tuple(analyzer, query)
+    ]
+    results = {
+        "legacy_us": round(_per_query_us(_legacy, QUERIES, args.repeat), 3),
+        "analyzer_cold_us": round(_per_query_us(analyzer._analyze, QUERIES, args.repeat), 3),
+        "analyzer_warm_us": round(_per_query_us(analyzer.analyze, QUERIES, args.repeat), 3),
+        "queries": len(QUERIES),
+        "agreement": round(1 - len(disagreements) / len(QUERIES), 4),
+        "disagreements": disagreements,
+    }
+    print(json.dumps({"benchmark": "query_analyzer", "results": results}, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
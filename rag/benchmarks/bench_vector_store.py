@@ -0,0 +1,132 @@
+"""Benchmark: NumPy matrix index vs. Chroma for query latency and cold start.
+
+Run with ``python -m rag.benchmarks.bench_vector_store``. Uses random unit
+vectors in a temporary directory, so no model or API key is needed.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+
+def _corpus(chunks: int, dim: int, seed: int) -> tuple[list[str], np.ndarray]:
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((chunks, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return [f"chunk-{i}" for i in range(chunks)], vectors
+
+
+def _open_store(backend: str, directory: Path, dtype: str):
+    if backend == "numpy":
+        from rag.app.services.numpy_store import NumpyVectorStore
+
+        return NumpyVectorStore("bench", directory / "bench.index.json", embedding_function=None, dtype=dtype)
+
+    from langchain_chroma import Chroma
+
+    return Chroma(collection_name="bench", persist_directory=str(directory / "chroma"))
+
+
+def _populate(backend: str, directory: Path, dtype: str, ids: list[str], vectors: np.ndarray) -> float:
+    from rag.app.services.vector_store import upsert_embeddings
+
+    store = _open_store(backend, directory, dtype)
+    started = time.perf_counter()
+    for start in range(0, len(ids), 64):
+        batch_ids = ids[start : start + 64]
+        upsert_embeddings(
+            store,
+            ids=batch_ids,
+            embeddings=vectors[start : start + 64].tolist(),
+            documents=[f"text of {doc_id}" for doc_id in batch_ids],
+            metadatas=[{"source_name": "bench.txt"} for _ in batch_ids],
+        )
+    return (time.perf_counter() - started) * 1000
+
+
+def _cold_start_probe(backend: str, directory: Path, dtype: str, dim: int) -> None:
+    # Runs in a fresh interpreter: imports, opening the persisted index and the first query.
+    started = time.perf_counter()
+    store = _open_store(backend, directory, dtype)
+    store.similarity_search_by_vector_with_relevance_scores([1.0] + [0.0] * (dim - 1), k=4)
+    print(json.dumps({"cold_start_ms": (time.perf_counter() - started) * 1000}))
+
+
+def _cold_start(backend: str, directory: Path, dtype: str, dim: int) -> float:
+    command = [
+        sys.executable,
+        "-m",
+        "rag.benchmarks.bench_vector_store",
+        "--probe",
+        backend,
+        "--probe-dir",
+        str(directory),
+        "--dtype",
+        dtype,
+        "--dim",
+        str(dim),
+    ]
+    output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])["cold_start_ms"]
+
+
+def _latency(backend: str, directory: Path, dtype: str, queries: np.ndarray, k: int) -> dict[str, float]:
+    store = _open_store(backend, directory, dtype)
+    timings: list[float] = []
+    for query in queries.tolist():
+        started = time.perf_counter()
+        store.similarity_search_by_vector_with_relevance_scores(query, k=k)
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return {
+        "p50_ms": round(statistics.median(timings), 4),
+        "p95_ms": round(timings[int(len(timings) * 0.95) - 1], 4),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--chunks", type=int, default=500)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=8)
+    parser.add_argument("--dtype", choices=["float32", "float16"], default="float32")
+    parser.add_argument("--probe", choices=["numpy", "chroma"], help=argparse.SUPPRESS)
+    parser.add_argument("--probe-dir", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.probe:
+        _cold_start_probe(args.probe, args.probe_dir, args.dtype, args.dim)
+        return
+
+    ids, vectors = _corpus(args.chunks, args.dim, seed=7)
+    _, queries = _corpus(args.queries, args.dim, seed=11)
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        for backend in ("numpy", "chroma"):
+            results.append(
+                {
+                    "backend": backend,
+                    "ingest_ms": round(_populate(backend, directory, args.dtype, ids, vectors), 2),
+                    "cold_start_ms": round(_cold_start(backend, directory, args.dtype, args.dim), 2),
+                    **_latency(backend, directory, args.dtype, queries, args.k),
+                }
+            )
+    print(
+        json.dumps(
+            {"benchmark": "vector_store", "chunks": args.chunks, "dim": args.dim, "dtype": args.dtype, "results": results},
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""Deterministic stand-ins for the embedding model and chat model.
+
+They keep the benchmarks offline and repeatable: embeddings are a hashed
+bag of words, and the chat model answers from the prompt after a configurable
+delay that simulates network latency.
+"""
+
+import asyncio
+import hashlib
+import math
+import re
+import threading
+import time
+import unicodedata
+from collections.abc import AsyncIterator, Iterator
+from typing import Any
+
+from langchain_core.embeddings import Embeddings
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def _words(text: str) -> list[str]:
+    folded = unicodedata.normalize("NFKD", text.lower())
+    return _WORD_RE.findall("".join(char for char in folded if not unicodedata.combining(char)))
+
+
+class FakeEmbeddings(Embeddings):
+    def __init__(self, dimension: int = 256, latency_seconds: float = 0.0) -> None:
+        self.dimension = dimension
+        self.latency_seconds = latency_seconds
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _vector(self, text: str) -> list[float]:
+        vector = [0.0] * self.dimension
+        for word in _words(text):
+            digest = hashlib.blake2b(word.encode("utf-8"), digest_size=8).digest()
+            bucket = int.from_bytes(digest[:4], "little") % self.dimension
+            vector[bucket] += 1.0 if digest[4] & 1 else -1.0
+        norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+        return [value / norm for value in vector]
+
+    def _count_call(self) -> None:
+        with self._lock:
+            self.calls += 1
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        self._count_call()
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embed_documents([text])[0]
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        self._count_call()
+        if self.latency_seconds:
+            await asyncio.sleep(self.latency_seconds)
+        return [self._vector(text) for text in texts]
+
+    async def aembed_query(self, text: str) -> list[float]:
+        return (await self.aembed_documents([text]))[0]
+
+
+def _fake_answer(prompt: str) -> str:
+    match = re.search(r"deliver exactly that count: (\d+)", prompt)
+    if "numbered items" in prompt and match:
+        count = int(match.group(1))
+        return "\n".join(f"{index}. Delivered item number {index} for the role." for index in range(1, count + 1))
+    return "I built and operated several backend services, focusing on reliability and clear documentation."
+
+
+class _FakeStructured:
+    def __init__(self, model: "FakeChatModel", schema: Any) -> None:
+        self._model = model
+        self._schema = schema
+
+    def _result(self, prompt: str) -> Any:
+        items = [line.split(". ", 1)[1] for line in _fake_answer(prompt).splitlines() if ". " in line[:4]]
+        items = items or ["Backend services", "Automation tooling", "Data pipelines"]
+        return self._schema.model_validate({"items": items, "paraphrased": True})
+
+    def invoke(self, prompt: str, **_: Any) -> Any:
+        self._model._wait(prompt)
+        return self._result(prompt)
+
+    async def ainvoke(self, prompt: str, **_: Any) -> Any:
+        await self._model._await(prompt)
+        return self._result(prompt)
+
+
+class FakeChatModel:
+    """Duck-types the parts of ``ChatOpenAI`` that ``QueryService`` uses."""
+
+    def __init__(self, latency_seconds: float = 0.05, tokens_per_second: float = 0.0) -> None:
+        self.latency_seconds = latency_seconds
+        self.tokens_per_second = tokens_per_second
+        self.calls = 0
+        self.prompt_chars = 0
+        self._lock = threading.Lock()
+
+    def _count_call(self, prompt: str) -> None:
+        with self._lock:
+            self.calls += 1
+            self.prompt_chars += len(prompt)
+
+    def _wait(self, prompt: str) -> None:
+        self._count_call(prompt)
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+
+    async def _await(self, prompt: str) -> None:
+        self._count_call(prompt)
+        if self.latency_seconds:
+            await asyncio.sleep(self.latency_seconds)
+
+    def invoke(self, prompt: str, **_: Any) -> AIMessage:
+        self._wait(prompt)
+        return AIMessage(content=_fake_answer(prompt))
+
+    async def ainvoke(self, prompt: str, **_: Any) -> AIMessage:
+        await self._await(prompt)
+        return AIMessage(content=_fake_answer(prompt))
+
+    def stream(self, prompt: str, **_: Any) -> Iterator[AIMessageChunk]:
+        self._wait(prompt)
+        delay = 1 / self.tokens_per_second if self.tokens_per_second else 0.0
+        for token in _fake_answer(prompt).split(" "):
+            if delay:
+                time.sleep(delay)
+            yield AIMessageChunk(content=f"{token} ")
+
+    async def astream(self, prompt: str, **_: Any) -> AsyncIterator[AIMessageChunk]:
+        await self._await(prompt)
+        delay = 1 / self.tokens_per_second if self.tokens_per_second else 0.0
+        for token in _fake_answer(prompt).split(" "):
+            if delay:
+                await asyncio.sleep(delay)
+            yield AIMessageChunk(content=f"{token} ")
+
+    def with_structured_output(self, schema: Any, **_: Any) -> _FakeStructured:
+        return _FakeStructured(self, schema)
@@ -0,0 +1,117 @@
+"""Shared setup for the offline benchmarks.
+
+``use_isolated_data_dir`` must run before anything under ``rag.app`` is
+imported, because paths and settings are resolved at import time.
+"""
+
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+from pathlib import Path
+from typing import Any
+
+from rag.benchmarks.fakes import FakeChatModel, FakeEmbeddings
+
+_TOPICS_EN = (
+    "backend APIs with FastAPI and PostgreSQL",
+    "automation scripts that sync CRM records",
+    "monitoring dashboards with Grafana and Prometheus",
+    "data pipelines that clean and load CSV exports",
+    "a homelab running Proxmox, Docker and nightly ZFS backups",
+    "mentoring interns and reviewing pull requests",
+    "integrations with payment providers and webhooks",
+    "search features built on embeddings and vector databases",
+)
+_TOPICS_PT = (
+    "APIs backend com FastAPI e PostgreSQL",
+    "scripts de automação que sincronizam registros do CRM",
+    "painéis de monitoramento com Grafana e Prometheus",
+    "pipelines de dados que limpam e carregam exportações CSV",
+    "um homelab com Proxmox, Docker e backups ZFS noturnos",
+    "mentoria de estagiários e revisão de pull requests",
+    "integrações com provedores de pagamento e webhooks",
+    "funcionalidades de busca com embeddings e bancos vetoriais",
+)
+
+
+def use_isolated_data_dir(data_dir: Path) -> None:
+    data_dir.mkdir(parents=True, exist_ok=True)
+    os.environ["RAG_DATA_DIR"] = str(data_dir)
+    os.environ.setdefault("OPENAI_API_KEY", "offline-benchmark")
+    os.environ.setdefault("UPLOAD_WATCH_ENABLED", "false")
+    os.environ.setdefault("ANONYMIZED_TELEMETRY", "False")
+
+
+def install_fakes(embeddings: FakeEmbeddings, llm: FakeChatModel | None) -> None:
+    """Swaps in fake models; with ``llm=None`` the real chat client runs (e.g. against a stub server)."""
+    from rag.app.services import vector_store
+    from rag.app.services.query_service import QueryService
+
+    vector_store.build_embeddings = lambda: embeddings
+    if llm is not None:
+        QueryService._build_llm = lambda self: llm
+
+
+def _paragraph(rng: random.Random, topics: tuple[str, ...], language: str) -> str:
+    topic = rng.choice(topics)
+    years = rng.randint(1, 6)
+    if language == "pt":
+        return (
+            f"Trabalhei com {topic} durante {years} anos. "
+            f"O foco era entregar {rng.choice(topics)} com qualidade e documentação clara. "
+            f"Também colaborei com times de produto em {rng.choice(topics)}."
+        )
+    return (
+        f"I worked on {topic} for {years} years. "
+        f"The focus was delivering {rng.choice(topics)} with quality and clear documentation. "
+        f"I also partnered with product teams on {rng.choice(topics)}."
+    )
+
+
+def write_synthetic_corpus(uploads_dir: Path, files: int, paragraphs: int = 6, seed: int = 13) -> int:
+    """Writes ``files`` deterministic uploads (half PT, half EN, some project files); returns bytes written."""
+    uploads_dir.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(seed)
+    written = 0
+    for index in range(files):
+        language = "pt" if index % 2 else "en"
+        topics = _TOPICS_PT if language == "pt" else _TOPICS_EN
+        kind = "Project" if index % 3 == 0 else "Notes"
+        text = "\n\n".join(_paragraph(rng, topics, language) for _ in range(paragraphs))
+        path = uploads_dir / f"{kind}_{index:05d}_{language.upper()}.txt"
+        path.write_text(text, encoding="utf-8")
+        written += len(text.encode("utf-8"))
+
+    resume = "\n\n".join(_paragraph(rng, _TOPICS_PT, "pt") for _ in range(paragraphs))
+    (uploads_dir / "Curriculo.txt").write_text(resume, encoding="utf-8")
+    return written + len(resume.encode("utf-8"))
+
+
+def percentiles(samples_ms: list[float]) -> dict[str, float]:
+    if not samples_ms:
+        return {"count": 0}
+    ordered = sorted(samples_ms)
+    return {
+        "count": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered), 3),
+        "p50_ms": round(ordered[len(ordered) // 2], 3),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+        "max_ms": round(ordered[-1], 3),
+    }
+
+
+def emit(benchmark: str, config: dict[str, Any], results: Any, output: Path | None = None) -> None:
+    payload = {
+        "benchmark": benchmark,
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "config": config,
+        "results": results,
+    }
+    text = json.dumps(payload, indent=2, ensure_ascii=False)
+    if output is not None:
+        output.write_text(text + "\n", encoding="utf-8")
+    print(text)
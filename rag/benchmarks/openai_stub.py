@@ -0,0 +1,81 @@
+"""Minimal OpenAI-compatible chat completions server for load tests.
+
+Run with ``uvicorn rag.benchmarks.openai_stub:app --port 9000`` and point the
+API at it with ``OPENAI_BASE_URL=http://127.0.0.1:9000/v1``. Each completion
+sleeps ``STUB_LATENCY_MS`` (default 50) before answering; streamed answers
+spread that delay over their chunks. ``GET /stats`` reports requests served
+and the distinct client connections they arrived on, which shows whether
+keep-alive pooling works.
+"""
+
+import asyncio
+import json
+import os
+import time
+import uuid
+from collections.abc import AsyncIterator
+from typing import Any
+
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+from rag.benchmarks.fakes import _fake_answer
+
+LATENCY_SECONDS = float(os.getenv("STUB_LATENCY_MS", "50")) / 1000
+
+app = FastAPI(title="OpenAI stub")
+_stats: dict[str, Any] = {"requests": 0, "connections": set()}
+
+
+def _prompt(body: dict[str, Any]) -> str:
+    return "\n".join(str(message.get("content", "")) for message in body.get("messages", []))
+
+
+def _content(body: dict[str, Any]) -> str:
+    answer = _fake_answer(_prompt(body))
+    if body.get("response_format", {}).get("type") == "json_schema":
+        items = [line.split(". ", 1)[1] for line in answer.splitlines() if ". " in line[:4]] or [answer]
+        return json.dumps({"intro": "", "items": items, "paraphrased": True})
+    return answer
+
+
+def _completion(body: dict[str, Any], content: str) -> dict[str, Any]:
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "stub"),
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": len(_prompt(body)) // 4, "completion_tokens": len(content) // 4, "total_tokens": 0},
+    }
+
+
+async def _stream(body: dict[str, Any], content: str) -> AsyncIterator[str]:
+    words = content.split(" ")
+    base = {"id": f"chatcmpl-{uuid.uuid4().hex}", "object": "chat.completion.chunk", "model": body.get("model")}
+    for index, word in enumerate(words):
+        await asyncio.sleep(LATENCY_SECONDS / len(words))
+        delta = {"role": "assistant", "content": word} if index == 0 else {"content": f" {word}"}
+        chunk = {**base, "created": int(time.time()), "choices": [{"index": 0, "delta": delta, "finish_reason": None}]}
+        yield f"data: {json.dumps(chunk)}\n\n"
+    done = {**base, "created": int(time.time()), "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
+    yield f"data: {json.dumps(done)}\n\n"
+    yield "data: [DONE]\n\n"
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request) -> Any:
+    body = await request.json()
+    _stats["requests"] += 1
+    if request.client is not None:
+        _stats["connections"].add((request.client.host, request.client.port))
+    content = _content(body)
+    if body.get("stream"):
+        return StreamingResponse(_stream(body, content), media_type="text/event-stream")
+    await asyncio.sleep(LATENCY_SECONDS)
+    return _completion(body, content)
+
+
+@app.get("/stats")
+async def stats() -> dict[str, int]:
+    return {"requests": _stats["requests"], "connections": len(_stats["connections"])}
@@ -0,0 +1,58 @@
+"""Shared fixtures: an isolated data directory, fake models and a small indexed corpus.
+
+The environment is set at import time because paths and settings are resolved
+when ``rag.app`` is first imported.
+"""
+
+import os
+import tempfile
+from collections.abc import Callable, Iterator
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from rag.benchmarks.fakes import FakeChatModel, FakeEmbeddings
+from rag.benchmarks.harness import install_fakes, use_isolated_data_dir, write_synthetic_corpus
+
+_DATA_DIR = tempfile.TemporaryDirectory(prefix="rag-tests-")
+use_isolated_data_dir(Path(_DATA_DIR.name))
+os.environ["VECTOR_BACKEND"] = "numpy"
+os.environ["ANSWER_CACHE_ENABLED"] = "false"
+os.environ["ADMIN_TOKEN"] = ADMIN_TOKEN = "test-admin-token"
+install_fakes(FakeEmbeddings(), FakeChatModel(latency_seconds=0.0))
+
+
+@pytest.fixture(scope="session")
+def indexed_corpus() -> None:
+    from rag.app.core.paths import UPLOADS_DIR
+    from rag.app.services.ingestion_service import IngestionService
+
+    write_synthetic_corpus(UPLOADS_DIR, files=8)
+    IngestionService().ingest_uploads_to_vector_db()
+
+
+@pytest.fixture
+def use_llm(monkeypatch: pytest.MonkeyPatch, indexed_corpus: None) -> Callable[[FakeChatModel], FakeChatModel]:
+    """Makes every ``QueryService`` answer with the given model for the current test."""
+    from rag.app.services.query_service import QueryService
+
+    def install(model: FakeChatModel) -> FakeChatModel:
+        monkeypatch.setattr(QueryService, "_build_llm", lambda self: model)
+        return model
+
+    return install
+
+
+@pytest.fixture
+def client(indexed_corpus: None) -> Iterator[TestClient]:
+    from rag.app.main import app
+
+    # No lifespan: warmup and the upload watcher stay off, the corpus is indexed by the fixture.
+    yield TestClient(app)
+
+
+@pytest.fixture
+def admin_headers() -> dict[str, str]:
+    return {"Authorization": f"Bearer {ADMIN_TOKEN}"}
+
@@ -0,0 +1,59 @@
+import time
+
+import pytest
+
+from rag.app.core.settings import get_settings
+
+UPLOAD_TEXT = (
+    "I maintained a small fleet of Raspberry Pi sensors that reported greenhouse humidity "
+    "to a FastAPI service, with alerts sent to a chat channel when readings drifted."
+)
+
+
+def _upload(client, headers, name="greenhouse.txt", **params):
+    files = {"files": (name, UPLOAD_TEXT.encode(), "text/plain")}
+    return client.post("/rag/uploads", files=files, params=params, headers=headers)
+
+
+def _wait_for_job(client, headers, job_id: str) -> dict:
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        job = client.get(f"/rag/jobs/{job_id}", headers=headers).json()
+        if job["status"] in ("succeeded", "failed"):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"ingestion job {job_id} did not finish")
+
+
+@pytest.mark.parametrize(
+    ("method", "path"),
+    [
+        ("get", "/rag/jobs/0123abcd"),
+        ("get", "/rag/generation/stats"),
+        ("get", "/rag/cache/stats"),
+        ("post", "/rag/chat/batch"),
+        ("post", "/rag/uploads"),
+    ],
+)
+def test_operator_routes_need_the_admin_token(client, method, path):
+    assert getattr(client, method)(path).status_code == 401
+    assert getattr(client, method)(path, headers={"Authorization": "Bearer wrong"}).status_code == 401
+
+
+def test_operator_routes_are_disabled_without_a_configured_token(client, admin_headers, monkeypatch):
+    monkeypatch.setattr(get_settings(), "admin_token", None)
+
+    assert client.get("/rag/cache/stats", headers=admin_headers).status_code == 403
+
+
+def test_upload_refuses_to_replace_an_existing_file_unless_asked(client, admin_headers):
+    created = _upload(client, admin_headers)
+    assert created.status_code == 202
+    assert _wait_for_job(client, admin_headers, created.json()["job"]["id"])["status"] == "succeeded"
+
+    conflict = _upload(client, admin_headers)
+    assert conflict.status_code == 409
+
+    replaced = _upload(client, admin_headers, overwrite="true")
+    assert replaced.status_code == 202
+    assert _wait_for_job(client, admin_headers, replaced.json()["job"]["id"])["status"] == "succeeded"
@@ -0,0 +1,24 @@
+from rag.benchmarks.fakes import FakeChatModel
+
+
+def test_batch_generates_repeated_questions_once(client, use_llm, admin_headers):
+    llm = use_llm(FakeChatModel(latency_seconds=0.0))
+    messages = [
+        "What is your experience with monitoring and dashboards?",
+        "what is your experience with  MONITORING and dashboards?",
+        "Tell me about the homelab project you built",
+    ]
+
+    response = client.post("/rag/chat/batch", json={"messages": messages}, headers=admin_headers)
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [item["error"] for item in results] == [None, None, None]
+    assert results[0]["answer"] == results[1]["answer"]
+    assert llm.calls == 2
+
+
+def test_batch_rejects_more_than_ten_questions(client, admin_headers):
+    response = client.post("/rag/chat/batch", json={"messages": ["Hi?"] * 11}, headers=admin_headers)
+
+    assert response.status_code == 422
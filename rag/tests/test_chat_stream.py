@@ -0,0 +1,68 @@
+import json
+from collections.abc import Iterator
+from typing import Any
+
+from langchain_core.messages import AIMessageChunk
+
+from rag.benchmarks.fakes import FakeChatModel
+
+QUESTION = "What is your experience with monitoring and dashboards?"
+
+
+class FailingStreamModel(FakeChatModel):
+    """Streams a couple of tokens, then loses the upstream connection."""
+
+    def stream(self, prompt: str, **_: Any) -> Iterator[AIMessageChunk]:
+        self._wait(prompt)
+        yield AIMessageChunk(content="I built ")
+        yield AIMessageChunk(content="several ")
+        raise ConnectionError("upstream closed the stream")
+
+
+def _events(body: str) -> list[tuple[str, dict[str, Any]]]:
+    events = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+def test_stream_sends_sources_then_tokens_then_done(client, use_llm):
+    use_llm(FakeChatModel(latency_seconds=0.0))
+
+    response = client.post("/rag/chat/stream", json={"message": QUESTION})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = _events(response.text)
+    names = [name for name, _ in events]
+    assert names[0] == "sources"
+    assert names[-1] == "done"
+    assert set(names[1:-1]) == {"token"}
+    streamed = "".join(payload["text"] for name, payload in events if name == "token")
+    assert events[-1][1]["answer"] == streamed
+
+
+def test_stream_done_matches_blocking_chat(client, use_llm):
+    use_llm(FakeChatModel(latency_seconds=0.0))
+
+    streamed = _events(client.post("/rag/chat/stream", json={"message": QUESTION}).text)[-1][1]
+    blocking = client.post("/rag/chat", json={"message": QUESTION}).json()
+
+    assert streamed["answer"].strip() == blocking["answer"].strip()
+    assert streamed["sources"] == blocking["sources"]
+
+
+def test_stream_failure_resets_and_finishes_with_fallback(client, use_llm):
+    llm = use_llm(FailingStreamModel(latency_seconds=0.0))
+
+    response = client.post("/rag/chat/stream", json={"message": QUESTION})
+
+    assert response.status_code == 200
+    events = _events(response.text)
+    names = [name for name, _ in events]
+    assert names == ["sources", "token", "token", "reset", "token", "done"]
+    fallback = events[-1][1]["answer"]
+    assert fallback and "several" not in fallback
+    assert events[-2][1]["text"] == fallback
+    assert llm.calls == 1
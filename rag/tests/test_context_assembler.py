@@ -0,0 +1,63 @@
+from rag.app.services.context_assembler import MIN_TRUNCATED_TOKENS, ContextPiece, merge_pieces, pack_pieces
+from rag.app.services.tokens import count_tokens
+
+RESUME = "Curriculo.txt"
+
+
+def _text(topic: str, sentences: int) -> str:
+    return " ".join(f"Sentence {index} about {topic} work and what it delivered." for index in range(sentences))
+
+
+def test_packing_stays_under_budget_and_keeps_the_pinned_resume():
+    pieces = [
+        ContextPiece("Homelab.txt", _text("homelab", 30)),
+        ContextPiece("Hirematch.txt", _text("hirematch", 30)),
+        ContextPiece("Notes.txt", _text("notes", 30)),
+        ContextPiece(RESUME, _text("resume", 10), pinned=True),
+    ]
+    budget = pieces[0].token_count() + pieces[3].token_count() + MIN_TRUNCATED_TOKENS + 10
+
+    packed = pack_pieces(pieces, budget)
+
+    assert sum(count_tokens(piece.text) for piece in packed) <= budget
+    # The resume claims its share first but keeps its slot after the retrieved chunks.
+    assert [piece.source_name for piece in packed] == ["Homelab.txt", "Hirematch.txt", RESUME]
+    assert packed[0].text == pieces[0].text
+    assert packed[-1].text == pieces[3].text
+    assert pieces[1].text.startswith(packed[1].text) and packed[1].text != pieces[1].text
+
+
+def test_pinned_resume_survives_a_budget_smaller_than_the_retrieved_context():
+    pieces = [ContextPiece("Homelab.txt", _text("homelab", 40)), ContextPiece(RESUME, _text("resume", 5), pinned=True)]
+
+    packed = pack_pieces(pieces, pieces[1].token_count() + MIN_TRUNCATED_TOKENS - 1)
+
+    assert [piece.source_name for piece in packed] == [RESUME]
+
+
+def test_overlapping_chunks_merge_into_the_best_ranked_slot():
+    text = _text("pipelines", 20)
+    pieces = [
+        ContextPiece("Pipelines.txt", text[520:]),
+        ContextPiece("Homelab.txt", _text("homelab", 3)),
+        ContextPiece("Pipelines.txt", text[:700]),
+    ]
+
+    merged = merge_pieces(pieces)
+
+    assert [piece.source_name for piece in merged] == ["Pipelines.txt", "Homelab.txt"]
+    assert merged[0].text == text
+
+
+def test_chunks_repeated_in_the_pinned_resume_are_dropped():
+    resume = _text("resume", 20)
+    pieces = [
+        ContextPiece(RESUME, resume[300:900]),
+        ContextPiece("Homelab.txt", _text("homelab", 3)),
+        ContextPiece(RESUME, resume, pinned=True),
+    ]
+
+    merged = merge_pieces(pieces)
+
+    assert [(piece.source_name, piece.pinned) for piece in merged] == [("Homelab.txt", False), (RESUME, True)]
+    assert merged[1].text == resume
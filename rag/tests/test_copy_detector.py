@@ -0,0 +1,63 @@
+import pytest
+
+from rag.app.services.copy_detector import ShingleIndex, encode_shingles, text_shingles
+from rag.app.services.query_service import PreparedQuery, QueryService
+
+CONTEXT = (
+    "Built a homelab on Proxmox with nightly ZFS snapshots replicated to an offsite box, "
+    "and wrote Ansible playbooks that rebuild every virtual machine from scratch."
+)
+
+
+def _prepared(index: ShingleIndex) -> PreparedQuery:
+    return PreparedQuery(
+        query="Tell me about the homelab",
+        top_k=4,
+        response_language="en",
+        is_project_query=False,
+        is_list_query=False,
+        requested_count=None,
+        cache_scope=(),
+        copy_index=index,
+    )
+
+
+@pytest.fixture
+def index() -> ShingleIndex:
+    # The service sizes shingles at PARAPHRASE_MAX_VERBATIM_WORDS + 1 (default 6 + 1).
+    index = ShingleIndex(size=7)
+    index.add_text(CONTEXT)
+    return index
+
+
+def test_six_copied_words_are_allowed(index):
+    answer = "My setup ran with nightly ZFS snapshots replicated to storage kept in another house."
+
+    assert index.analyze(answer).longest_run == 0
+    assert not QueryService()._needs_paraphrase(answer, _prepared(index))
+
+
+def test_seven_copied_words_trigger_a_paraphrase(index):
+    answer = "I ran it on nightly ZFS snapshots replicated to an offsite machine."
+
+    report = index.analyze(answer)
+    assert report.longest_run == 7
+    assert report.overlap == pytest.approx(1 / 6)
+    assert QueryService()._needs_paraphrase(answer, _prepared(index))
+
+
+def test_longest_run_ignores_case_and_punctuation(index):
+    answer = "BUILT A HOMELAB, on Proxmox; with nightly ZFS snapshots replicated to an offsite box!"
+
+    report = index.analyze(answer)
+    assert report.longest_run == 14
+    assert report.overlap == 1.0
+
+
+def test_shingles_stored_at_ingestion_match_the_context_text(index):
+    stored = ShingleIndex(size=7)
+    metadata = {"shingles": encode_shingles(text_shingles(CONTEXT, 7)), "shingle_size": 7}
+    stored.add_document("ignored when shingles are stored", metadata)
+    answer = "I ran it on nightly ZFS snapshots replicated to an offsite machine."
+
+    assert stored.analyze(answer) == index.analyze(answer)
@@ -0,0 +1,49 @@
+import pytest
+from langchain_core.documents import Document
+
+from rag.app.services.embedding_pipeline import EmbeddingPipeline, IngestionCheckpoint
+from rag.app.services.numpy_store import NumpyVectorStore
+from rag.benchmarks.fakes import FakeEmbeddings
+
+
+class FailingAfterEmbeddings(FakeEmbeddings):
+    def __init__(self, batches: int) -> None:
+        super().__init__(dimension=8)
+        self.remaining = batches
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        if self.remaining == 0:
+            raise RuntimeError("embedding backend went away")
+        self.remaining -= 1
+        return super().embed_documents(texts)
+
+
+def _chunks(count: int) -> list[Document]:
+    return [
+        Document(page_content=f"chunk number {index}", metadata={"chunk_id": f"c{index}"}) for index in range(count)
+    ]
+
+
+def test_checkpoint_appends_one_line_per_batch_and_resumes(tmp_path):
+    embeddings = FailingAfterEmbeddings(batches=3)
+    store = NumpyVectorStore("profile_v1", tmp_path / "profile_v1.index.json", embeddings)
+    checkpoint = IngestionCheckpoint(tmp_path / "profile_v1.checkpoint.jsonl")
+    checkpoint.full_rebuild = True
+    checkpoint.collection = "profile_v2"
+    pipeline = EmbeddingPipeline(embeddings, store, batch_size=2, max_workers=1, checkpoint=checkpoint)
+
+    with pytest.raises(RuntimeError):
+        pipeline.run(_chunks(10))
+
+    # Header plus one line per written batch; earlier lines are never rewritten.
+    assert len(checkpoint.path.read_text(encoding="utf-8").splitlines()) == 4
+
+    resumed = IngestionCheckpoint(checkpoint.path)
+    assert resumed.load()
+    assert resumed.collection == "profile_v2"
+    assert resumed.done_ids == {f"c{index}" for index in range(6)}
+
+    embeddings.remaining = 10
+    written = EmbeddingPipeline(embeddings, store, batch_size=2, max_workers=1, checkpoint=resumed).run(_chunks(10))
+    assert written == 4
+    assert store.count() == 10
@@ -0,0 +1,47 @@
+from typing import Any
+
+from rag.app.services import vector_store
+from rag.app.services.embedding_batcher import embeds_queries_as_documents
+from rag.benchmarks.fakes import FakeEmbeddings
+
+
+class InstructedEmbeddings(FakeEmbeddings):
+    """Prefixes queries with an instruction, like e5 or bge models do."""
+
+    query_encode_kwargs = {"prompt": "query: "}
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embed_documents([f"query: {text}"])[0]
+
+    async def aembed_query(self, text: str) -> list[float]:
+        return (await self.aembed_documents([f"query: {text}"]))[0]
+
+
+class _SentenceTransformer:
+    def __init__(self, prompts: dict[str, str]) -> None:
+        self.prompts = prompts
+
+
+class PromptedEmbeddings(FakeEmbeddings):
+    def __init__(self, prompts: dict[str, str], **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self._client = _SentenceTransformer(prompts)
+
+
+def test_detects_models_with_query_instructions():
+    assert embeds_queries_as_documents(FakeEmbeddings())
+    assert embeds_queries_as_documents(PromptedEmbeddings({"query": "", "document": ""}))
+    assert not embeds_queries_as_documents(PromptedEmbeddings({"query": "query: "}))
+    assert not embeds_queries_as_documents(InstructedEmbeddings())
+
+
+def test_batched_query_embeddings_match_embed_query(monkeypatch):
+    embeddings = InstructedEmbeddings()
+    monkeypatch.setattr(vector_store, "get_embeddings", lambda: embeddings)
+    vector_store.get_embedding_cache().clear()
+
+    questions = ["Which databases do you use?", "What did you automate?"]
+
+    vectors = vector_store.embed_queries(questions)
+
+    assert vectors == [embeddings.embed_query(question) for question in questions]
@@ -0,0 +1,121 @@
+import re
+from typing import Any
+
+import pytest
+from langchain_core.messages import AIMessage
+
+from rag.app.services.query_service import QueryService
+from rag.benchmarks.fakes import FakeChatModel
+
+LIST_QUESTION = "List 3 things you automated"
+PLAIN_QUESTION = "What is your experience with monitoring and dashboards?"
+
+
+class MalformedStructuredModel(FakeChatModel):
+    """Structured output that misses required fields, as a model ignoring the schema would return."""
+
+    def with_structured_output(self, schema: Any, **_: Any) -> Any:
+        model = self
+
+        class _Structured:
+            def invoke(self, prompt: str, **_: Any) -> dict[str, Any]:
+                model._wait(prompt)
+                return {"items": ["Automated CRM syncs"]}
+
+            async def ainvoke(self, prompt: str, **_: Any) -> dict[str, Any]:
+                await model._await(prompt)
+                return {"items": ["Automated CRM syncs"]}
+
+        return _Structured()
+
+
+class ShortListModel(FakeChatModel):
+    """Paraphrased structured output with fewer items than the question asked for."""
+
+    def __init__(self, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.prompts: list[str] = []
+
+    def invoke(self, prompt: str, **kwargs: Any) -> AIMessage:
+        self.prompts.append(prompt)
+        return super().invoke(prompt, **kwargs)
+
+    def with_structured_output(self, schema: Any, **_: Any) -> Any:
+        model = self
+
+        class _Structured:
+            def invoke(self, prompt: str, **_: Any) -> Any:
+                model._wait(prompt)
+                return schema.model_validate({"items": ["Automated CRM syncs", "Nightly backups"], "paraphrased": True})
+
+        return _Structured()
+
+
+class CopyingModel(FakeChatModel):
+    """Answers the first prompt by pasting the first retrieved passage, then behaves normally."""
+
+    def invoke(self, prompt: str, **kwargs: Any) -> AIMessage:
+        if self.calls:
+            return super().invoke(prompt, **kwargs)
+        self._wait(prompt)
+        passage = re.search(r"\[1\] \(.+?\)\n(.+?)(?:\n\n|$)", prompt, re.DOTALL)
+        assert passage is not None
+        return AIMessage(content=passage.group(1))
+
+
+@pytest.fixture
+def service() -> QueryService:
+    return QueryService()
+
+
+def test_single_pass_list_answer_uses_one_call(service, use_llm):
+    llm = use_llm(FakeChatModel(latency_seconds=0.0))
+
+    result = service.query(LIST_QUESTION)
+
+    assert llm.calls == 1
+    assert re.findall(r"^\d+\. ", result["answer"], re.MULTILINE) == ["1. ", "2. ", "3. "]
+    assert service.generation_stats.snapshot() == {"single_pass_ok": 1}
+
+
+def test_malformed_structured_output_falls_back_to_one_plain_call(service, use_llm):
+    llm = use_llm(MalformedStructuredModel(latency_seconds=0.0))
+
+    result = service.query(LIST_QUESTION)
+
+    assert llm.calls == 2
+    assert result["answer"].startswith("1. ")
+    assert service.generation_stats.snapshot() == {"structured_fallback": 1, "single_pass_ok": 1}
+
+
+def test_short_structured_list_gets_a_list_repair_not_a_copy_repair(service, use_llm):
+    llm = use_llm(ShortListModel(latency_seconds=0.0))
+
+    service.query(LIST_QUESTION)
+
+    assert llm.calls == 2
+    assert "Deliver exactly 3 numbered items" in llm.prompts[0]
+    assert "do not copy literal sentences" not in llm.prompts[0]
+    assert service.generation_stats.snapshot() == {"repair_list": 1}
+
+
+def test_copied_answer_gets_one_repair_call(service, use_llm):
+    llm = use_llm(CopyingModel(latency_seconds=0.0))
+
+    result = service.query(PLAIN_QUESTION)
+
+    assert llm.calls == 2
+    assert result["answer"].startswith("I built and operated")
+    assert service.generation_stats.snapshot() == {"repair_paraphrase": 1}
+
+
+def test_generation_stats_endpoint_counts_paths(client, use_llm, admin_headers):
+    llm = use_llm(MalformedStructuredModel(latency_seconds=0.0))
+    before = client.get("/rag/generation/stats", headers=admin_headers).json()
+
+    assert client.post("/rag/chat", json={"message": LIST_QUESTION}).status_code == 200
+    assert llm.calls == 2
+
+    after = client.get("/rag/generation/stats", headers=admin_headers).json()
+    assert after.get("structured_fallback", 0) - before.get("structured_fallback", 0) == 1
+    assert after.get("single_pass_ok", 0) - before.get("single_pass_ok", 0) == 1
@@ -0,0 +1,99 @@
+import pytest
+from langchain_core.documents import Document
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from rag.app.core.paths import UPLOADS_DIR
+from rag.app.services import ingestion_service
+from rag.app.services.ingestion_service import SPLIT_SEPARATORS, IngestionService, _iter_chunk_texts, _load_manifest
+from rag.app.services.vector_store import get_vector_store
+from rag.benchmarks.fakes import FakeEmbeddings
+
+FILE_NAME = "Incremental_Notes_EN.txt"
+PARAGRAPHS = [
+    f"Paragraph {index}: migrated the {topic} service to containers, added health checks, wrote a runbook "
+    f"for on-call engineers and trimmed the {topic} deployment from forty minutes to under five with cached "
+    "build layers, parallel test shards and a staged rollout that pauses on elevated error rates."
+    for index, topic in enumerate(["billing", "search", "reporting", "notification", "identity", "export"])
+]
+
+
+class RecordingEmbeddings(FakeEmbeddings):
+    def __init__(self) -> None:
+        super().__init__()
+        self.texts: list[str] = []
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        self.texts.extend(texts)
+        return super().embed_documents(texts)
+
+
+@pytest.fixture
+def embeddings(monkeypatch, indexed_corpus) -> RecordingEmbeddings:
+    recording = RecordingEmbeddings()
+    monkeypatch.setattr(ingestion_service, "get_embeddings", lambda: recording)
+    return recording
+
+
+def _chunk_ids() -> list[str]:
+    return _load_manifest()["files"][FILE_NAME]["chunk_ids"]
+
+
+def test_ingestion_embeds_only_new_chunks_and_removes_deleted_files(embeddings):
+    service = IngestionService()
+    baseline = service.ingest_uploads_to_vector_db()
+    path = UPLOADS_DIR / FILE_NAME
+    try:
+        embeddings.texts.clear()
+        path.write_text("\n\n".join(PARAGRAPHS[:4]), encoding="utf-8")
+        added = service.ingest_uploads_to_vector_db()
+        first_ids = _chunk_ids()
+        assert len(first_ids) > 1
+        assert added["added_chunks"] == len(embeddings.texts) == len(first_ids)
+        assert added["unchanged_documents"] == baseline["documents"]
+
+        embeddings.texts.clear()
+        unchanged = service.ingest_uploads_to_vector_db()
+        assert unchanged["added_chunks"] == unchanged["deleted_chunks"] == 0
+        assert embeddings.texts == []
+
+        embeddings.texts.clear()
+        path.write_text("\n\n".join(PARAGRAPHS), encoding="utf-8")
+        edited = service.ingest_uploads_to_vector_db()
+        second_ids = _chunk_ids()
+        # Chunks whose text did not change keep their content-hash id and are not embedded again.
+        assert set(first_ids) & set(second_ids)
+        assert edited["added_chunks"] == len(embeddings.texts) == len(set(second_ids) - set(first_ids))
+        assert edited["deleted_chunks"] == len(set(first_ids) - set(second_ids))
+    finally:
+        path.unlink(missing_ok=True)
+
+    removed = service.ingest_uploads_to_vector_db()
+    assert removed["deleted_chunks"] == len(second_ids)
+    assert FILE_NAME not in _load_manifest()["files"]
+    assert get_vector_store().get(ids=second_ids)["ids"] == []
+
+
+def _pieces(text: str, size: int) -> list[str]:
+    return [text[start : start + size] for start in range(0, len(text), size)]
+
+
+@pytest.mark.parametrize("piece_size", [1, 7, 64, 1000])
+def test_streamed_chunks_match_a_whole_text_split(piece_size):
+    text = "\n\n".join(
+        [
+            *PARAGRAPHS,
+            # One paragraph over chunk_size, split by lines and sentences on its own.
+            "\n".join(PARAGRAPHS[:3]) + " " + ". ".join(PARAGRAPHS[3:]),
+            "x" * 2100,
+            *reversed(PARAGRAPHS),
+        ]
+    )
+    splitter = RecursiveCharacterTextSplitter(chunk_size=900, chunk_overlap=180, separators=SPLIT_SEPARATORS)
+    expected = [document.page_content for document in splitter.split_documents([Document(page_content=text)])]
+
+    # Pieces cut through separators and words, as blocks from the normalizer can.
+    assert list(_iter_chunk_texts(_pieces(text, piece_size), 900, 180, min_chars=120)) == expected
+
+
+def test_texts_under_the_minimum_yield_no_chunks():
+    assert list(_iter_chunk_texts(["Short", " note."], 900, 180, min_chars=120)) == []
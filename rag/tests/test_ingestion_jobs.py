@@ -0,0 +1,93 @@
+import json
+import threading
+import time
+
+from rag.app.services import ingestion_service
+from rag.app.services.ingestion_jobs import IngestionJobQueue, _prune_job_files
+from rag.app.services.ingestion_service import IngestionService, ingestion_lock
+
+
+def _write_job(jobs_dir, job_id: str, status: str, finished_at: float | None) -> None:
+    snapshot = {"id": job_id, "status": status, "finished_at": finished_at}
+    (jobs_dir / f"{job_id}.json").write_text(json.dumps(snapshot), encoding="utf-8")
+
+
+def test_prune_keeps_recent_finished_jobs_and_unfinished_ones(tmp_path):
+    now = time.time()
+    _write_job(tmp_path, "newest", "succeeded", now - 10)
+    _write_job(tmp_path, "newer", "failed", now - 20)
+    _write_job(tmp_path, "older", "succeeded", now - 30)
+    _write_job(tmp_path, "expired", "succeeded", now - 7200)
+    _write_job(tmp_path, "running", "running", None)
+    _write_job(tmp_path, "queued", "queued", None)
+
+    _prune_job_files(tmp_path, keep=2, max_age_seconds=3600)
+
+    assert sorted(path.stem for path in tmp_path.glob("*.json")) == ["newer", "newest", "queued", "running"]
+
+
+def test_direct_ingestion_waits_for_a_running_job(monkeypatch):
+    events: list[str] = []
+    job_started = threading.Event()
+    release_job = threading.Event()
+
+    def fake_ingest(self, chunk_size, chunk_overlap, reset_collection, progress_callback):
+        caller = "job" if threading.current_thread().name == "ingestion-jobs" else "direct"
+        events.append(f"{caller}:start")
+        if caller == "job":
+            job_started.set()
+            release_job.wait(timeout=10)
+        events.append(f"{caller}:end")
+        return {"documents": 0, "chunks": 0}
+
+    monkeypatch.setattr(IngestionService, "_ingest", fake_ingest)
+    job = IngestionJobQueue().submit(reason="test")
+    assert job_started.wait(timeout=10)
+
+    direct = threading.Thread(target=IngestionService().ingest_uploads_to_vector_db, kwargs={"reset_collection": True})
+    direct.start()
+    time.sleep(0.2)
+    assert events == ["job:start"]
+
+    release_job.set()
+    direct.join(timeout=10)
+    assert job.wait(timeout=10)
+    assert events == ["job:start", "job:end", "direct:start", "direct:end"]
+
+
+def test_concurrent_rebuilds_from_two_workers_build_once(monkeypatch, indexed_corpus):
+    builds: list[str] = []
+    activations: list[str] = []
+    create_version = ingestion_service.create_collection_version
+    activate = ingestion_service.activate_collection
+
+    def counting_create_version():
+        collection_name, store = create_version()
+        builds.append(collection_name)
+        return collection_name, store
+
+    def counting_activate(collection_name):
+        activations.append(collection_name)
+        activate(collection_name)
+
+    monkeypatch.setattr(ingestion_service, "create_collection_version", counting_create_version)
+    monkeypatch.setattr(ingestion_service, "activate_collection", counting_activate)
+
+    # Each queue stands in for one uvicorn worker; both ask for a rebuild before either starts.
+    with ingestion_lock():
+        first = IngestionJobQueue().submit(reason="worker-1", reset_collection=True)
+        second = IngestionJobQueue().submit(reason="worker-2", reset_collection=True)
+        third_worker = IngestionJobQueue()
+        running = third_worker.submit(reason="worker-3", reset_collection=True)
+        while running.status != "running":
+            time.sleep(0.01)
+        # Requests behind a running job join the one queued job instead of adding runs.
+        queued = third_worker.submit(reason="worker-3-again", reset_collection=True)
+        assert third_worker.submit(reason="worker-3-once-more", reset_collection=True) is queued
+        assert queued.coalesced_requests == 1
+
+    for job in (first, second, running, queued):
+        assert job.wait(timeout=60)
+        assert job.status == "succeeded", job.error
+    assert len(builds) == 1
+    assert activations == builds
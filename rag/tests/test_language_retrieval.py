@@ -0,0 +1,82 @@
+from langchain_core.documents import Document
+
+from rag.app.services.query_service import PreparedQuery, QueryService
+from rag.app.services.vector_store import get_vector_store
+
+
+def _doc(doc_id: str, language: str, group: str) -> Document:
+    return Document(
+        page_content=f"{group} notes in {language}",
+        id=doc_id,
+        metadata={"chunk_id": doc_id, "language": language, "translation_group": group},
+    )
+
+
+def _prepared(top_k: int = 2) -> PreparedQuery:
+    return PreparedQuery(
+        query="Qual sua experiencia com homelab?",
+        top_k=top_k,
+        response_language="pt",
+        is_project_query=False,
+        is_list_query=False,
+        requested_count=None,
+        cache_scope=(),
+    )
+
+
+def _service(monkeypatch, unfiltered: list[tuple[Document, float]]) -> tuple[QueryService, list[dict]]:
+    service = QueryService()
+    calls: list[dict] = []
+
+    def search(query_vector, k, filter=None):
+        calls.append({"k": k, "filter": filter})
+        return unfiltered
+
+    monkeypatch.setattr(service, "_search_with_auto_reindex", search)
+    return service, calls
+
+
+def test_empty_filtered_search_falls_back_to_every_language(monkeypatch):
+    unfiltered = [(_doc("en-homelab", "en", "Homelab"), 0.4), (_doc("en-crm", "en", "Crm"), 0.9)]
+    service, calls = _service(monkeypatch, unfiltered)
+
+    results, covered_groups = service._with_language_fallback(_prepared(), [], search_k=4)
+
+    assert calls == [{"k": 4, "filter": None}]
+    assert [doc.id for doc, _ in results] == ["en-homelab", "en-crm"]
+    assert covered_groups == set()
+
+
+def test_fallback_skips_translations_of_uploads_already_matched(monkeypatch):
+    filtered = [(_doc("pt-homelab", "pt", "Homelab"), 0.5)]
+    unfiltered = [
+        (_doc("en-homelab", "en", "Homelab"), 0.3),
+        (_doc("pt-homelab", "pt", "Homelab"), 0.5),
+        (_doc("en-crm", "en", "Crm"), 0.8),
+    ]
+    service, _ = _service(monkeypatch, unfiltered)
+
+    results, covered_groups = service._with_language_fallback(_prepared(), filtered, search_k=4)
+
+    assert [doc.id for doc, _ in results] == ["pt-homelab", "en-crm"]
+    assert covered_groups == {"Homelab"}
+
+
+def test_enough_chunks_in_the_question_language_skip_the_fallback(monkeypatch):
+    filtered = [(_doc("pt-homelab", "pt", "Homelab"), 0.5), (_doc("pt-crm", "pt", "Crm"), 0.6)]
+    service, calls = _service(monkeypatch, [])
+
+    assert service._with_language_fallback(_prepared(), filtered, search_k=4) == (filtered, None)
+    assert calls == []
+
+
+def test_ingested_chunks_are_tagged_with_their_language(indexed_corpus):
+    metadatas = get_vector_store().get(include=["metadatas"])["metadatas"]
+    tagged = {
+        (metadata["source_name"], metadata["language"])
+        for metadata in metadatas
+        if metadata["source_name"].endswith(("_EN.txt", "_PT.txt"))
+    }
+
+    assert tagged
+    assert all(source_name.endswith(f"_{language.upper()}.txt") for source_name, language in tagged)
@@ -0,0 +1,86 @@
+from langchain_core.documents import Document
+
+from rag.app.services import query_service
+from rag.app.services.lexical_index import BM25Index, _iter_stored_chunks
+from rag.app.services.numpy_store import NumpyVectorStore
+from rag.app.services.query_service import QueryService
+from rag.benchmarks.fakes import FakeEmbeddings
+
+TEXTS = {
+    "grafana": ("Dashboards in Grafana fed by Prometheus alerts", "en"),
+    "proxmox": ("A homelab running Proxmox with nightly ZFS backups", "en"),
+    "crm": ("Scripts de automação que sincronizam registros do CRM", "pt"),
+    "csv": ("Pipelines that clean and load CSV exports", "en"),
+    "webhooks": ("Integrações com provedores de pagamento e webhooks", "pt"),
+}
+
+
+def test_rebuild_reads_the_store_in_pages(tmp_path):
+    embeddings = FakeEmbeddings(dimension=16)
+    store = NumpyVectorStore("profile_v1", tmp_path / "profile_v1.index.json", embeddings)
+    ids = list(TEXTS)
+    store.upsert(
+        ids,
+        embeddings.embed_documents([text for text, _ in TEXTS.values()]),
+        [text for text, _ in TEXTS.values()],
+        [{"language": language} for _, language in TEXTS.values()],
+    )
+
+    records = list(_iter_stored_chunks(store, page_size=2))
+    index = BM25Index.from_records(records)
+
+    assert [doc_id for doc_id, _, _ in records] == ids
+    assert index.search("proxmox backups", k=1)[0][0] == "proxmox"
+    assert [doc_id for doc_id, _ in index.search("automacao crm webhooks", k=5, language="pt")] == ["crm", "webhooks"]
+
+
+def _fusion_candidates(monkeypatch):
+    documents = {
+        doc_id: Document(page_content=text, id=doc_id, metadata={"chunk_id": doc_id, "language": language})
+        for doc_id, (text, language) in {
+            **TEXTS,
+            "motivation": ("What I enjoy most is your team shipping with care", "en"),
+        }.items()
+    }
+    index = BM25Index.from_records((doc.id, doc.page_content, "en") for doc in documents.values())
+    monkeypatch.setattr(query_service, "get_lexical_index", lambda: index)
+    monkeypatch.setattr(query_service, "get_vector_store", lambda: None)
+    monkeypatch.setattr(
+        query_service,
+        "fetch_documents_with_distances",
+        lambda _store, ids, _vector: [(documents[doc_id], 9.0) for doc_id in ids],
+    )
+    return documents
+
+
+def test_fusion_ranks_agreeing_hits_first_and_keeps_exact_terms(monkeypatch):
+    documents = _fusion_candidates(monkeypatch)
+    vector_results = [(documents["grafana"], 0.5), (documents["proxmox"], 1.0), (documents["csv"], 4.0)]
+
+    fused = QueryService()._fuse_with_lexical(
+        "What is your experience with Proxmox?",
+        query_vector=[],
+        vector_results=vector_results,
+        search_k=4,
+        top_k=4,
+        is_project_query=False,
+    )
+
+    # "proxmox" is ranked by both retrievers; "csv" fails the vector threshold and has no term match;
+    # "motivation" only shares stopwords ("what", "your") with the question.
+    assert [doc.id for doc, _ in fused] == ["proxmox", "grafana"]
+
+
+def test_fusion_keeps_lexical_only_hits_above_the_floor(monkeypatch):
+    documents = _fusion_candidates(monkeypatch)
+
+    fused = QueryService()._fuse_with_lexical(
+        "Which webhooks did you integrate?",
+        query_vector=[],
+        vector_results=[(documents["grafana"], 0.5)],
+        search_k=4,
+        top_k=4,
+        is_project_query=False,
+    )
+
+    assert [doc.id for doc, _ in fused] == ["grafana", "webhooks"]
@@ -0,0 +1,39 @@
+from rag.app.services.numpy_store import NumpyVectorStore
+from rag.benchmarks.fakes import FakeEmbeddings
+
+
+def _store(tmp_path) -> NumpyVectorStore:
+    return NumpyVectorStore("profile_v1", tmp_path / "profile_v1.index.json", FakeEmbeddings(dimension=8))
+
+
+def _vector(seed: int) -> list[float]:
+    return [float(seed == position) for position in range(8)]
+
+
+def test_store_sees_writes_from_another_process(tmp_path):
+    worker_a = _store(tmp_path)
+    worker_b = _store(tmp_path)
+
+    worker_a.upsert(["a", "b"], [_vector(0), _vector(1)], ["alpha", "beta"], [{"language": "en"}] * 2)
+
+    assert worker_b.count() == 2
+    hits = worker_b.similarity_search_by_vector_with_relevance_scores(_vector(1), k=1)
+    assert [document.id for document, _ in hits] == ["b"]
+
+    worker_b.delete(["a"])
+    worker_a.upsert(["c"], [_vector(2)], ["gamma"], [{"language": "pt"}])
+
+    # Worker A builds on B's delete instead of writing back its stale snapshot.
+    assert sorted(worker_b.get()["ids"]) == ["b", "c"]
+    assert sorted(worker_a.get()["ids"]) == ["b", "c"]
+
+
+def test_mismatched_files_keep_the_loaded_snapshot(tmp_path):
+    store = _store(tmp_path)
+    store.upsert(["a"], [_vector(0)], ["alpha"], [{}])
+    other = _store(tmp_path)
+    other.upsert(["b"], [_vector(1)], ["beta"], [{}])
+    # Simulates reading between the two os.replace calls of a concurrent write.
+    store.matrix_path.write_bytes(b"not a matrix")
+
+    assert store.get()["ids"] == ["a"]